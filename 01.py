@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 
 from collections import defaultdict
-import re
+
+from rawinput import open_input
+from stream import fold_all
+from wordscan import Scanner
+import pool
+import tracing
 
 ugh = {
                     'one': '1',
@@ -20,31 +25,84 @@ alternation = "|".join(ugh.keys())
 #ugh2 = r'^[a-z]*?(' + alternation + '|\d)[a-z0-9]*?(' + alternation + '|\d)?[a-z]*$'
 #ugh2 = r'^[a-z]*?(' + alternation + '|\d)[a-z0-9]*?(' + alternation + '|\d)?$'
 #print("RE", ugh2)
-ugh3 = r'(?=(\d|' + alternation + '))'
-print("RE", ugh3)
-
-LINE_RE = re.compile(ugh3)
-def main():
-    accum = 0
-    with open("01.txt", "r") as fp:
-        for line in fp:
-            line = line.strip()
-
-            m = LINE_RE.findall(line.strip())
-            one = m[0]
-            two = m[-1]
-            #one, two = m.groups()
-            print(one, two, end=" ")
-            #if two is None:
-            #    two = one
-            if one in ugh:
-                one = ugh[one]
-            if two in ugh:
-                two = ugh[two]
-            sum = int(one + two)
-            print(line, one, two, sum)
-            accum += sum
+# This used to be findall() on ugh3 = r'(?=(\d|' + alternation + '))', which
+# finds every overlapping match when only the two ends matter. The scanners
+# stop at the first hit from either end.
+DIGITS = {str(d).encode(): d for d in range(10)}
+# Part 1 only counts digits
+DIGIT_SCAN = Scanner(DIGITS)
+LINE_SCAN = Scanner({**DIGITS, **{word.encode(): int(digit) for word, digit in ugh.items()}})
+
+
+class Fold:
+    # One line at a time, see stream.py
+    def __init__(self, part2=False):
+        self.scan = LINE_SCAN if part2 else DIGIT_SCAN
+        self.accum = 0
+
+    def feed(self, line):
+        # str from a text stream, bytes views from rawinput
+        if isinstance(line, str):
+            line = line.strip().encode()
+        if not line:
+            return
+
+        one = self.scan.first(line)
+        if one is None:
+            raise ValueError(f"no digit in {bytes(line)!r}")
+        two = self.scan.last(line)
+        sum = one * 10 + two
+        tracing.debug(bytes(line), one, two, sum)
+        self.accum += sum
+
+    def answer(self):
+        return self.accum
+
+
+# Big inputs get cut into at least this many bytes per worker task
+CHUNK_BYTES = 1 << 20
+
+
+def chunk_sum(bounds, shared):
+    data, part2 = shared
+    return fold_all(Fold(part2), data.lines(*bounds))
+
+
+def parallel_sum(data, part2=False):
+    # Every line is independent, so newline-aligned byte ranges of the
+    # mapped file go out to pool workers and their sums get added up. A few
+    # ranges per worker keeps them all busy; files below CHUNK_BYTES are one
+    # range and never leave this process. Nothing but the bounds and the
+    # sums cross the pipes, and the mapping only pulls in the pages being
+    # read, so the file can be bigger than memory.
+    size = max(CHUNK_BYTES, len(data) // (pool.worker_count() * 4) + 1)
+    return sum(pool.pimap(chunk_sum, data.chunks(size), (data, part2),
+                          chunksize=1, min_units=2))
+
+
+def main(realdata=False, part2=False, filename=None):
+    if realdata:
+        accum = parallel_sum(open_input(filename or "01.txt"), part2)
+        print(accum)
+        return accum
+    elif part2:
+        data = """two1nine
+eightwothree
+abcone2threexyz
+xtwone3four
+4nineeightseven2
+zoneight234
+7pqrstsixteen""".splitlines()
+    else:
+        data = """1abc2
+pqr3stu8vwx
+a1b2c3d4e5f
+treb7uchet""".splitlines()
+
+    fold = Fold(part2)
+    accum = fold_all(fold, data)
     print(accum)
+    return accum
         # elves = defaultdict(list)
         # elf = 1
         # for line in fp:
@@ -57,4 +115,6 @@ def main():
         # print(sum(data[0][1]) + sum(data[1][1]) + sum(data[2][1]))
 
 
-main()
+if __name__ == '__main__':
+    from aoc import script_main
+    script_main(main)
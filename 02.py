@@ -1,5 +1,9 @@
 from collections import defaultdict
 import json
+import re
+
+from stream import fold_all
+import tracing
 
 testdata = """Game 1: 3 blue, 4 red; 1 red, 2 green, 6 blue; 2 green
 Game 2: 1 blue, 2 green; 3 green, 4 blue, 1 red; 1 green, 1 blue
@@ -16,51 +20,165 @@ def parse_entry(entry):
             parsed_balls.append((int(quantity), color))
         return parsed_balls
 
-games = {}
-#for line in testdata.splitlines():
-for line in open("02.txt", "r"):
-    game_num_str, entries = line.split(":")
-    game_num = int(game_num_str.split(" ")[1])
-    entries_list = entries.split("; ")
-    parsed_entries = []
-    for entry in entries_list:
-        parsed_entries.append(parse_entry(entry))
-    games[game_num] = parsed_entries
-
-truth = "12 red, 13 green, 14 blue"
-parsed_truth = parse_entry(truth)
-#print(json.dumps(games, indent=4))
-print("truth", parsed_truth)
-
-truth_dict = {color: count for count, color in parsed_truth}
-
-total = 0
-powers = 0
-
-for game_num, game_data in games.items():
-    possible = True
-    maxes = defaultdict(int)
-    for entry in game_data:
-        for ball in entry:
-            try:
-                if maxes[ball[1]] < ball[0]:
-                    maxes[ball[1]] = ball[0]
-                if truth_dict[ball[1]] < ball[0]:
-                    print(f"Game {game_num} is impossible: {ball}")
-                    possible = False
-                    #break
-            except KeyError:
-                print(f"Game {game_num} is impossible: {ball} (not found)")
-                possible = False
-                #break
-        # if not possible:
-        #     break
-    if possible:
-        print(f"Game {game_num} is good!")
-        total += game_num
-    power = maxes["red"] * maxes["green"] * maxes["blue"]
-    print(f"Game {game_num}",  maxes, power)
-    powers += power
-
-print("total was", total)
-print("total powers was", powers)
+# Columns of a maxima row. Anything that isn't red, green or blue goes in
+# OTHER, which no bag has any of.
+COLORS = ("red", "green", "blue")
+OTHER = len(COLORS)
+COLUMN = {color: i for i, color in enumerate(COLORS)}
+
+
+def bag_row(text):
+    row = [0] * (OTHER + 1)
+    for count, color in parse_entry(text):
+        row[COLUMN[color]] = count
+    return row
+
+
+TRUTH = bag_row("12 red, 13 green, 14 blue")
+
+
+# One ball count, "3 blue"
+DRAW_RE = re.compile(r"(\d+) (\w+)")
+
+
+def game_maxima(line):
+    # "Game 7: 3 blue, 4 red; ..." -> 7, [red, green, blue, other] maxima.
+    # The maxima don't care which draw a count came from, so this scans the
+    # line in place once, count/color pair by pair, with no copies or token
+    # lists.
+    colon = line.index(":")
+    game_num = int(line[line.index(" ") + 1:colon])
+    maxes = [0] * (OTHER + 1)
+    for m in DRAW_RE.finditer(line, colon):
+        quantity = int(m[1])
+        column = COLUMN.get(m[2], OTHER)
+        if maxes[column] < quantity:
+            maxes[column] = quantity
+    return game_num, maxes
+
+
+def power(maxes):
+    return maxes[0] * maxes[1] * maxes[2]
+
+
+class Games:
+    # Every game reduced to its maxima row, for asking about lots of bags at
+    # once:
+    #
+    #   games = Games.parse(lines)
+    #   games.possible_sums(bags)   # bags is (k, 3): red, green, blue
+    #   games.power_sums(bags)      # powers of just the games each bag allows
+    #
+    # A game fits a bag when none of its maxima are over, so a batch of bags
+    # is a (bags, games) comparison per color and a matrix-vector product.
+    # Bags go through in blocks of about BLOCK comparisons to keep those
+    # arrays a sane size.
+    #
+    # numpy only gets imported in here, so main() and the Fold don't pay for
+    # it.
+    BLOCK = 1 << 24
+
+    def __init__(self, ids, maxima):
+        self.ids = ids
+        self.maxima = maxima
+        self.powers = maxima[:, :OTHER].prod(axis=1)
+        # No bag has any OTHER, so those games never fit
+        self.plain = maxima[:, OTHER] == 0
+
+    @classmethod
+    def parse(cls, lines) -> "Games":
+        import numpy as np
+        ids = []
+        rows = []
+        for line in lines:
+            if not line.strip():
+                continue
+            game_num, maxes = game_maxima(line)
+            tracing.debug("Game", game_num, maxes, power(maxes))
+            ids.append(game_num)
+            rows.append(maxes)
+        return cls(np.array(ids, dtype=np.int64),
+                   np.array(rows, dtype=np.int64).reshape(-1, OTHER + 1))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def _bags(bags):
+        # (k, 3), however many bags (including none) came in
+        import numpy as np
+        return np.asarray(bags, dtype=np.int64).reshape(-1, OTHER)
+
+    def fits(self, bags):
+        # (bags, games) bool
+        bags = self._bags(bags)
+        fit = self.plain[None, :] & (self.maxima[:, 0] <= bags[:, 0, None])
+        for column in range(1, OTHER):
+            fit &= self.maxima[:, column] <= bags[:, column, None]
+        return fit
+
+    def _per_bag(self, bags, weights):
+        import numpy as np
+        bags = self._bags(bags)
+        if not len(bags):
+            return np.zeros(0, dtype=np.int64)
+        step = max(1, self.BLOCK // max(1, len(self)))
+        return np.concatenate([self.fits(bags[i:i + step]) @ weights
+                               for i in range(0, len(bags), step)])
+
+    def possible_sums(self, bags):
+        # Part 1 for each bag
+        return self._per_bag(bags, self.ids)
+
+    def power_sums(self, bags):
+        return self._per_bag(bags, self.powers)
+
+    def power_sum(self) -> int:
+        # Part 2, which doesn't depend on the bag
+        return int(self.powers.sum())
+
+
+class Fold:
+    # One game at a time, see stream.py. Only the running totals are kept,
+    # so any number of games is constant memory, and both parts come out of
+    # the same counters.
+    def __init__(self, part2=False):
+        self.part2 = part2
+        self.total = 0
+        self.powers = 0
+
+    def feed(self, line):
+        if not line.strip():
+            return
+        game_num, (red, green, blue, other) = game_maxima(line)
+        if red <= TRUTH[0] and green <= TRUTH[1] and blue <= TRUTH[2] and not other:
+            self.total += game_num
+        self.powers += red * green * blue
+        tracing.debug("Game", game_num, red, green, blue, other)
+
+    def answers(self):
+        return self.total, self.powers
+
+    def answer(self):
+        return self.powers if self.part2 else self.total
+
+
+def main(realdata=False, part2=False, filename=None):
+    if realdata:
+        data = open(filename or "02.txt", "r")
+    else:
+        data = testdata.splitlines()
+
+    # Games would do too, but one bag doesn't need numpy
+    tracing.debug("truth", TRUTH)
+    fold = Fold(part2)
+    fold_all(fold, data)
+
+    print("total was", fold.total)
+    print("total powers was", fold.powers)
+    return fold.answer()
+
+
+if __name__ == '__main__':
+    from aoc import script_main
+    script_main(main)
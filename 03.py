@@ -11,6 +11,10 @@ testdata = """467..114.1
 .664.598.."""
 
 from dataclasses import dataclass
+from typing import List, Set, Tuple
+
+from stream import fold_all
+import tracing
 
 SIZE=10
 
@@ -21,33 +25,6 @@ class Number:
     length: int
     data: int
 
-    def adjacent_to_symbol_in(self, sym_map: 'Dict[Tuple[int, int], Symbol]'):
-        return next((sym_map[point] for point in self.adjacent_points() if point in sym_map), None)
-
-    def adjacent_points(self):
-        # point to the left (if any)
-        yield (self.x-1, self.y)
-        # point to the right (if any)
-        # skip conditional because I can
-        yield (self.x+self.length, self.y)
-
-        # point up-left
-        yield (self.x-1, self.y-1)
-
-        # point down-left
-        yield (self.x-1, self.y+1)
-
-        # point up-right
-        yield (self.x+self.length, self.y-1)
-
-        # point down-right
-        yield (self.x+self.length, self.y+1)
-
-        # point above/below all points on the number
-        for i in range(self.length):
-            yield (self.x+i, self.y-1)
-            yield (self.x+i, self.y+1)
-        
 
 @dataclass
 class Symbol:
@@ -81,43 +58,97 @@ def parse_line(line, y):
             
 
 
-all_numbers, all_symbols = [], []
-#for y, line in enumerate(testdata.splitlines()):
-for y, line in enumerate(open("03.txt", "r")):
-    numbers, symbols = parse_line(line.strip(), y)
-    print(y, line.strip(), numbers, symbols)
-    all_numbers.extend(numbers)
-    all_symbols.extend(symbols)
-
-sym_map = {}
-
-for symbol in all_symbols:
-    sym_map[(symbol.x, symbol.y)] = symbol
-
-accum = 0
-for number in all_numbers:
-    if (adj := number.adjacent_to_symbol_in(sym_map)):
-        print("number", number.data, "is adjacent to", adj)
-        accum += number.data
-print("part 1:", accum)
-
-
-number_adjacency_points = defaultdict(list)
-for number in all_numbers:
-    for point in number.adjacent_points():
-        number_adjacency_points[point].append(number)
-
-accum2 = 0
-for symbol in all_symbols:
-    if symbol.ch != "*":
-        continue
-    adjacent = number_adjacency_points[(symbol.x, symbol.y)]
-    if len(adjacent) != 2:
-        continue
-    gear_ratio = adjacent[0].data * adjacent[1].data
-    accum2 += gear_ratio
-
-print("part 2", accum2)
-
-
-
+# Numbers can only touch symbols in the rows right above and below them, so
+# the schematic goes by three rows at a time: a row is done once the one after
+# it shows up, and only those three are ever kept around.
+@dataclass
+class Row:
+    numbers: List[Number]
+    symbols: List[Symbol]
+    symbol_xs: Set[int]
+
+
+def make_row(line, y) -> Row:
+    numbers, symbols = parse_line(line, y)
+    tracing.debug(y, line, numbers, symbols)
+    return Row(numbers, symbols, {symbol.x for symbol in symbols})
+
+
+EMPTY_ROW = Row([], [], set())
+
+
+def resolve(above: Row, row: Row, below: Row) -> Tuple[int, int]:
+    # Part 1 and part 2 contributions of the middle row
+    window = (above, row, below)
+    accum = 0
+    for number in row.numbers:
+        if any(x in r.symbol_xs for r in window
+               for x in range(number.x - 1, number.x + number.length + 1)):
+            tracing.debug("number", number.data, "is adjacent to a symbol")
+            accum += number.data
+
+    accum2 = 0
+    for symbol in row.symbols:
+        if symbol.ch != "*":
+            continue
+        adjacent = [number for r in window for number in r.numbers
+                    if number.x - 1 <= symbol.x <= number.x + number.length]
+        if len(adjacent) != 2:
+            continue
+        gear_ratio = adjacent[0].data * adjacent[1].data
+        accum2 += gear_ratio
+    return accum, accum2
+
+
+class Fold:
+    # One row at a time, see stream.py
+    def __init__(self, part2=False):
+        self.part2 = part2
+        self.above = EMPTY_ROW
+        self.row = None
+        self.y = 0
+        self.accum = 0
+        self.accum2 = 0
+
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        below = make_row(line, self.y)
+        self.y += 1
+        if self.row is not None:
+            accum, accum2 = resolve(self.above, self.row, below)
+            self.accum += accum
+            self.accum2 += accum2
+            self.above = self.row
+        self.row = below
+
+    def totals(self) -> Tuple[int, int]:
+        # The last row so far, as if nothing came after it
+        if self.row is None:
+            return self.accum, self.accum2
+        accum, accum2 = resolve(self.above, self.row, EMPTY_ROW)
+        return self.accum + accum, self.accum2 + accum2
+
+    def answer(self):
+        accum, accum2 = self.totals()
+        return accum2 if self.part2 else accum
+
+
+def main(realdata=False, part2=False, filename=None):
+    if realdata:
+        data = open(filename or "03.txt", "r")
+    else:
+        data = testdata.splitlines()
+
+    fold = Fold(part2)
+    fold_all(fold, data)
+    accum, accum2 = fold.totals()
+    print("part 1:", accum)
+    print("part 2", accum2)
+    return accum2 if part2 else accum
+
+
+if __name__ == '__main__':
+    from aoc import script_main
+    script_main(main)
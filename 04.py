@@ -1,5 +1,8 @@
 from dataclasses import dataclass
-from collections import defaultdict
+from collections import deque
+
+from stream import fold_all
+import tracing
 
 @dataclass
 class Card:
@@ -13,10 +16,7 @@ Card 4: 41 92 73 84 69 | 59 84 76 51 58  5 54 83
 Card 5: 87 83 26 28 32 | 88 30 70 12 93 22 82 36
 Card 6: 31 18 13 56 72 | 74 77 10 23 35 67 36 11"""
 
-cards = []
-total = 0
-#for line in testdata.splitlines():
-for line in open("04.txt", "r"):
+def parse_card(line) -> Card:
     card_id, rest = line.split(":", 1)
     card_id = card_id.split(" ")[-1]
 
@@ -25,44 +25,58 @@ for line in open("04.txt", "r"):
     winning = set([int(i) for i in set1.strip().split()])
     yours = set([int(i) for i in set2.strip().split()])
 
-    cards.append(Card(int(card_id), winning, yours))
-
-old_cards = cards
-cards = defaultdict(list)
-for card in old_cards:
-    cards[card.id].append(card)
-
-for card_idx in range(1, 1+len(cards.keys())):
-    for count, card in enumerate(cards[card_idx]):
-        winning = card.winning
-        yours = card.yours
-
-        matches = len(winning & yours)
-
-        for id2 in range(card_idx+1, 1+ card_idx + (matches)):
-            if id2 not in cards:
-                break
-            #print(f"Adding new copy of {id2} due to win ({matches}) on card {card_idx}[{count}]")
-            cards[id2].append(cards[id2][0])
-
-for cardlist in cards.values():
-    total += len(cardlist)
-
-for id, cardlist in cards.items():
-    print(id, len(cardlist))
-
-#card_idx = 0
-#while card_idx < len(cards):
-#    winning = cards[card_idx].winning
-#    yours = cards[card_idx].yours
-#
-#    matches = len(winning & yours)
-#    score = 0
-#    for i in range(matches):
-#        if score == 0:
-#            score = 1
-#        else:
-#            score *= 2
-#    total += score
-#    card_idx += 1
-print(total)
+    return Card(int(card_id), winning, yours)
+
+
+class Fold:
+    # One card at a time, see stream.py. A card's wins only ever add copies of
+    # the next few cards, so part 2 just keeps a queue of copies owed to the
+    # cards coming up (as long as the longest win, not the whole input).
+    def __init__(self, part2=False):
+        self.part2 = part2
+        self.total = 0
+        self.owed = deque()
+
+    def feed(self, line):
+        if not line.strip():
+            return
+        card = parse_card(line)
+        matches = len(card.winning & card.yours)
+
+        if not self.part2:
+            score = 0
+            for i in range(matches):
+                if score == 0:
+                    score = 1
+                else:
+                    score *= 2
+            self.total += score
+            return
+
+        owed = self.owed
+        count = 1 + (owed.popleft() if owed else 0)
+        tracing.debug(card.id, count)
+        self.total += count
+        while len(owed) < matches:
+            owed.append(0)
+        for i in range(matches):
+            owed[i] += count
+
+    def answer(self):
+        return self.total
+
+
+def main(realdata=False, part2=False, filename=None):
+    if realdata:
+        data = open(filename or "04.txt", "r")
+    else:
+        data = testdata.splitlines()
+
+    total = fold_all(Fold(part2), data)
+    print(total)
+    return total
+
+
+if __name__ == '__main__':
+    from aoc import script_main
+    script_main(main)
@@ -6,27 +6,25 @@ import json
 import re
 import sys
 
-from tqdm import tqdm
+from intervals import IntervalSet
+from phases import mark
+import tracing
 
 @dataclass
 class Map:
     dest: int
     src: int
     rnge: int
-    src_range: range = field(init=False, repr=False)
-    dest_range: range = field(init=False, repr=False)
-    def __post_init__(self):
-        self.src_range = self.__src_range()
-        self.dest_range = self.__dest_range()
-    def __src_range(self):
-        return range(self.src, self.src + self.rnge)
-    def __dest_range(self):
-        return range(self.dest, self.dest + self.rnge)
+
+    @property
+    def src_stop(self):
+        return self.src + self.rnge
+
+    @property
+    def delta(self):
+        return self.dest - self.src
+
     def mapit(self, src):
-        #assert src in self.src_range()
-        #out = src - self.src + self.dest
-        #assert out in self.dest_range
-        #return out
         return src - self.src + self.dest
 
 class Mapper:
@@ -34,22 +32,30 @@ class Mapper:
         self.maps = []
     def mapit(self, num):
         for m in self.maps:
-            if num in m.src_range:
-                return num - m.src + m.dest
-                # Optimized out
-                #return m.mapit(num)
+            if m.src <= num < m.src_stop:
+                return num + m.delta
         return num
+    def map_intervals(self, values: IntervalSet) -> IntervalSet:
+        # Each map moves whatever falls in its source range; anything no map
+        # covers keeps its number.
+        pieces = []
+        for m in self.maps:
+            covered = values.intersect(IntervalSet.from_range(m.src, m.src_stop))
+            pieces.extend(covered.translate(m.delta))
+        sources = IntervalSet((m.src, m.src_stop) for m in self.maps)
+        pieces.extend(values.subtract(sources))
+        return IntervalSet(pieces)
     def append(self, m):
         self.maps.append(m)
     def __repr__(self):
         return repr(self.maps)
     def range_len(self):
         return sum(i.rnge for i in self.maps)
-            
 
-def main(realdata=False, part2=False):
+
+def main(realdata=False, part2=False, filename=None):
     if realdata:
-        data = open("05.txt", "r")
+        data = open(filename or "05.txt", "r")
     else:
         data = """seeds: 79 14 55 13
 
@@ -101,6 +107,7 @@ humidity-to-location map:
         my_map = Map(dest, src, rnge)
         maps[title].append(my_map)
 
+    mark("parse")
     #print(maps)
     if not part2:
         lowest_loc = None
@@ -113,37 +120,27 @@ humidity-to-location map:
                 lowest_seed = seed
                 lowest_loc = val
         print("part1", lowest_seed, lowest_loc)
+        return lowest_loc
     else:
         assert (len(seeds) % 2) == 0
-        seedranges = []
-        lengths = []
-        for idx1, idx2 in zip(range(0, len(seeds), 2), range(1, len(seeds), 2)):
-            seedranges.append(range(seeds[idx1], seeds[idx1] + seeds[idx2]))
-            lengths.append(seeds[idx2])
-        assert len(lengths) == len(seeds)/2
-        assert sum(len(i) for i in (seedranges)) == sum(lengths)
-        print(sum(lengths))
-        print("sum of ranges", next(iter(maps.values())).range_len())
-
-        lowest_loc = int(2**32-1) # Verified by testing that this gets overwritten at least once.
-        lowest_seed = None
-        my_maps = list(maps.values())
-        for i, seed in tqdm(enumerate(itertools.chain(*seedranges)), total=sum(lengths)):
-            #if i > 1000000:
-            #    raise SystemExit
-            val = seed
-            for m in my_maps:
-                val = m.mapit(val)
-            if val < lowest_loc:
-                lowest_seed = seed
-                lowest_loc = val
-        print("part2", lowest_seed, lowest_loc)
+        seedranges = IntervalSet((seeds[i], seeds[i] + seeds[i+1])
+                                 for i in range(0, len(seeds), 2))
+        tracing.debug(seedranges.size(), "seeds in", len(seedranges), "ranges")
+        tracing.debug("sum of ranges", next(iter(maps.values())).range_len())
+
+        # Push the whole set of seed ranges through each map at once, it only
+        # ever gets split into a few hundred pieces.
+        values = seedranges
+        for m in maps.values():
+            values = m.map_intervals(values)
+            tracing.debug(len(values), "ranges after", m)
+        lowest_loc = values.min()
+        print("part2", lowest_loc)
+        return lowest_loc
 
 
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
@@ -6,9 +6,11 @@ import json
 import re
 import sys
 
-def main(realdata=False, part2=False):
+from phases import mark
+
+def main(realdata=False, part2=False, filename=None):
     if realdata:
-        data = open("06.txt", "r")
+        data = open(filename or "06.txt", "r")
     else:
         data = """Time:      7  15   30
 Distance:  9  40  200""".splitlines()
@@ -19,6 +21,8 @@ Distance:  9  40  200""".splitlines()
         title, rest = line.split(":")
         rest = [int(i) for i in rest.strip().split()]
         parsed[title] = rest
+    mark("parse")
+
     time = parsed["Time"]
     distance = parsed["Distance"]
 
@@ -42,6 +46,7 @@ Distance:  9  40  200""".splitlines()
         for way in all_ways[1:]:
             total *= way
         print(total)
+        return total
     else:
         time = int(''.join(str(i) for i in time))
         distance = int(''.join(str(i) for i in distance))
@@ -53,6 +58,7 @@ Distance:  9  40  200""".splitlines()
             if went > d:
                 ways += 1
         print("part2", ways)
+        return ways
 
 
 
@@ -60,7 +66,5 @@ Distance:  9  40  200""".splitlines()
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
@@ -1,4 +1,4 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from dataclasses import dataclass, field
 from enum import Enum, IntEnum
 from typing import Any, Dict, List
@@ -8,7 +8,11 @@ import json
 import re
 import sys
 
+from stream import fold_all
+
 ranking = list(reversed("AKQJT98765432"))
+# card -> strength, built once rather than searching ranking per card
+card_value = {card: i for i, card in enumerate(ranking)}
 
 class HandType(IntEnum):
     FIVE      = 7
@@ -30,12 +34,12 @@ class Hand:
 
     def __post_init__(self):
         self._buckets = self.__buckets()
-        self.sort_index = (self.rank, tuple([ranking.index(card) for card in self.cards]))
+        self.sort_index = (self.rank, tuple([card_value[card] for card in self.cards]))
 
     def __buckets(self):
         buckets = defaultdict(list)
         for i, card in enumerate(self.cards):
-            card = ranking.index(card)
+            card = card_value[card]
             buckets[card].append(i)
         return buckets
 
@@ -87,9 +91,61 @@ class Hand:
         return pairs
 
 
-def main(realdata=False, part2=False):
+def pack(hand: Hand) -> int:
+    # sort_index as one int: the type, then the cards as base-13 digits
+    key = int(hand.rank)
+    for value in hand.sort_index[1]:
+        key = key * 13 + value
+    return key
+
+
+class Fold:
+    # One hand at a time, see stream.py. The answer needs every hand sorted,
+    # so this keeps the bid per distinct hand, keyed by its packed sort key
+    # (no Hand objects). That's O(distinct hands) memory, at most 7 * 13**5
+    # keys however long the input. A hand that comes up again turns its
+    # entry into a Counter of bids, since equal hands rank by bid.
+    def __init__(self, part2=False):
+        self.bids: Dict[int, Any] = {}
+
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        cards, bid = line.split()
+        key = pack(Hand(cards, 0))
+        bid = int(bid)
+        seen = self.bids.get(key)
+        if seen is None:
+            self.bids[key] = bid
+        else:
+            if not isinstance(seen, Counter):
+                seen = self.bids[key] = Counter([seen])
+            seen[bid] += 1
+
+    def answer(self):
+        total = 0
+        rank = 1
+        for key in sorted(self.bids):
+            bids = self.bids[key]
+            if not isinstance(bids, Counter):
+                #print(key, bids, rank)
+                total += bids * rank
+                rank += 1
+                continue
+            # Equal hands sort by bid, and m copies of one bid take the next m
+            # ranks
+            for bid in sorted(bids):
+                m = bids[bid]
+                #print(key, bid, rank)
+                total += bid * (m * rank + m * (m - 1) // 2)
+                rank += m
+        return total
+
+
+def main(realdata=False, part2=False, filename=None):
     if realdata:
-        data = open("07.txt", "r")
+        data = open(filename or "07.txt", "r")
     else:
         data = """32T3K 765
 T55J5 684
@@ -97,25 +153,13 @@ KK677 28
 KTJJT 220
 QQQJA 483""".splitlines()
 
-    hands = []
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        cards, bid = line.split()
-        hand = Hand(cards, int(bid))
-        hands.append(hand)
-
-    total = 0
-    for i, hand in enumerate(sorted(hands)):
-        #print(hand, hand.buckets, hand.rank.name, hand.bid, i+1)
-        total += (i+1) * hand.bid
-
+    total = fold_all(Fold(part2), data)
     print(total)
+    return total
 
 
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
@@ -9,6 +9,10 @@ import math
 import re
 import sys
 
+from cycles import Stream, first_common, first_repeat
+from phases import mark
+import tracing
+
 @dataclass
 class Node:
     id: str
@@ -26,9 +30,9 @@ class Graph:
         return self.nodes[key]
 
 LINE_RE = re.compile(r'([0-9A-Z]+) = \(([0-9A-Z]+), ([0-9A-Z]+)\)')
-def main(realdata=False, part2=False):
+def main(realdata=False, part2=False, filename=None):
     if realdata:
-        data = open("08.txt", "r")
+        data = open(filename or "08.txt", "r")
     else:
         data = """RL
 
@@ -55,7 +59,7 @@ XXX = (XXX, XXX)""".splitlines()
     graph = Graph()
     for linenum, line in enumerate(data):
         line = line.strip()
-        print(line)
+        tracing.debug(line)
         if linenum == 0:
             instructions = line
             continue
@@ -68,6 +72,7 @@ XXX = (XXX, XXX)""".splitlines()
         node = Node(nid, [el1, el2])
         graph.append(node)
 
+    mark("parse")
     #print(graph)
 
     if not part2:
@@ -84,54 +89,43 @@ XXX = (XXX, XXX)""".splitlines()
                 break
 
         print(count)
+        return count
     else:
-        print("instruction len is", len(instructions))
-        assert len(instructions) == 271
-        count = 0
-        cur = [node for node in graph.nodes.values() if node.id.endswith("A")]
-        print("starting", cur)
-        reported = defaultdict(lambda: False)
-        counts = []
-        for insn in itertools.cycle(instructions):
-            insnmap = {
-                    "L": 0,
-                    "R": 1,
-            }
-            for i in range(len(cur)):
-                c = cur[i]
-                new_c = graph[c.adj[insnmap[insn]]]
-                cur[i] = new_c
-            count += 1
-            for i, c in enumerate(cur):
-                if c.id.endswith("Z") and not reported[i]:
-                    print(f"After {count} steps [{count%271} %271], state is {c} for index {i}")
-                    reported[i] = True
-                    counts.append(count)
-                    assert count%271 == 0
-            if all(i.id.endswith("Z") for i in cur):
-                print("lol this will never happen")
-                print(count)
-                break
-            if all(reported[i] for i in range(len(cur))):
-                break
+        tracing.debug("instruction len is", len(instructions))
+        insnmap = {
+                "L": 0,
+                "R": 1,
+        }
+        moves = [insnmap[insn] for insn in instructions]
+
+        # Each ghost's state is (node, position in the instructions). That
+        # sequence is eventually periodic, so find where it loops and which
+        # steps along the way land on a Z node.
+        def step(state):
+            node_id, i = state
+            return graph[node_id].adj[moves[i]], (i + 1) % len(moves)
 
-        # This relies on the only time each chain lands on Z being the end of
-        # the instruction set.
-        # That's an ... odd structure to this problem and I'm not sure how to
-        # validate it other than experimentally
-        # But that seems to have been the intended solution.
-        # The instruction length was prime, but I'm not sure if that matters
-        # here.
-        # So now we have the interval at which each chain will hit Z, so the
-        # answer for all of them to hit Z is the LCM of them.
-        print(math.lcm(*counts))
+        def on_z(state):
+            return state[0].endswith("Z")
 
-        # During my actual solve I called math.lcm by hand after dumping out all
-        # the chain lengths.
+        streams = []
+        for node in graph.nodes.values():
+            if not node.id.endswith("A"):
+                continue
+            start = (node.id, 0)
+            stream = Stream.from_states(*first_repeat(step, start), on_z)
+            tracing.info("Ghost from", node.id, "loops after", stream.cycle.mu,
+                         "steps, period", stream.cycle.lam, "Z at", stream.hits)
+            streams.append(stream)
 
+        # This used to assume each chain only lands on Z at the end of the
+        # instruction set, once per loop, and take the LCM of those counts.
+        # That's what the real inputs do, but solving the congruences covers
+        # the cases where it isn't true too.
+        result = first_common(streams)
+        print(result)
+        return result
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
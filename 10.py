@@ -9,141 +9,80 @@ import math
 import re
 import sys
 
+from grid import Grid, NORTH, SOUTH, WEST, EAST, CARDINALS
+import inputcache
+from phases import mark
+from rawinput import open_input
+import tracing
+
+# Which way each pipe connects
+PIPE_DIRECTIONS = {
+    "|": (NORTH, SOUTH),
+    "-": (WEST, EAST),
+    "L": (NORTH, EAST),
+    "J": (NORTH, WEST),
+    "7": (SOUTH, WEST),
+    "F": (SOUTH, EAST),
+    ".": (),
+    "S": CARDINALS, # HAX
+}
+
+OUTSIDE = ord("o")
+WALL = ord("#")
+
 @dataclass
 class Pipes:
-    data: Dict[Tuple[int, int], str]
+    grid: Grid
 
-    _width: int = field(init=False)
-    _height: int = field(init=False)
+    _adj: Dict[int, Tuple[int, ...]] = field(init=False)
 
     def __post_init__(self):
-        max_x = 0
-        max_y = 0
-        for y, x in self.data.keys():
-            max_x = max(max_x, x)
-            max_y = max(max_y, y)
-        self._width = max_x + 1
-        self._height = max_y + 1
-
-
-    def adj(self, coord: Tuple[int, int]) -> Iterable[Tuple[int, int]]:
-        return clamped_adj(coord, self.data[coord], self._height, self._width)
-
-def clamped_adj(point, ch, height, width) -> Iterable[Tuple[int, int]]:
-    for coord in adj(point, ch):
-        y, x = coord
-        if y < 0 or x < 0:
-            continue
-        if y >= height or x >= width:
-            continue
-        yield coord
-
-def adj(point: Tuple[int, int], ch: str) -> Iterable[Tuple[int, int]]:
-    y, x = point
-    north = (y-1, x)
-    south = (y+1, x)
-    west = (y, x-1)
-    east = (y, x+1)
-
-    if ch == "|":
-        yield north
-        yield south
-    elif ch == "-":
-        yield west
-        yield east
-    elif ch == "L":
-        yield north
-        yield east
-    elif ch == "J":
-        yield north
-        yield west
-    elif ch == "7":
-        yield south
-        yield west
-    elif ch == "F":
-        yield south
-        yield east
-    elif ch == ".":
-        pass
-    elif ch == "S":
-        yield north
-        yield south
-        yield west
-        yield east
-        # HAX
-
-def halfpoint_dumb_adj(coord) -> Iterable[Tuple[int, int]]:
-    y, x = coord
-    yield y-0.5, x
-    yield y+0.5, x
-    yield y, x-0.5
-    yield y, x+0.5
-
-def halfpoint_filter(iterator, pipes):
-    height, width = pipes._height, pipes._width
-    for point in iterator:
-        y, x = point
-        if x < 0 or y < 0:
-            continue
-        if x >= width or y >= height:
-            continue
-        yield point
-
-def halfpoint_adj(coord, pipes) -> Iterable[Tuple[int, int]]:
-    return halfpoint_filter(halfpoint_dumb_adj(coord), pipes)
-
-def compute_halfwalls(walls, pipes):
+        # byte -> neighbor offsets. The padding is "." so walking off the edge
+        # just dead-ends instead of needing a bounds check.
+        self._adj = {ord(ch): tuple(self.grid.offset(d) for d in directions)
+                     for ch, directions in PIPE_DIRECTIONS.items()}
+
+    def adj(self, idx: int) -> Iterable[int]:
+        return [idx + offset for offset in self._adj.get(self.grid[idx], ())]
+
+def halfpoint_grid(walls, pipes) -> Grid:
+    # Double-resolution grid: cell (y, x) lives at (2y, 2x) and the odd
+    # coordinates are the gaps between cells. The padding is the outer wall.
+    grid = pipes.grid
+    half = Grid(grid.width * 2, grid.height * 2, fill=".", pad="#")
     for wall in walls:
-        y, x = wall
-        ch = pipes.data[wall]
-        north = (y-0.5, x)
-        south = (y+0.5, x)
-        west = (y, x-0.5)
-        east = (y, x+0.5)
-        if ch == "|":
-            yield north
-            yield south
-        elif ch == "-":
-            yield west
-            yield east
-        elif ch == "L":
-            yield north
-            yield east
-        elif ch == "J":
-            yield north
-            yield west
-        elif ch == "7":
-            yield south
-            yield west
-        elif ch == "F":
-            yield south
-            yield east
-
-
-def find_halfpoints_reachable_from(coord, pipes, walls, dimensions) -> Set[Tuple[int, int]]:
-    queue = deque([coord])
-    reachable = set([coord])
-
-    halfwalls = halfpoint_filter(compute_halfwalls(walls, pipes), pipes)
-    walls = set(walls)
-    for i in halfwalls:
-        walls.add(i)
+        y, x = grid.coord(wall)
+        center = half.index(2*y, 2*x)
+        half.data[center] = WALL
+        ch = chr(grid[wall])
+        if ch == "S":
+            continue
+        for direction in PIPE_DIRECTIONS[ch]:
+            half.data[center + half.offset(direction)] = WALL
+    return half
+
+def find_halfpoints_reachable_from(coord, pipes, walls) -> Grid:
+    half = halfpoint_grid(walls, pipes)
+    start = half.index(*coord)
+    queue = deque([start])
+    half.data[start] = OUTSIDE
+    data = half.data
+    neighbors = half.neighbors4
 
     # BFS
     while queue:
         current = queue.popleft()
-        for adj_coord in halfpoint_adj(current, pipes):
-            if adj_coord in reachable:
-                continue
-            if adj_coord in walls:
+        for offset in neighbors:
+            adj_idx = current + offset
+            if data[adj_idx] != 0x2e: # "."
                 continue
-            reachable.add(adj_coord)
-            queue.append(adj_coord)
-    return reachable
+            data[adj_idx] = OUTSIDE
+            queue.append(adj_idx)
+    return half
 
-def main(realdata=False, part2=False):
+def main(realdata=False, part2=False, filename=None):
     if realdata:
-        data = open("10.txt", "r")
+        data = open_input(filename or "10.txt")
     else:
         data = """.....
 .S-7.
@@ -157,22 +96,17 @@ SJ.L7
 LJ...""".splitlines()
         data = data2
 
-    pipe_data = {}
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        for chnum, ch in enumerate(line):
-            pipe_data[(linenum, chnum)] = ch
+    pipes = Pipes(inputcache.grid(data, pad="."))
+    grid = pipes.grid
 
-    starting = None
-    for point, ch in pipe_data.items():
-        if ch == "S":
-            starting = point
-    if starting is None:
-        raise Exception("no starting")
+    mark("parse")
 
-    pipes = Pipes(pipe_data)
+    try:
+        starting = grid.find("S")
+    except ValueError:
+        raise Exception("no starting")
 
-    print("Found starting location", starting)
+    tracing.debug("Found starting location", grid.coord(starting))
 
     # https://stackoverflow.com/a/3908454
     # Do a DFS to find the cycle
@@ -191,8 +125,8 @@ LJ...""".splitlines()
             continue
         dfs_visited.add(cur_pos)
         for adj_coord in pipes.adj(cur_pos):
-            if pipes.data[adj_coord] == "S" and adj_coord != parent[0]:
-                print(f"Found other end at ({cur_pos})")
+            if grid[adj_coord] == ord("S") and adj_coord != parent[0]:
+                tracing.debug("Found other end at", grid.coord(cur_pos))
                 end = (cur_pos, parent)
                 positions = []
                 break
@@ -204,8 +138,8 @@ LJ...""".splitlines()
     while current is not None:
         chain.append(current[0])
         current = current[1]
-    print("end before parent was", chain[-2])
-    print(len(chain))
+    tracing.debug("end before parent was", grid.coord(chain[-2]))
+    tracing.debug(len(chain))
     assert len(chain) % 2 == 0
     print("part1:", len(chain) // 2)
 
@@ -215,28 +149,33 @@ LJ...""".splitlines()
     # outside, I'm going to just do it twice, and if I hit the outside wall then
     # I know that side is the outside.
     # I take the assumption that diagonal moves don't exist.
-    outside_points = find_halfpoints_reachable_from((0,0), pipes, walls=chain,
-                                   dimensions=(pipes._height, pipes._width))
+    half = find_halfpoints_reachable_from((0,0), pipes, walls=chain)
 
-    chainset = set(chain)
     # Wait if I assume no weird inside-out stuff if it's not outside it's
     # inside. Just count 'em.
+    # Chain cells are walls in the half grid, so anything still "." at an even
+    # coordinate is inside.
     inside_cell_count = 0
-    for i in range(pipes._height):
-        for j in range(pipes._width):
-            if (i, j) not in outside_points and (i, j) not in chainset:
+    for i in range(grid.height):
+        for j in range(grid.width):
+            if half.data[half.index(2*i, 2*j)] == ord("."):
                 inside_cell_count += 1
 
     print("part2:", inside_cell_count)
-    for i in range(pipes._height):
-        for j in range(pipes._width):
-            if (i, j) in outside_points:
-                print(".", end="")
-            elif (i, j) in chainset:
-                print(pipes.data[(i,j)], end="")
-            else:
-                print(" ", end="")
-        print()
+    if tracing.enabled():
+        for i in range(grid.height):
+            row = []
+            for j in range(grid.width):
+                ch = half.data[half.index(2*i, 2*j)]
+                if ch == OUTSIDE:
+                    row.append(".")
+                elif ch == WALL:
+                    row.append(grid.at(i, j))
+                else:
+                    row.append(" ")
+            tracing.debug("".join(row))
+
+    return inside_cell_count if part2 else len(chain) // 2
 
     #visited = {}
     #while positions:
@@ -285,7 +224,5 @@ LJ...""".splitlines()
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
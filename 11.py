@@ -4,13 +4,15 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import heapq
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
+from phases import mark
+from pool import pmap
+from shortest import shortest_paths
+import tracing
 
 def transpose(lines):
     new = [([""] * len(lines)) for i in range(len(lines[0]))]
@@ -41,29 +43,6 @@ def compute_edges_for_point(point, width, height):
             east  = (y  , x+1)
             yield (point, east)
 
-def compute_neighbors_for_point(point, width, height):
-    neighbors = []
-    # Each point has north, south, east, west edges
-    y, x = point
-    # north
-    if y-1 >= 0:
-        north = (y-1, x)
-        #yield (point, north)
-        neighbors.append(north)
-    if y+1 < height:
-        south = (y+1, x)
-        #yield (point, south)
-        neighbors.append(south)
-    if x-1 >= 0:
-        west  = (y  , x-1)
-        #yield (point, west)
-        neighbors.append(west)
-    if x+1 < width:
-        east  = (y  , x+1)
-        #yield (point, east)
-        neighbors.append(east)
-    return neighbors
-
 def compute_edges(width, height):
     for point in points(width, height):
         yield from compute_edges_for_point(point, width, height)
@@ -86,70 +65,70 @@ def compute_edges(width, height):
 #                    dist[i][j] = dist[i][k] + dist[k][j]
 #    return dist
 
-def dijkstra(data, source_point, bottommap, sidemap):
-    width = len(data[0])
-    height = len(data)
-    #for edge in compute_edges(width, height):
-    dist = {}
-    prev = {}
-    Q = []
-    for point in points(width, height):
-        dist[point] = 999999999
-        prev[point] = None
-    dist[source_point] = 0
-    heapq.heappush(Q, (0, source_point))
-
-    while Q:
-        prio, u = heapq.heappop(Q)
-        if prio != dist[u]:
-            continue
-
-        uy, ux = u
-        for v in compute_neighbors_for_point(u, width, height):
-            vy, vx = v
-            value = 1
-
-            # Pick one edge containing the map'd vertex to increase
-            # This must be consistent: |(u, v)| == |(v, u)|
-            # I chose the edge coming from left or top and ending on the mapped
-            # edge, which matches the code above that adds to the map for the
-            # line below the one that is all dots.
-            if vy != uy: # vertical edge
-                big = None
-                if uy in bottommap:
-                    big = uy
-                    small = vy
-                elif vy in bottommap:
-                    big = vy
-                    small = uy
-                if big is not None:
-                    if small < big:
-                        value += bottommap[big]
-            elif vx != ux: # horizontal edge
-                big = None
-                if ux in sidemap:
-                    big = ux
-                    small = vx
-                elif vx in sidemap:
-                    big = vx
-                    small = ux
-                if big is not None:
-                    if small < big:
-                        value += sidemap[big]
-
-
-
-            alt = dist[u] + value
-            if alt < dist[v]:
-                dist[v] = alt
-                prev[v] = u
-                heapq.heappush(Q, (alt, v))
-    return dist, prev
-
-
-def main(realdata=False, part2=False):
+# Pick one edge containing the map'd vertex to increase
+# This must be consistent: |(u, v)| == |(v, u)|
+# I chose the edge coming from left or top and ending on the mapped
+# edge, which matches the code above that adds to the map for the
+# line below the one that is all dots.
+def crossing_cost(u, v, mapping):
+    value = 1
+    big = None
+    if u in mapping:
+        big = u
+        small = v
+    elif v in mapping:
+        big = v
+        small = u
+    if big is not None:
+        if small < big:
+            value += mapping[big]
+    return value
+
+# forward[i] is the cost of i -> i+1, backward[i] of i -> i-1
+def crossing_costs(size, mapping):
+    forward = [crossing_cost(i, i+1, mapping) for i in range(size)]
+    backward = [crossing_cost(i, i-1, mapping) for i in range(size)]
+    return forward, backward
+
+def distances(width, height, source_point, targets, bottommap, sidemap):
+    down, up = crossing_costs(height, bottommap)
+    right, left = crossing_costs(width, sidemap)
+    max_weight = max(down + up + right + left)
+
+    # States are y * width + x
+    def neighbors(u):
+        y, x = divmod(u, width)
+        if y > 0:
+            yield u - width, up[y]
+        if y+1 < height:
+            yield u + width, down[y]
+        if x > 0:
+            yield u - 1, left[x]
+        if x+1 < width:
+            yield u + 1, right[x]
+
+    sy, sx = source_point
+    paths = shortest_paths(width * height, [sy * width + sx], neighbors,
+                           max_weight, targets=[y * width + x for y, x in targets],
+                           all_targets=True)
+    return paths.dist
+
+# Sum of distances from galaxy i to every galaxy after it
+def distance_sum(i, shared):
+    width, height, galaxies, bottommap, sidemap = shared
+    galaxy1 = galaxies[i]
+    dist = distances(width, height, galaxy1, galaxies[i+1:], bottommap, sidemap)
+    total = 0
+    for galaxy2 in galaxies[i+1:]:
+        y, x = galaxy2
+        #print(f"E({galaxy1}, {galaxy2}) = {dist[y * width + x]}")
+        total += dist[y * width + x]
+    return total
+
+
+def main(realdata=False, part2=False, filename=None, expansion=None):
     if realdata:
-        data = open("11.txt", "r")
+        data = open(filename or "11.txt", "r")
     else:
         data = """...#......
 .......#..
@@ -162,6 +141,10 @@ def main(realdata=False, part2=False):
 .......#..
 #...#.....""".splitlines()
 
+    # How many columns/rows an empty one turns into
+    if expansion is None:
+        expansion = 1000000 if part2 else 2
+
     bottommap = defaultdict(int)
     rightmap = defaultdict(int)
     readone = []
@@ -169,7 +152,7 @@ def main(realdata=False, part2=False):
     for linenum, line in enumerate(data):
         line = line.strip()
         if all(ch == "." for ch in line):
-            bottommap[curline] += 1000000 if part2 else 2
+            bottommap[curline] += expansion
         else:
             readone.append(list(line))
             curline += 1
@@ -181,16 +164,17 @@ def main(realdata=False, part2=False):
     curside = 0
     for line in transposed:
         if all(ch == "." for ch in line):
-            rightmap[curside] += 1000000 if part2 else 2
+            rightmap[curside] += expansion
         else:
             transposed_final.append(line)
             curside += 1
 
     final = transpose(transposed_final)
-    for line in final:
-        for ch in line:
-            print(ch, end="")
-        print()
+    mark("parse")
+
+    if tracing.enabled():
+        for line in final:
+            tracing.debug("".join(line))
 
     galaxies = []
     for point in points(len(final[0]), len(final)):
@@ -198,18 +182,15 @@ def main(realdata=False, part2=False):
         if final[y][x] == '#':
             galaxies.append(point)
 
-    total = 0
-    for i, galaxy1 in enumerate(tqdm(galaxies)):
-        dist, prev = dijkstra(final, galaxy1, bottommap, rightmap)
-        for galaxy2 in galaxies[i+1:]:
-            #print(f"E({galaxy1}, {galaxy2}) = {dist[galaxy2]}")
-            total += dist[galaxy2]
+    width = len(final[0])
+    height = len(final)
+    shared = (width, height, galaxies, bottommap, rightmap)
+    total = sum(pmap(distance_sum, range(len(galaxies)), shared, progress=True))
 
     print("total was", total)
+    return total
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
@@ -9,9 +9,9 @@ import math
 import re
 import sys
 
-from tqdm import tqdm
+from pool import pmap
+import tracing
 
-import inspect
 
 def matches_summary(records, summary):
     in_run = False
@@ -31,23 +31,24 @@ def matches_summary(records, summary):
         run_lengths.append(run_length)
     return tuple(run_lengths) == summary, run_lengths
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
-
 @functools.cache
-def partial(records, summary, verbose=False):
-    mprint = print_depth if verbose else (lambda *args: None)
-    mprint(f"partial({records}, {summary})")
+def partial(records, summary):
+    # Hot and recursive, so skip even the null span unless someone's looking
+    if not tracing.enabled():
+        return _partial(records, summary)
+    with tracing.span("partial", records=records, summary=summary):
+        return _partial(records, summary)
+
+def _partial(records, summary):
     if records == "" and len(summary) == 0:
         return 1
     if records == "" and len(summary) >  0:
         return 0
     # No decision to make in case of first char ".", just move along
     if records[0] == ".":
-        mprint("    recursing 1 (ignoring '.')")
-        result = partial(records[1:], summary, verbose)
-        mprint(f"    {result=}")
+        tracing.debug("recursing 1 (ignoring '.')")
+        result = partial(records[1:], summary)
+        tracing.debug("result =", result)
         return result
     if records != "" and len(summary) == 0:
         if "#" in records:
@@ -58,7 +59,7 @@ def partial(records, summary, verbose=False):
         first_dot = records.index(".")
     except ValueError:
         first_dot = len(records)
-    mprint(f"  {first_dot=} {summary[0]=}")
+    tracing.debug("first_dot =", first_dot, "summary[0] =", summary[0])
     try:
         next_pound = records.index("#")
     except ValueError:
@@ -69,9 +70,9 @@ def partial(records, summary, verbose=False):
         # If we have a # before then, then we fail.
         if next_pound < first_dot:
             return 0
-        mprint("    recursing 2 (setting all '?' to '.')")
-        result = partial(records[first_dot:], summary, verbose)
-        mprint(f"    {result=}")
+        tracing.debug("recursing 2 (setting all '?' to '.')")
+        result = partial(records[first_dot:], summary)
+        tracing.debug("result =", result)
         return result
 
     # After this point, we have at least one way to remove summary[0]
@@ -85,29 +86,29 @@ def partial(records, summary, verbose=False):
         # remove summary[0], so we assume we'll set all ? to # and keep going.
         try:
             if records[summary[0]] == "#": # there has to be a dot (or a wildcard we can set to dot) after us!
-                mprint("    failing to recurse 3 (nowhere to add dots) due to missing dot after us")
+                tracing.debug("failing to recurse 3 (nowhere to add dots) due to missing dot after us")
                 return 0
         except IndexError:
             pass
-        mprint("    recursing 3 (nowhere to add dots)")
-        result = partial(records[summary[0]+1:], summary[1:], verbose)
-        mprint(f"    {result=}")
+        tracing.debug("recursing 3 (nowhere to add dots)")
+        result = partial(records[summary[0]+1:], summary[1:])
+        tracing.debug("result =", result)
         return result
 
     # We must have a "?". How many?
     wildcards = min(next_pound, first_dot)
-    mprint(f"  {wildcards=}")
+    tracing.debug("wildcards =", wildcards)
 
     # How much 'extra' room do we have before the next dot?
     wiggle_room = first_dot - summary[0]
-    mprint(f"  {wiggle_room=}")
+    tracing.debug("wiggle_room =", wiggle_room)
     assert wiggle_room >= 0, f"not enough wiggle_room: {wiggle_room}"
 
     total = 0
     # We want to use all our wildcards subject to how much spare room we have
     # And how much stuff we need to pull
     dots_to_add = min(wildcards, wiggle_room)
-    mprint(f"  {dots_to_add=}")
+    tracing.debug("dots_to_add =", dots_to_add)
     for i in range(dots_to_add+1):
         # Insert i dots at the beginning, then summary[0] #'s
         fudge = 0
@@ -118,34 +119,41 @@ def partial(records, summary, verbose=False):
             if records[i+summary[0]] != "?":
                 continue
             fudge = 1
-        mprint(f"  {i=} {fudge=}")
-        mprint(f"    recursing 4 (adding {i} dots?)")
-        result = partial(records[i+summary[0] + fudge:], summary[1:], verbose)
-        mprint(f"    {result=}")
+        tracing.debug("i =", i, "fudge =", fudge)
+        tracing.debug("recursing 4 (adding", i, "dots?)")
+        result = partial(records[i+summary[0] + fudge:], summary[1:])
+        tracing.debug("result =", result)
         total += result
 
     if wildcards > wiggle_room:
         # Now add one too many dots so as to force a failure + move on
-        mprint("    recursing 5 (one bunch of wildcards dots)")
-        result = partial(records[wiggle_room+1:], summary, verbose)
-        mprint(f"    {result=} (case 5)")
+        tracing.debug("recursing 5 (one bunch of wildcards dots)")
+        result = partial(records[wiggle_room+1:], summary)
+        tracing.debug("result =", result, "(case 5)")
         total += result
 
     return total
 
 
-def handle(line, part2, verbose):
+def handle(line, part2):
+    records, summary = parse(line, part2)
+    return partial(records, summary)
+
+
+def parse(line, part2=False):
     records, summary = line.split()
     if part2:
         records = "?".join([records]*5)
         summary = ",".join([summary]*5)
     summary = tuple([int(i) for i in summary.split(",")])
-    #print(''.join(records), summary)
-    new_result = partial(records, summary, verbose)
-    return new_result
+    return records, summary
 
-    # Test code via brute, comment out the return to run it
-    # Too slow to actually run but useful for finding bugs
+
+def brute_force(line, part2=False):
+    # Try every assignment of the unknowns. Too slow to actually run on the
+    # real input but useful for finding bugs in partial(); difftest.py
+    # pairs the two up.
+    records, summary = parse(line, part2)
     unknowns = [i for i, ch in enumerate(records) if ch == "?"]
     records = list(records)
 
@@ -158,18 +166,40 @@ def handle(line, part2, verbose):
                 hits.add(unknown)
         if matches_summary(records, summary)[0]:
             total += 1
-        #print('wut', i, summary,  ''.join(records), matches_summary(records, summary))
     for i in unknowns:
         assert i in hits, f"unknown {i} not hit out of {len(unknowns)}"
-    assert new_result == total, f"Error on {line=} {new_result=} {total=}"
     return total
 
 
+# partial()'s cache only pays off within a line (and across the 5 copies in
+# part 2), so a long stream clears it now and then instead of growing forever
+CACHE_LIMIT = 1 << 20
+
 
+class Fold:
+    # One line at a time, see stream.py. main() doesn't use this, it spreads
+    # the lines over pool.pmap instead.
+    def __init__(self, part2=False):
+        self.part2 = part2
+        self.total = 0
+        self.lines = 0
 
-def main(realdata=False, part2=False, verbose=False):
+    def feed(self, line):
+        line = line.strip()
+        if not line:
+            return
+        self.total += handle(line, self.part2)
+        self.lines += 1
+        if self.lines % 1024 == 0 and partial.cache_info().currsize > CACHE_LIMIT:
+            partial.cache_clear()
+
+    def answer(self):
+        return self.total
+
+
+def main(realdata=False, part2=False, verbose=False, filename=None):
     if realdata:
-        data = open("12.txt", "r")
+        data = open(filename or "12.txt", "r")
     else:
         data = """???.### 1,1,3
 .??..??...?##. 1,1,3
@@ -178,19 +208,17 @@ def main(realdata=False, part2=False, verbose=False):
 ????.######..#####. 1,6,5
 ?###???????? 3,2,1""".splitlines()
 
+    lines = [line.strip() for line in data]
+    results = pmap(handle, lines, part2, progress=True)
     total = 0
-    for linenum, line in enumerate(tqdm(list(data))):
-        line = line.strip()
-        result = handle(line, part2, verbose)
-        print("line", linenum, line, "had", result)
+    for linenum, (line, result) in enumerate(zip(lines, results)):
+        tracing.debug("line", linenum, line, "had", result)
         total += result
     print("answer:", total)
+    return total
 
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    main(real, part2, verbose)
+    from aoc import script_main
+    script_main(main)
@@ -4,17 +4,14 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
+from rawinput import Input, open_input
+import tracing
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
 
 def HASH(s):
     accum = 0
@@ -24,6 +21,11 @@ def HASH(s):
         accum %= 256
     return accum
 
+# Part 2 hashes the same few labels over and over; whole steps hardly ever
+# repeat. Bounded, so batch runs and the daemon don't keep every label
+# they've ever seen.
+label_hash = functools.lru_cache(maxsize=1 << 12)(HASH)
+
 @dataclass
 class Instruction:
     label: str
@@ -45,32 +47,38 @@ def parse_insn(insn):
     return Instruction(''.join(label), ch, int(imm))
 
 
+def steps(data):
+    # The real input is one huge comma separated line. Walk it in place
+    # rather than decoding it and splitting it into a list first.
+    if isinstance(data, Input):
+        for view in data.split(b","):
+            yield str(view, "ascii")
+        return
+    for line in data:
+        yield from line.strip().split(",")
+
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("15.txt", "r")
+        data = open_input(filename or "15.txt")
     else:
         data = """rn=1,cm-,qp=3,cm=2,qp-,pc=4,ot=9,ab=5,pc-,pc=6,ot=7""".splitlines()
 
     boxes = defaultdict(dict)
     total = 0
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        #print(line)
-        steps = line.split(",")
-        for i, step in enumerate(steps):
-            print("evaluating", step)
-            total += HASH(step)
-            insn = parse_insn(step)
-            box = boxes[HASH(insn.label)]
-            if insn.op == "-":
-                try:
-                    del box[insn.label]
-                except KeyError:
-                    pass
-            elif insn.op == "=":
-                box[insn.label] = insn.immediate
-            print(f"after step {i}, state is {boxes}")
+    for i, step in enumerate(steps(data)):
+        tracing.debug("evaluating", step)
+        total += HASH(step)
+        insn = parse_insn(step)
+        box = boxes[label_hash(insn.label)]
+        if insn.op == "-":
+            try:
+                del box[insn.label]
+            except KeyError:
+                pass
+        elif insn.op == "=":
+            box[insn.label] = insn.immediate
+        tracing.debug("after step", i, "state is", boxes)
 
     print("part1:", total)
 
@@ -80,16 +88,12 @@ def main(realdata=False, part2=False, verbose=False, num=None):
         for j, (label, power) in enumerate(box.items()):
             part2_total += (i+1) * (j+1) * power
     print("part2:", part2_total)
+    return part2_total if part2 else total
 
 
 
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    #num = next((i for i in lower_args if str(int(i)) == i), None)
-    num = None
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
@@ -4,112 +4,91 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
+from grid import CARDINALS, EAST, Grid
+import inputcache
+from phases import mark
+from pool import pmap
+from rawinput import open_input
+import tracing
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
+# Grid padding. Beams that walk onto it have left the room.
+OUTSIDE = " "
 
+# position is a Grid index, direction is a (dy, dx) tuple
 @dataclass(eq=True, frozen=True)
 class BeamState:
-    position: Tuple[int, int]
+    position: int
     direction: Tuple[int, int]
 
-    def next(self):
-        return coord_add(self.position, self.direction)
+# Inside the emulator a beam is one int, position * 4 + direction, with the
+# direction an index into grid.CARDINALS / Grid.neighbors4.
+N, S, W, E = range(4)
 
-def coord_add(left, right):
-    return tuple(i + j for i, j in zip(left, right))
+# Tile -> for each incoming direction, the outgoing ones
+TURNS = {
+    ".":  ((N,), (S,), (W,), (E,)),
+    "/":  ((E,), (W,), (S,), (N,)),
+    "\\": ((W,), (E,), (N,), (S,)),
+    "-":  ((W, E), (W, E), (W,), (E,)),
+    "|":  ((N,), (S,), (N, S), (N, S)),
+}
+
+def pack(state: BeamState) -> int:
+    return state.position * 4 + CARDINALS.index(state.direction)
 
 class Emulator:
-    def __init__(self, room_data, state=None):
-        self.data = room_data
-        self.states = set()
+    def __init__(self, room_data: Grid, state=None):
+        self.grid = room_data
+        self.data = room_data.data
         if state is None:
-            self.states.add(BeamState((0,-1), (0,1)))
-        else:
-            self.states.add(state)
-        self._height = max(y for y, x in self.data.keys()) + 1
-        self._width = max(x for y, x in self.data.keys()) + 1
+            state = BeamState(self.grid.index(0, -1), EAST)
+        self.states = {pack(state)}
+        self._height = self.grid.height
+        self._width = self.grid.width
+        self.steps = self.grid.neighbors4
+        # TURNS indexed by the byte itself; padding and anything unexpected
+        # map to None.
+        self.turns = [None] * 256
+        for ch, outs in TURNS.items():
+            self.turns[ord(ch)] = outs
         self.visited = set()
         self.seen = set()
 
-    def in_bounds(self, coord):
-        y, x = coord
-        if y < 0 or x < 0:
-            return False
-        if y >= self._height or x >= self._width:
-            return False
-        return True
-
-    def stepn(self):
-        for i in range(n):
-            if self.step() == 0:
-                return i
-        return None
+    def in_bounds(self, idx):
+        return self.data[idx] != ord(OUTSIDE)
 
     def step(self):
-        new_states = []
+        new_states = set()
         for state in self.states:
-            new_states.extend(self.state_step(state))
-        self.states = set(new_states) - self.seen
-        for state in self.states:
-            self.visited.add(state.position)
-            self.seen.add(state)
+            new_states.update(self.state_step(state))
+        self.states = new_states - self.seen
+        self.seen |= self.states
+        self.visited.update(state >> 2 for state in self.states)
         return len(self.states)
 
-    def state_step(self, state) -> List[BeamState]:
-        new_states = []
-        pos = state.next()
-        if self.in_bounds(pos):
-            ch = self.data[pos]
-            match ch:
-                case ".":
-                    new_states.append(BeamState(pos, state.direction))
-                case "/":
-                    reflect_map = {
-                            ( 0, 1): (-1, 0),
-                            (0, -1): ( 1, 0),
-                            (-1, 0): ( 0, 1),
-                            ( 1, 0): ( 0, -1),
-                    }
-                    new_states.append(BeamState(pos,
-                                                reflect_map[state.direction]))
-                case "\\":
-                    reflect_map = {
-                            ( 0, 1): ( 1, 0),
-                            (0, -1): (-1, 0),
-                            (-1, 0): ( 0,-1),
-                            ( 1, 0): ( 0, 1),
-                    }
-                    new_states.append(BeamState(pos,
-                                                reflect_map[state.direction]))
-
-                case "|" | "-":
-                    if ch == "-" and state.direction[1] != 0:
-                        new_states.append(BeamState(pos, state.direction))
-                    elif ch == "|" and state.direction[0] != 0:
-                        new_states.append(BeamState(pos, state.direction))
-                    elif ch in "-|":
-                        if ch == "-":
-                            directions = [ (0, -1), (0, 1)]
-                        elif ch == "|":
-                            directions = [ (-1, 0), (1, 0)]
-                        else:
-                            raise Exception("impossible")
-                        for direction in directions:
-                            new_states.append(BeamState(pos, direction))
-                    else:
-                        raise Exception("Shouldn't get here")
-                case _:
-                    raise Exception(f"idk {ch}")
-        return new_states
+    def state_step(self, state: int) -> Iterable[int]:
+        direction = state & 3
+        pos = (state >> 2) + self.steps[direction]
+        outs = self.turns[self.data[pos]]
+        if outs is None:
+            if self.in_bounds(pos):
+                raise Exception(f"idk {chr(self.data[pos])}")
+            return ()
+        base = pos << 2
+        return [base | d for d in outs[direction]]
+
+def trace_board(emu):
+    tracing.debug("States", len(emu.states))
+    tracing.debug("visited", len(emu.visited))
+    for y in range(emu._height):
+        tracing.debug("".join("#" if emu.grid.index(y, x) in emu.visited else emu.grid.at(y, x)
+                              for x in range(emu._width)))
+
 
 def try_one(emu):
     i = 0
@@ -123,21 +102,20 @@ def try_one(emu):
         if len(emu.visited) != last:
             last = len(emu.visited)
             last_update = i
-        if verbose:
-            print("States", len(emu.states))
-            print("visited", len(emu.visited))
-            for y in range(emu._height):
-                for x in range(emu._width):
-                    ch = "#" if (y, x) in emu.visited else emu.data[(y,x)]
-                    print(ch, end="")
-                print()
-    print(f"Stopped after step {i} with {len(emu.visited)} activated and {len(emu.states)} states")
+        if tracing.enabled():
+            trace_board(emu)
+    tracing.debug("Stopped after step", i, "with", len(emu.visited), "activated and", len(emu.states), "states")
     return len(emu.visited)
 
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def try_start(state, room_data):
+    tracing.debug("Trying", room_data.coord(state.position), state.direction)
+    return try_one(Emulator(room_data, state))
+
+
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("16.txt", "r")
+        data = open_input(filename or "16.txt")
     else:
         data = r""".|...\....
 |.-.\.....
@@ -150,11 +128,9 @@ def main(realdata=False, part2=False, verbose=False, num=None):
 .|....-|.\
 ..//.|....""".splitlines()
 
-    room_data = {}
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        for chnum, ch in enumerate(line):
-            room_data[(linenum, chnum)] = ch
+    room_data = inputcache.grid(data, pad=OUTSIDE)
+
+    mark("parse")
 
     if not part2:
         emu = Emulator(room_data)
@@ -169,41 +145,32 @@ def main(realdata=False, part2=False, verbose=False, num=None):
             if len(emu.visited) != last:
                 last = len(emu.visited)
                 last_update = i
-            if verbose:
-                print("States", len(emu.states))
-                print("visited", len(emu.visited))
-                for y in range(emu._height):
-                    for x in range(emu._width):
-                        ch = "#" if (y, x) in emu.visited else emu.data[(y,x)]
-                        print(ch, end="")
-                    print()
-        print(f"Stopped after step {i} with {len(emu.visited)} activated and {len(emu.states)} states")
+            if tracing.enabled():
+                trace_board(emu)
+        tracing.debug("Stopped after step", i, "with", len(emu.visited), "activated and", len(emu.states), "states")
+        return len(emu.visited)
     else:
         emu = Emulator(room_data)
         things_to_try = []
+        # The padding means the starting points just off the edge are real
+        # cells we can start from.
         for i in range(emu._width):
-            things_to_try.append(BeamState((-1, i), (1, 0)))
-            things_to_try.append(BeamState((emu._height, i), (-1, 0)))
+            things_to_try.append(BeamState(room_data.index(-1, i), (1, 0)))
+            things_to_try.append(BeamState(room_data.index(emu._height, i), (-1, 0)))
         for i in range(emu._height):
-            things_to_try.append(BeamState((i, -1), (0, 1)))
-            things_to_try.append(BeamState((i, emu._width), (0, -1)))
+            things_to_try.append(BeamState(room_data.index(i, -1), (0, 1)))
+            things_to_try.append(BeamState(room_data.index(i, emu._width), (0, -1)))
         maxx = 0
         max_start = None
-        for state in tqdm(things_to_try):
-            print("Trying", state)
-            emu = Emulator(room_data, state)
-            active = try_one(emu)
+        results = pmap(try_start, things_to_try, room_data, progress=True)
+        for state, active in zip(things_to_try, results):
             if active > maxx:
                 maxx = active
                 max_start = state
-        print("Max was", maxx, "from", max_start)
+        print("Max was", maxx, "from", room_data.coord(max_start.position), max_start.direction)
+        return maxx
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    #num = next((i for i in lower_args if str(int(i)) == i), None)
-    num = False
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
@@ -4,55 +4,29 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import heapq
 import json
 import math
 import re
 import sys
 
+import inputcache
+from phases import mark
+from rawinput import open_input
+from shortest import shortest_paths
+import tracing
+
 
 NORTH = (-1, 0)
 SOUTH = ( 1, 0)
 WEST  = ( 0,-1)
 EAST  = ( 0, 1)
 
+# Clockwise, so turning is +-1 and reversing is +2
+DIRECTIONS = (NORTH, EAST, SOUTH, WEST)
 
-# left is (y, x, direction, times_in_a_row)
-# right is a (y, x) direction
-def coord_add(left, right):
-    assert len(left) == 4
-    assert len(right) == 2
-    assert right in (NORTH, SOUTH, WEST, EAST)
-
-    ly, lx, ldir, ltimes = left
-    ry, rx = right
-
-    # initial point has no direction
-    assert ldir in (None, NORTH, SOUTH, WEST, EAST)
-    # initial point has 0 times in a row
-    assert ltimes >= 0
-    assert ltimes < 5
-
-    # Compute newdirection and newtimes
-    newtimes = 1
-    newdirection = right
-    if ldir == newdirection:
-        newtimes = ltimes + 1
-
-    # Sanity checks
-    assert newtimes < 5
-    assert newtimes > 0
-    assert newdirection in (NORTH, SOUTH, WEST, EAST)
-    
-    return (ly + ry, lx + rx, newdirection, newtimes)
 
-
-def points(width, height):
-    for i in range(height):
-        for j in range(width):
-            for direction in (NORTH, SOUTH, WEST, EAST):
-                for k in range(1, 4):
-                    yield (i, j, direction, k)
+# Grid padding. Heat loss digits are 1-9 so this can never be a real cell.
+WALL = ord("0")
 
 
 MAX_STRAIGHT = 3
@@ -60,63 +34,97 @@ MAX_STRAIGHT = 3
 # https://math.stackexchange.com/questions/889418/constrained-shortest-path-dijkstra/3327906#3327906
 # Namely, we just add extra graph nodes to track the constraint on number of
 # consecutive moves in the same direction.
-def compute_neighbors_for_point(point, width, height):
-    neighbors = []
-    # Each point has north, south, east, west edges
-    y, x, direction, count = point # TODO do count logic here
-    # north
-    if y-1 >= 0 and not (direction == NORTH and count >= MAX_STRAIGHT) and not direction == SOUTH:
-        north = coord_add(point, NORTH)
-        neighbors.append(north)
-    if y+1 < height and not (direction == SOUTH and count >= MAX_STRAIGHT) and not direction == NORTH:
-        south = coord_add(point, SOUTH)
-        neighbors.append(south)
-    if x-1 >= 0 and not (direction == WEST and count >= MAX_STRAIGHT) and not direction == EAST:
-        west  = coord_add(point, WEST)
-        neighbors.append(west)
-    if x+1 < width and not (direction == EAST and count >= MAX_STRAIGHT) and not direction == WEST:
-        east  = coord_add(point, EAST)
-        neighbors.append(east)
+#
+# A state is (grid_index, direction, times_in_a_row) packed into one int.
+# times_in_a_row is 0 only for the starting point, which can go any way.
+# LAYERS is for the puzzle's own limit; main(max_straight=...) packs with
+# max_straight + 1 instead.
+LAYERS = MAX_STRAIGHT + 1
+
+def pack(idx, direction, count, layers=LAYERS):
+    return (idx * 4 + direction) * layers + count
+
+def unpack(state, layers=LAYERS):
+    rest, count = divmod(state, layers)
+    idx, direction = divmod(rest, 4)
+    return idx, direction, count
+
+
+def neighbor_function(grid, max_straight=MAX_STRAIGHT):
+    layers = max_straight + 1
+    data = grid.data
+    steps = [grid.offset(d) for d in DIRECTIONS]
+
+    def neighbors(state):
+        rest, count = divmod(state, layers)
+        idx, direction = divmod(rest, 4)
+        # Straight on, then the two turns. Never back the way we came.
+        for new_direction in (direction, (direction + 1) % 4, (direction + 3) % 4):
+            if new_direction == direction:
+                if count >= max_straight:
+                    continue
+                new_count = count + 1
+            else:
+                new_count = 1
+            # Padding is WALL so walking off the edge is just another cell we
+            # can't enter.
+            new_idx = idx + steps[new_direction]
+            weight = data[new_idx] - WALL
+            if weight:
+                yield (new_idx * 4 + new_direction) * layers + new_count, weight
     return neighbors
 
 
-INFINITY = 999999999
-# data is dict from point2 to weight as int
-# source_point is (y, x, direction, times_in_a_row)
-def dijkstra(data, source_point):
-    height = max(y for y, x in data.keys()) + 1
-    width = max(x for y, x in data.keys()) + 1
-
-    dist = {}
-    prev = {}
-    Q = []
-    for point in points(width, height):
-        dist[point] = INFINITY
-        prev[point] = None
-    dist[source_point] = 0
-    heapq.heappush(Q, (0, source_point))
-
-    while Q:
-        prio, u = heapq.heappop(Q)
-        if prio != dist[u]:
-            continue
-
-        #uy, ux, udirection, ucount = u
-        for v in compute_neighbors_for_point(u, width, height):
-            vy, vx, vdirection, vcount = v
-            value = data[(vy, vx)]
-
-            alt = dist[u] + value
-            if alt < dist[v]:
-                dist[v] = alt
-                prev[v] = u
-                heapq.heappush(Q, (alt, v))
-    return dist, prev
-
-
-def main(realdata=False, part2=False):
+# data is a Grid of ASCII digit weights
+def search(data, start, exit, max_straight=MAX_STRAIGHT):
+    layers = max_straight + 1
+    sources = [pack(start, d, 0, layers) for d in range(4)]
+    exit_points = set(pack(exit, d, count, layers)
+                      for d in range(4)
+                      for count in range(1, max_straight+1))
+    # Every step costs at least 1, so manhattan distance never overestimates
+    ey, ex = data.coord(exit)
+    to_exit = [0] * len(data.data)
+    for idx in data.cells():
+        y, x = data.coord(idx)
+        to_exit[idx] = abs(ey - y) + abs(ex - x)
+    per_cell = 4 * layers
+    def heuristic(state):
+        return to_exit[state // per_cell]
+
+    return shortest_paths(len(data.data) * 4 * layers, sources,
+                          neighbor_function(data, max_straight), max_weight=9,
+                          targets=exit_points, heuristic=heuristic,
+                          track_prev=tracing.enabled())
+
+
+def trace_path(graph_data, paths, layers=LAYERS):
+    direction_map = {}
+    for state in paths.path(paths.target)[1:]:
+        idx, direction, _ = unpack(state, layers)
+        direction_map[graph_data.coord(idx)] = DIRECTIONS[direction]
+
+    direction_ch = {
+            #None: "!",
+            NORTH: "^",
+            SOUTH: "v",
+            WEST: "<",
+            EAST: ">",
+    }
+    for y in range(graph_data.height):
+        row = []
+        for x in range(graph_data.width):
+            point = (y, x)
+            if point in direction_map:
+                row.append(direction_ch[direction_map[point]])
+            else:
+                row.append(graph_data.at(*point))
+        tracing.debug("".join(row))
+
+
+def main(realdata=False, part2=False, filename=None, max_straight=MAX_STRAIGHT):
     if realdata:
-        data = open("17.txt", "r")
+        data = open_input(filename or "17.txt")
     else:
         data = """2413432311323
 3215453535623
@@ -132,63 +140,26 @@ def main(realdata=False, part2=False):
 2546548887735
 4322674655533""".splitlines()
 
-    graph_data = {}
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        for chnum, ch in enumerate(line):
-            graph_data[(linenum, chnum)] = int(ch)
-
-    height = max(y for y, x in graph_data.keys()) + 1
-    width = max(x for y, x in graph_data.keys()) + 1
-
-    start_point = (0, 0, None, 0)
-    dist, prev = dijkstra(graph_data, start_point)
-
-    exit_point_template = [height-1, width-1, None, None]
-    exit_points = set()
-    for direction in (NORTH, SOUTH, WEST, EAST):
-        for count in range(1, MAX_STRAIGHT+1):
-            exit_point_template[2] = direction
-            exit_point_template[3] = count
-            exit_points.add(tuple(exit_point_template))
+    graph_data = inputcache.grid(data, pad=WALL)
+    mark("parse")
 
-    mindist, minpoint = INFINITY, None
-    for p in exit_points:
-        if dist[p] < mindist:
-            mindist, minpoint = dist[p], p
+    height = graph_data.height
+    width = graph_data.width
 
-    direction_map = {}
-    cur = minpoint
-    while cur in prev:
-        y, x, direction, _ = cur
-        #y, x, _, _ = prev[cur]
-
-        direction_map[(y, x)] = direction
-        cur = prev[cur]
-
-    direction_ch = {
-            #None: "!",
-            NORTH: "^",
-            SOUTH: "v",
-            WEST: "<",
-            EAST: ">",
-    }
-    for y in range(height):
-        for x in range(width):
-            point = (y, x)
-            if point in direction_map:
-                print(direction_ch[direction_map[point]], end="")
-            else:
-                print(graph_data[point], end="")
-        print()
+    paths = search(graph_data, graph_data.index(0, 0),
+                   graph_data.index(height-1, width-1), max_straight)
+    minpoint = paths.target
+    mindist = paths.dist[minpoint]
 
+    if tracing.enabled():
+        trace_path(graph_data, paths, max_straight + 1)
 
-    print(f"part1: {mindist=} {minpoint=}")
+    idx, direction, count = unpack(minpoint, max_straight + 1)
+    print(f"part1: {mindist=} minpoint={(*graph_data.coord(idx), DIRECTIONS[direction], count)}")
+    return mindist
     #import pdb; pdb.set_trace()
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    main(real, part2)
+    from aoc import script_main
+    script_main(main)
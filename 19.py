@@ -4,19 +4,17 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
 
 import ast
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
+from intervals import Box
+from phases import mark
+import tracing
 
 op_map = {
         ">": lambda a, b: a > b,
@@ -62,7 +60,7 @@ class InterpreterState:
         while True:
             wf = self.workflows[self.current_workflow]
             rule = wf[self.rule_index]
-            print(" ", self.current_workflow, rule)
+            tracing.debug(self.current_workflow, rule)
             if rule.evaluate(part):
                 if rule.outcome == "A":
                     return True
@@ -90,85 +88,42 @@ class Part:
         attrs = list("xmas")
         return sum(self.attributes[i] for i in attrs)
 
-class SymVar:
-    def __init__(self):
-            self.lower_bound = 1
-            self.upper_bound_exclusive = 4001
+ATTRIBUTES = "xmas"
 
-    def copy(self):
-        other = SymVar()
-        other.lower_bound = self.lower_bound
-        other.upper_bound_exclusive = self.upper_bound_exclusive
-        return other
-
-    def valid(self):
-        return self.lower_bound < self.upper_bound_exclusive
-
-    def __repr__(self):
-        return f"({self.lower_bound}, {self.upper_bound_exclusive})"
-
-    def total_states(self):
-        assert self.valid()
-        return self.upper_bound_exclusive - self.lower_bound
-
-
-
-# Tree walk through all states tracking what states got me there
+# Tree walk through all states tracking what states got me there. The
+# possible ratings are a box in x/m/a/s space; every condition splits it in
+# two.
 class SymbolicState:
-    def __init__(self):
-        self.attributes = {k: SymVar() for k in list("xmas")}
-        self.current_workflow = "in"
-        self.rule_index = 0
+    def __init__(self, box=None, current_workflow="in", rule_index=0):
+        self.box = box if box is not None else Box.cube(len(ATTRIBUTES), 1, 4001)
+        self.current_workflow = current_workflow
+        self.rule_index = rule_index
 
     def finish_rule(self, rule):
         assert rule.condition is None
         self.current_workflow = rule.outcome
         self.rule_index = 0
 
-    def constrain(self, condition, invert):
-        attr, op = condition[:2]
-        attr = self.attributes[attr]
+    def split(self, rule):
+        # (state where the condition held, state where it didn't), either
+        # None if no ratings are left for it
+        attr, op = rule.condition[:2]
         assert op in "><"
-        inverse = {">": "<=", "<": ">="}
-        if invert:
-            op = inverse[op]
-        num = int(condition[2:])
-        if op == ">":
-            attr.lower_bound = max(attr.lower_bound-1, num) + 1
-        elif op == "<":
-            attr.upper_bound_exclusive = min(attr.upper_bound_exclusive, num)
-        elif op == ">=":
-            attr.lower_bound = max(attr.lower_bound, num)
-        elif op == "<=":
-            attr.upper_bound_exclusive = min(attr.upper_bound_exclusive, num+1)
+        num = int(rule.condition[2:])
+        dim = ATTRIBUTES.index(attr)
+        if op == "<":
+            taken, not_taken = self.box.split(dim, num)
         else:
-            raise Exception("unreachable")
-
-    def valid(self):
-        return all(i.valid() for i in self.attributes.values())
-
-    def copy(self):
-        other = SymbolicState()
-        other.attributes = {k: v.copy() for k, v in self.attributes.items()}
-        other.current_workflow = self.current_workflow
-        other.rule_index = self.rule_index
-        return other
+            not_taken, taken = self.box.split(dim, num + 1)
+        return (taken and SymbolicState(taken, rule.outcome, 0),
+                not_taken and SymbolicState(not_taken, self.current_workflow, self.rule_index + 1))
 
     def __repr__(self):
-        attrs = ', '.join(f"{name}={value}" for name, value in self.attributes.items())
+        attrs = ', '.join(f"{name}={value}" for name, value in zip(ATTRIBUTES, self.box.bounds))
         return f"SymbolicState({attrs}, wf={self.current_workflow}, idx={self.rule_index})"
 
     def total_states(self):
-        assert self.valid()
-        accum = 1
-        for sv in self.attributes.values():
-            accum *= sv.total_states()
-        return accum
-
-    #def possible(self, condition):
-    #    attr, op = condition[:2]
-    #    assert op in "><"
-    #    num = int(condition[2:])
+        return self.box.volume()
 
 # Inspired by what little I know of angr's API -- y'all are awesome
 class SimulationManager:
@@ -178,21 +133,9 @@ class SimulationManager:
         self.succeeded = []
         self.failed = []
 
-    def execute_condition(self, state, rule, not_taken):
-        state = state.copy()
-        print("Constraining", state, "with", rule.condition, not not_taken)
-        state.constrain(rule.condition, not_taken)
-        print("output state", state)
-        if not_taken:
-            state.rule_index += 1
-        else:
-            state.current_workflow = rule.outcome
-            state.rule_index = 0
-        return state
-
     def explore(self):
         while self.states:
-            print(self)
+            tracing.debug(self)
             state = self.states.pop()
             if state.current_workflow in list("AR"):
                 if state.current_workflow == "A":
@@ -207,18 +150,19 @@ class SimulationManager:
                 state.finish_rule(rule)
                 self.states.append(state)
             else:
-                branch_taken = self.execute_condition(state, rule, False)
-                branch_not_taken = self.execute_condition(state, rule, True)
-                new_states = list(filter(lambda i: i.valid(), [branch_taken, branch_not_taken]))
-                self.states.extend(new_states)
+                tracing.debug("Splitting", state, "on", rule.condition)
+                for branch in state.split(rule):
+                    if branch is not None:
+                        tracing.debug("output state", branch)
+                        self.states.append(branch)
 
     def __str__(self):
         return f"Simgr(states={len(self.states)}, succeeded={len(self.succeeded)}, failed={len(self.failed)})"
 
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("19.txt", "r")
+        data = open(filename or "19.txt", "r")
     else:
         data = """px{a<2006:qkq,m>2090:A,rfg}
 pv{a>1716:R,A}
@@ -248,34 +192,33 @@ hdj{m>838:A,pv}
                 state = 1
                 continue
             name, workflow = parse_workflow(line)
-            print(name, workflow)
+            tracing.debug(name, workflow)
             workflows[name] = workflow
         elif state == 1:
             part = Part(line)
             parts.append(part)
 
+    mark("parse")
+
     if not part2:
         total = 0
         for part in parts:
-            print("evaluating", part)
-            istate = InterpreterState(workflows)
-            if istate.evaluate(part):
-                print("part was good")
+            with tracing.span("evaluate", part=part):
+                istate = InterpreterState(workflows)
+                good = istate.evaluate(part)
+                tracing.debug("part was good" if good else "part was bad")
+            if good:
                 total += part.score()
-            else:
-                print("part was bad")
         print("total", total)
+        return total
     else:
         simgr = SimulationManager(workflows)
         simgr.explore()
-        print("result", sum(i.total_states() for i in simgr.succeeded))
+        result = sum(i.total_states() for i in simgr.succeeded)
+        print("result", result)
+        return result
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    #@num = next((i for i in lower_args if str(int(i)) == i), None)
-    num = None
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
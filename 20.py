@@ -4,17 +4,15 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple, Optional
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
+from cycles import Cycle, Stream, first_common
+from phases import mark
+import tracing
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
 
 class LogicCell:
     graph_name = ""
@@ -115,8 +113,9 @@ class LogicSim:
         self._high_pulses = 0
         self.cells = cells
         self._cell_index = {i.name: idx for idx, i in enumerate(self.cells)}
-        self.first_lows = {}
-        self.first_highs = {}
+        # cell name -> the first two presses where it sent low/high
+        self.low_presses = defaultdict(list)
+        self.high_presses = defaultdict(list)
         visited = set()
         # tree walk to populate inputs
         queue = [self.get_cell("broadcaster")]
@@ -161,10 +160,9 @@ class LogicSim:
                 continue
             result = cell.in_pulse(pulse, whence)
             if result is not None:
-                if result is False and cell.name not in self.first_lows:
-                    self.first_lows[cell.name] = i
-                elif result is True and cell.name not in self.first_highs:
-                    self.first_highs[cell.name] = i
+                presses = self.high_presses[cell.name] if result else self.low_presses[cell.name]
+                if len(presses) < 2 and (not presses or presses[-1] != i):
+                    presses.append(i)
                 for output in cell.outputs:
                     pulses.append((output, result, name))
 
@@ -189,15 +187,15 @@ def decide_interestingcells(sim) -> Tuple[List[str], bool]:
             parents.extend(output_to_cell_map[inp])
         if not all(isinstance(i, Conjunction) for i in parents):
             return inputs, needed
-        print(f"To get all of {inputs} to be {needed}, ", end="")
-        inputs = [i.name for i in parents]
+        parent_names = [i.name for i in parents]
+        tracing.debug("To get all of", inputs, "to be", needed, "we need all of", parent_names, "to be", not needed)
+        inputs = parent_names
         needed = not needed
-        print(f"we need all of {inputs} to be {needed}")
 
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("20.txt", "r")
+        data = open(filename or "20.txt", "r")
     else:
         data = """broadcaster -> a, b, c
 %a -> b
@@ -227,33 +225,37 @@ def main(realdata=False, part2=False, verbose=False, num=None):
 
     sim = LogicSim(cells)
 
+    mark("parse")
+
     if not part2:
         for i in range(1000):
             sim.simulate_input(False)
         print("score", sim.score())
+        return sim.score()
     else:
         # Visualize with: dot -Tpdf lol.dot -o lol.pdf
-        print(sim.to_dot())
+        if tracing.enabled():
+            tracing.debug(sim.to_dot())
         interesting, needed_result = decide_interestingcells(sim)
+        presses = sim.high_presses if needed_result else sim.low_presses
         for i in range(100000):
             sim.simulate_input(False, i+1)
-            if needed_result:
-                firsts = sim.first_highs
-            else:
-                firsts = sim.first_lows
-            if all(j in firsts for j in interesting):
-                interesting_results = [(cell, firsts[cell]) for cell in interesting]
-                print(f"First time each is {needed_result}:", interesting_results)
-                result = math.lcm(*(r for _, r in interesting_results))
+            if all(len(presses[j]) == 2 for j in interesting):
+                # Each of these is a counter that goes off every so many
+                # presses. Taking the first two sightings as offset and
+                # period, solve for the first press where they all go off
+                # together. When every offset equals its period (it does for
+                # the real inputs) this is just the LCM.
+                streams = []
+                for cell in interesting:
+                    first, second = presses[cell]
+                    tracing.info(cell, "is", needed_result, "at presses", first, second)
+                    streams.append(Stream(Cycle(first, second - first), [first]))
+                result = first_common(streams)
                 print(result)
-                break
+                return result
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    #@num = next((i for i in lower_args if str(int(i)) == i), None)
-    num = None
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
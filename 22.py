@@ -4,17 +4,14 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-from tqdm import tqdm
-
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
+import inputcache
+from phases import mark
+from pool import pmap
 
 @dataclass(frozen=True, eq=True)
 class Point3:
@@ -127,19 +124,26 @@ class World:
         return disintegrable
 
 
+def chain_one(disbrick_idx, world):
+    disbrick = world.bricks[disbrick_idx]
+    new_world = World(map(lambda b: b.copy(), filter(lambda brick: brick is not disbrick, world.bricks)))
+    moved = new_world.fall_sim()
+    #print(disbrick.name, moved)
+    return moved
+
+
 def chain_reaction(world):
-    other_bricks = []
-    for disbrick in tqdm(world.bricks):
-        new_world = World(map(lambda b: b.copy(), filter(lambda brick: brick is not disbrick, world.bricks)))
-        moved = new_world.fall_sim()
-        #print(disbrick.name, moved)
-        other_bricks.append(moved)
+    other_bricks = pmap(chain_one, range(len(world.bricks)), world, progress=True)
     return sum(other_bricks)
 
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def parse_line(line):
+    return [int(j) for i in line.split("~") for j in i.split(',')]
+
+
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("22.txt", "r")
+        data = open(filename or "22.txt", "r")
     else:
         data = """1,0,1~1,2,1
 0,0,2~2,0,2
@@ -150,34 +154,28 @@ def main(realdata=False, part2=False, verbose=False, num=None):
 1,1,8~1,1,9""".splitlines()
 
     bricks = []
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        ends = (Point3(*(int(j) for j in i.split(','))) for i in line.split("~"))
-        brick = Brick(*ends)
+    for linenum, row in enumerate(inputcache.records(data, parse_line, 6, version=1, kind="22 bricks")):
+        brick = Brick(Point3(*row[:3]), Point3(*row[3:]))
         if not realdata:
             brick.name = "ABCDEFGHIJKL"[linenum]
         bricks.append(brick)
     world = World(bricks)
+    mark("parse")
+
     print("Simulating falls")
     world.fall_sim()
     if not part2:
         print("Checking disintegration")
         disintegrable = world.check_disintegration()
         print(len(disintegrable))
+        return len(disintegrable)
     else:
         print("Checking chain reaction")
-        print(chain_reaction(world))
+        result = chain_reaction(world)
+        print(result)
+        return result
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    num = None
-    for i in lower_args:
-        try:
-            num = int(i)
-        except Exception:
-            pass
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
@@ -4,19 +4,16 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 import numpy as np
-import sympy
 
-from tqdm import tqdm
+import inputcache
+from phases import mark
+import tracing
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
 
 @dataclass
 class Hail:
@@ -57,9 +54,14 @@ class Hail:
         return (p_1, t_1), (p_2, t_2)
 
 
-def main(realdata=False, part2=False, verbose=False, num=None):
+def parse_line(line):
+    p, v = line.split(" @ ")
+    return [int(i) for i in p.split(", ")] + [int(i) for i in v.split(", ")]
+
+
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
     if realdata:
-        data = open("24.txt", "r")
+        data = open(filename or "24.txt", "r")
         search_min = 200000000000000
         search_max = 400000000000000
     else:
@@ -72,37 +74,37 @@ def main(realdata=False, part2=False, verbose=False, num=None):
         search_max = 27
 
     hailstones = []
-    for linenum, line in enumerate(data):
-        line = line.strip()
-        p, v = line.split(" @ ")
-        position = np.array([int(i) for i in p.split(", ")])
-        velocity = np.array([int(i) for i in v.split(", ")])
+    for row in inputcache.records(data, parse_line, 6, version=1, kind="24 hailstones"):
+        position = np.array(row[:3])
+        velocity = np.array(row[3:])
         hailstones.append(Hail(position, velocity))
 
+    mark("parse")
+
     within = 0
     for a, b in itertools.combinations(hailstones, 2):
         if a is b:
             continue
-        print("Hailstone A:", a.position, a.velocity)
-        print("Hailstone B:", b.position, b.velocity)
+        tracing.debug("Hailstone A:", a.position, a.velocity)
+        tracing.debug("Hailstone B:", b.position, b.velocity)
         (p_1, t_1), (p_2, t_2) = a.intersects_xy(b)
         if t_1 is None:
             assert t_2 is None
-            print("Hailstones' paths are parallel; they never intersect.")
+            tracing.debug("Hailstones' paths are parallel; they never intersect.")
         elif t_1 < 0:
-            print("Hailstones' paths crossed in the past for hailstone A.")
+            tracing.debug("Hailstones' paths crossed in the past for hailstone A.")
         elif t_2 < 0:
-            print("Hailstones' paths crossed in the past for hailstone B.")
+            tracing.debug("Hailstones' paths crossed in the past for hailstone B.")
         else:
             #assert (p_1 - p_2 < np.full(2, 0.1)).all()
             x, y = p_1
             if x < search_min or x > search_max or y < search_min or y > search_max:
-                print(f"Hailstones' paths will cross outside the test area (at {x=}, {y=}).")
+                tracing.debug("Hailstones' paths will cross outside the test area at", x, y)
             else:
-                print(f"Hailstones' paths will cross inside the test area (at {x=}, {y=}).")
+                tracing.debug("Hailstones' paths will cross inside the test area at", x, y)
                 within += 1
-        print()
     print(f"{within=}")
+    return within
 
 
         
@@ -110,14 +112,5 @@ def main(realdata=False, part2=False, verbose=False, num=None):
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    num = None
-    for i in lower_args:
-        try:
-            num = int(i)
-        except Exception:
-            pass
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
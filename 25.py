@@ -4,23 +4,20 @@ from enum import Enum, IntEnum
 from typing import Any, Dict, Iterable, List, Set, Tuple
 import functools
 import itertools
-import inspect
 import json
 import math
 import re
 import sys
 
-import networkx as nx
+from phases import mark
 
-from tqdm import tqdm
 
-def print_depth(*args, **kwargs):
-    print("    " * (len(inspect.stack(0))-5), end="")
-    return print(*args, **kwargs)
+def main(realdata=False, part2=False, verbose=False, num=None, filename=None):
+    # networkx is slow to import, only pay for it when we're actually solving
+    import networkx as nx
 
-def main(realdata=False, part2=False, verbose=False, num=None):
     if realdata:
-        data = open("25.txt", "r")
+        data = open(filename or "25.txt", "r")
     else:
         data = """jqt: rhn xhk nvd
 rsh: frs pzl lsr
@@ -43,6 +40,7 @@ frs: qnr lhk lsr""".splitlines()
         for connection in rest.split():
             G.add_edge(this, connection)
 
+    mark("parse")
     # Min k-cut problem for k=2
     # https://www.geeksforgeeks.org/gomory-hu-tree-introduction/
     # https://networkx.org/documentation/stable/reference/algorithms/generated/networkx.algorithms.flow.gomory_hu_tree.html#networkx.algorithms.flow.gomory_hu_tree
@@ -52,18 +50,10 @@ frs: qnr lhk lsr""".splitlines()
     ght.remove_edge(*edge)
     U, V = nx.connected_components(ght)
     print(len(U) * len(V))
+    return len(U) * len(V)
 
 
 
 if __name__ == '__main__':
-    lower_args = [i.strip().lower() for i in sys.argv[1:]]
-    real = "real" in lower_args
-    part2 = "part2" in lower_args
-    verbose = "verbose" in lower_args
-    num = None
-    for i in lower_args:
-        try:
-            num = int(i)
-        except Exception:
-            pass
-    main(real, part2, verbose, num)
+    from aoc import script_main
+    script_main(main)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# Remembered answers.
+#
+# Some days take minutes and get re-run on the same input over and over. The
+# store keeps every answer in an SQLite file keyed by
+#
+#   day, part, parameters, sha256 of the input, sha256 of the solver code
+#
+# where "solver code" is the day's script plus every module of ours it
+# imports, transitively (grid.py, shortest.py, ...). Change any of those and
+# the key changes, so stale answers are never returned, they just stop being
+# looked up and age out.
+#
+# Eviction is by size: once the stored rows add up to more than max_bytes,
+# the least recently used ones go.
+#
+#   ./aoc.py run 05 --part 2 --memo
+#   ./answers.py stats
+#   ./answers.py prune --max-bytes 100000
+#   ./answers.py clear
+from typing import Any, Dict, Optional, Tuple
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import aoc
+import inputcache
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+
+_IMPORT = re.compile(r"^\s*(?:from\s+(\w+)|import\s+(\w+))", re.MULTILINE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    day INTEGER NOT NULL,
+    part INTEGER NOT NULL,
+    params TEXT NOT NULL,
+    input_digest TEXT NOT NULL,
+    code_digest TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    elapsed REAL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+def default_path() -> str:
+    return os.environ.get("AOC_MEMO_DB") or os.path.join(inputcache.cache_dir(), "answers.sqlite")
+
+
+def local_modules(script: str) -> Dict[str, str]:
+    # script and everything of ours it imports, name -> path
+    found: Dict[str, str] = {}
+    todo = [os.path.join(aoc.HERE, script)]
+    while todo:
+        path = todo.pop()
+        if path in found.values():
+            continue
+        found[os.path.basename(path)] = path
+        with open(path, "r") as fp:
+            source = fp.read()
+        for match in _IMPORT.finditer(source):
+            name = match.group(1) or match.group(2)
+            candidate = os.path.join(aoc.HERE, name + ".py")
+            if os.path.exists(candidate):
+                todo.append(candidate)
+    return found
+
+
+_code_digests: Dict[str, Tuple[Tuple[float, ...], str]] = {}
+
+def code_digest(script: str) -> str:
+    modules = local_modules(script)
+    paths = [modules[name] for name in sorted(modules)]
+    # Rehash only if something was touched since last time
+    mtimes = tuple(os.stat(p).st_mtime for p in paths)
+    cached = _code_digests.get(script)
+    if cached is not None and cached[0] == mtimes:
+        return cached[1]
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode() + b"\0")
+        with open(path, "rb") as fp:
+            h.update(fp.read())
+        h.update(b"\0")
+    digest = h.hexdigest()
+    _code_digests[script] = (mtimes, digest)
+    return digest
+
+
+def input_digest(filename: Optional[str], sample: bool) -> str:
+    # The sample lives in the script, so the code digest already covers it
+    if sample:
+        return "sample"
+    return inputcache.file_digest(filename)
+
+
+class Store:
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or default_path()
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute(_SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def key(self, solver: "aoc.Solver", filename: Optional[str], sample: bool,
+            params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not sample and filename is None:
+            filename = solver.default_input
+        fields = {
+            "day": solver.day,
+            "part": solver.part,
+            "params": json.dumps(params or {}, sort_keys=True),
+            "input_digest": input_digest(filename, sample),
+            "code_digest": code_digest(solver.script),
+        }
+        fields["key"] = hashlib.sha256(
+            json.dumps(fields, sort_keys=True).encode()).hexdigest()
+        return fields
+
+    def get(self, key: Dict[str, Any]):
+        row = self.db.execute("SELECT answer FROM answers WHERE key = ?",
+                              (key["key"],)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE answers SET last_used = ? WHERE key = ?",
+                        (time.time(), key["key"]))
+        self.db.commit()
+        return json.loads(row[0])
+
+    def put(self, key: Dict[str, Any], answer, elapsed: Optional[float] = None):
+        if not isinstance(answer, (int, float, str)):
+            answer = str(answer)
+        encoded = json.dumps(answer)
+        now = time.time()
+        size = len(encoded) + sum(len(str(v)) for v in key.values())
+        self.db.execute(
+            "INSERT OR REPLACE INTO answers (key, day, part, params, input_digest, "
+            "code_digest, answer, elapsed, created, last_used, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key["key"], key["day"], key["part"], key["params"], key["input_digest"],
+             key["code_digest"], encoded, elapsed, now, now, size))
+        self.db.commit()
+        self.evict()
+
+    def total_bytes(self) -> int:
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        # Drop least recently used rows until we fit, returns how many went
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+        excess = self.total_bytes() - max_bytes
+        if excess <= 0:
+            return 0
+        doomed = []
+        for key, size in self.db.execute("SELECT key, size FROM answers ORDER BY last_used"):
+            if excess <= 0:
+                break
+            doomed.append((key,))
+            excess -= size
+        self.db.executemany("DELETE FROM answers WHERE key = ?", doomed)
+        self.db.commit()
+        return len(doomed)
+
+    def clear(self):
+        self.db.execute("DELETE FROM answers")
+        self.db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        count, size, saved = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(elapsed), 0) FROM answers").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes,
+                "solve_seconds_stored": saved}
+
+
+def run(store: Store, solver: "aoc.Solver", filename=None, sample=False,
+        params=None, **kwargs) -> Tuple[Any, bool]:
+    # solver.run() through the store, returns (answer, was_stored)
+    key = store.key(solver, filename, sample, params)
+    answer = store.get(key)
+    if answer is not None:
+        return answer, True
+    start = time.perf_counter()
+    answer = solver.run(filename=filename, sample=sample, params=params, **kwargs)
+    if answer is not None:
+        store.put(key, answer, time.perf_counter() - start)
+    return answer, False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or trim the stored answers")
+    parser.add_argument("command", choices=("stats", "list", "prune", "clear"))
+    parser.add_argument("--db", help="store to use (default $AOC_MEMO_DB or .aoc_cache/answers.sqlite)")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    args = parser.parse_args(argv)
+
+    store = Store(args.db, args.max_bytes)
+    try:
+        if args.command == "stats":
+            for k, v in store.stats().items():
+                print(f"{k}: {v}")
+        elif args.command == "list":
+            for day, part, params, answer, elapsed in store.db.execute(
+                    "SELECT day, part, params, answer, elapsed FROM answers ORDER BY day, part"):
+                print(f"day {day:2} part {part}: {json.loads(answer)}  {params}  "
+                      f"[{elapsed or 0:.3f}s to solve]")
+        elif args.command == "prune":
+            print("evicted", store.evict())
+        elif args.command == "clear":
+            store.clear()
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+# Single entry point for all the days.
+#
+#   ./aoc.py run 17 --part 2 --input 17.txt
+#   ./aoc.py run all
+#   ./aoc.py batch 07 inputs/07/*.txt --workers 4
+#   some-generator | ./aoc.py stream 02 --every 10000
+#   ./aoc.py list
+#
+# The day files stay plain scripts (the names start with digits, so they can't
+# be imported normally). The registry below just knows which file solves which
+# part, and we only load a day's file when it's actually asked for. That way
+# running day 1 doesn't pay for importing networkx for day 25.
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+
+import pool
+import tracing
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass
+class Solver:
+    day: int
+    part: int
+    script: str
+
+    @property
+    def module_name(self) -> str:
+        return "day" + os.path.splitext(self.script)[0]
+
+    @property
+    def default_input(self) -> str:
+        return f"{self.day:02}.txt"
+
+    def load(self):
+        # Cache in sys.modules so days that share a file (01, 02, ...) only
+        # get executed once per process.
+        name = self.module_name
+        if name in sys.modules:
+            return sys.modules[name]
+        path = os.path.join(HERE, self.script)
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        return module
+
+    def main(self) -> Callable:
+        return self.load().main
+
+    def params(self) -> List[str]:
+        return puzzle_params(self.main())
+
+    def run_many(self, filenames: Iterable[str], params=None,
+                 workers: Optional[int] = None) -> Iterator[Tuple[str, Any, float, Optional[str]]]:
+        # Solve each input in turn, yielding (filename, answer, seconds, error)
+        # as they finish. Loading the module up front means its import-time
+        # setup happens once, before any worker forks.
+        self.load()
+        return pool.pimap(_batch_one, filenames, (self, params), workers,
+                          chunksize=1, min_units=2)
+
+    def run(self, filename=None, sample=False, params=None, **kwargs):
+        if not sample and filename is None:
+            filename = self.default_input
+        main = self.main()
+        params = params or {}
+        unknown = sorted(set(params) - set(puzzle_params(main)))
+        if unknown:
+            raise ValueError(f"day {self.day} part {self.part} has no parameter "
+                             f"{', '.join(unknown)} (has: {', '.join(puzzle_params(main)) or 'none'})")
+        return call_main(main, realdata=not sample, part2=self.part == 2,
+                         filename=filename, **kwargs, **params)
+
+
+def _batch_one(filename: str, job) -> Tuple[str, Any, float, Optional[str]]:
+    solver, params = job
+    start = time.perf_counter()
+    try:
+        # The days print as they go, keep that out of the result stream
+        with contextlib.redirect_stdout(io.StringIO()):
+            answer = solver.run(filename=filename, params=params)
+        error = None
+    except Exception as e:
+        answer, error = None, f"{type(e).__name__}: {e}"
+    return filename, answer, time.perf_counter() - start, error
+
+
+REGISTRY: Dict[Tuple[int, int], Solver] = {}
+
+def register(day: int, part: int, script: str):
+    REGISTRY[(day, part)] = Solver(day, part, script)
+
+# Most days do both parts from one file, a few got split when part 2 needed a
+# rewrite.
+for _day in (1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12, 13, 14, 15, 16, 18, 19, 20,
+             22):
+    register(_day, 1, f"{_day:02}.py")
+    register(_day, 2, f"{_day:02}.py")
+register(7, 1, "07_part1.py")
+register(7, 2, "07.py")
+register(17, 1, "17.py")
+register(17, 2, "17_part2.py")
+register(21, 1, "21_part1.py")
+register(24, 1, "24.py")
+register(25, 1, "25.py")
+
+
+def solvers(days: Optional[Iterable[int]] = None,
+            parts: Optional[Iterable[int]] = None) -> List[Solver]:
+    days = set(days) if days is not None else None
+    parts = set(parts) if parts is not None else None
+    return [solver for key, solver in sorted(REGISTRY.items())
+            if (days is None or key[0] in days)
+            and (parts is None or key[1] in parts)]
+
+
+# Every main() takes some of these. Anything else it accepts is a puzzle
+# parameter (steps for 21, expansion for 11, max_straight for 17, ...) with
+# the puzzle's own value as the default.
+STANDARD_ARGS = ("realdata", "part2", "verbose", "num", "filename")
+
+
+def accepted_args(main: Callable) -> Tuple[str, ...]:
+    code = main.__code__
+    return code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+
+
+def puzzle_params(main: Callable) -> List[str]:
+    return [a for a in accepted_args(main) if a not in STANDARD_ARGS]
+
+
+def call_main(main: Callable, **kwargs):
+    # Not every main() takes every argument (verbose, num, ...), so only pass
+    # the ones it knows about.
+    accepted = accepted_args(main)
+    return main(**{k: v for k, v in kwargs.items() if k in accepted})
+
+
+def parse_param(text: str) -> Tuple[str, Any]:
+    # "steps=64" -> ("steps", 64). Names are case-insensitive so
+    # MAX_STRAIGHT=10 works too.
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise ValueError(f"expected NAME=VALUE, got {text!r}")
+    try:
+        value = int(value)
+    except ValueError:
+        pass
+    return name.strip().lower(), value
+
+
+def parse_script_args(argv: List[str]) -> Dict[str, Any]:
+    lower_args = [i.strip().lower() for i in argv]
+    num = None
+    for i in lower_args:
+        try:
+            num = int(i)
+        except ValueError:
+            pass
+    return {
+        "realdata": "real" in lower_args,
+        "part2": "part2" in lower_args,
+        "verbose": "verbose" in lower_args,
+        "num": num,
+    }
+
+
+def script_main(main: Callable, argv: Optional[List[str]] = None):
+    # Old-style `python 17.py real part2 verbose`
+    if argv is None:
+        argv = sys.argv[1:]
+    kwargs = parse_script_args(argv)
+    if kwargs["verbose"]:
+        tracing.enable(tracing.DEBUG)
+    return call_main(main, **kwargs)
+
+
+def parse_days(values: List[str]) -> Optional[List[int]]:
+    if not values or "all" in values:
+        return None
+    return [int(v) for v in values]
+
+
+def setup_tracing(args):
+    lvl = tracing.LEVELS[args.trace] if args.trace else tracing.OFF
+    if args.verbose:
+        lvl = tracing.DEBUG
+    if lvl == tracing.OFF and args.trace_json:
+        lvl = tracing.DEBUG
+    if lvl != tracing.OFF:
+        tracing.enable(lvl, json_path=args.trace_json)
+
+
+def profile_run(solver: Solver, kwargs, directory: str, interval_ms: float):
+    import sampler
+    with sampler.Sampler(interval_ms / 1000) as s:
+        answer = solver.run(**kwargs)
+    prefix = f"{solver.day:02}.{solver.part}"
+    for path in s.write(directory, prefix):
+        print(f"profile: {path}", file=sys.stderr)
+    for phase in sorted(s.samples):
+        print(f"profile: day {solver.day} part {solver.part} {phase}, "
+              f"{s.count(phase)} samples, most self time in:", file=sys.stderr)
+        for name, count in s.top(phase, 5):
+            print(f"    {count:6} {name}", file=sys.stderr)
+    return answer
+
+
+def cmd_run(args) -> int:
+    setup_tracing(args)
+    pool.set_workers(args.workers)
+    days = parse_days(args.days)
+    parts = [args.part] if args.part else None
+    selected = solvers(days, parts)
+    if not selected:
+        print("nothing registered for that", file=sys.stderr)
+        return 1
+    params = dict(parse_param(p) for p in args.param)
+    # With several days, each one gets the parameters it has
+    known = set(p for solver in selected for p in solver.params())
+    if set(params) - known:
+        print("no selected day has parameter", ", ".join(sorted(set(params) - known)),
+              file=sys.stderr)
+        return 1
+
+    store = None
+    if args.memo and not tracing.enabled() and not args.profile:
+        # Stored answers wouldn't print any trace output or give the profiler
+        # anything to look at, so those skip the store
+        import answers
+        store = answers.Store(args.memo_db)
+
+    status = 0
+    results = []
+    for solver in selected:
+        filename = args.input
+        if not args.sample and filename is None:
+            filename = solver.default_input
+            if not os.path.exists(filename) and len(selected) > 1:
+                results.append((solver, None, None, "no input", False))
+                continue
+        kwargs = dict(filename=filename, sample=args.sample, verbose=args.verbose,
+                      params={k: v for k, v in params.items() if k in solver.params()})
+        start = time.perf_counter()
+        stored = False
+        try:
+            if store is not None:
+                answer, stored = answers.run(store, solver, **kwargs)
+            elif args.profile:
+                answer = profile_run(solver, kwargs, args.profile, args.profile_interval)
+            else:
+                answer = solver.run(**kwargs)
+        except Exception as e:
+            if len(selected) == 1:
+                raise
+            results.append((solver, None, None, f"{type(e).__name__}: {e}", False))
+            status = 1
+            continue
+        elapsed = time.perf_counter() - start
+        results.append((solver, answer, elapsed, None, stored))
+    if store is not None:
+        store.close()
+
+    print()
+    for solver, answer, elapsed, error, stored in results:
+        if error is not None:
+            print(f"day {solver.day:2} part {solver.part}: ({error})")
+        else:
+            print(f"day {solver.day:2} part {solver.part}: {answer}  [{elapsed:.3f}s"
+                  f"{', stored' if stored else ''}]")
+    return status
+
+
+def cmd_batch(args) -> int:
+    pool.set_workers(args.workers)
+    selected = solvers([args.day], [args.part] if args.part else None)
+    if not selected:
+        print("nothing registered for that", file=sys.stderr)
+        return 1
+    params = dict(parse_param(p) for p in args.param)
+
+    status = 0
+    for solver in selected:
+        for filename, answer, elapsed, error in solver.run_many(args.inputs, params):
+            if error is not None:
+                status = 1
+            if args.json:
+                line = json.dumps({"day": solver.day, "part": solver.part, "input": filename,
+                                   "answer": answer, "seconds": elapsed, "error": error})
+            elif error is not None:
+                line = f"{filename} part {solver.part}: ({error})"
+            else:
+                line = f"{filename} part {solver.part}: {answer}  [{elapsed:.3f}s]"
+            print(line, flush=True)
+    return status
+
+
+def cmd_stream(args) -> int:
+    import stream
+
+    selected = solvers([args.day], [args.part] if args.part else None)
+    if not selected:
+        print("nothing registered for that", file=sys.stderr)
+        return 1
+    parts = {}
+    for solver in selected:
+        module = solver.load()
+        if not stream.can_stream(module):
+            print(f"day {solver.day} part {solver.part} can't stream", file=sys.stderr)
+            return 1
+        parts[solver.day, solver.part] = (module, solver.part)
+    folds, answers = stream.setup(parts)
+
+    def report(n, answers):
+        for (day, part), answer in answers.items():
+            print(f"{n:>10} lines  day {day:2} part {part}: {answer}", flush=True)
+
+    setup_tracing(args)
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        lines = sys.stdin if args.input in (None, "-") \
+            else stack.enter_context(open(args.input, "r"))
+        n, answers = stream.run(folds, answers, lines, args.every, report)
+    elapsed = time.perf_counter() - start
+    for (day, part), answer in answers.items():
+        print(f"day {day:2} part {part}: {answer}  [{elapsed:.3f}s, {n} lines]")
+    return 0
+
+
+def cmd_list(args) -> int:
+    for solver in solvers():
+        try:
+            params = solver.params()
+        except ImportError:
+            # Day needs something that isn't installed; still list it
+            params = []
+        extra = f"  ({', '.join(params)})" if params else ""
+        print(f"day {solver.day:2} part {solver.part}: {solver.script}{extra}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="aoc", description="Advent of Code runner")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="solve one or more days")
+    run.add_argument("days", nargs="*", default=["all"],
+                     help="day numbers, or 'all' (default)")
+    run.add_argument("--part", type=int, choices=(1, 2),
+                     help="only this part (default both)")
+    run.add_argument("--input", help="puzzle input (default NN.txt)")
+    run.add_argument("--sample", action="store_true",
+                     help="use the example input embedded in the day")
+    run.add_argument("--verbose", action="store_true",
+                     help="same as --trace debug")
+    run.add_argument("--trace", choices=sorted(tracing.LEVELS),
+                     help="print the days' debug output (default off)")
+    run.add_argument("--workers", type=int,
+                     help="processes for the days that split up their work "
+                          "(default $AOC_WORKERS or all cores)")
+    run.add_argument("--trace-json", metavar="PATH",
+                     help="also write trace events to PATH as JSON lines")
+    run.add_argument("--profile", metavar="DIR",
+                     help="sample stacks while solving and write collapsed "
+                          "stacks (flamegraph input) per phase to DIR")
+    run.add_argument("--profile-interval", type=float, default=1.0, metavar="MS",
+                     help="CPU time between samples (default 1ms)")
+    run.add_argument("--memo", action="store_true",
+                     help="reuse answers stored by earlier runs (see answers.py)")
+    run.add_argument("--memo-db", metavar="PATH",
+                     help="answer store (default $AOC_MEMO_DB or .aoc_cache/answers.sqlite)")
+    run.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                     help="puzzle parameter, e.g. steps=10 for day 21 (see list)")
+    run.set_defaults(func=cmd_run)
+
+    batch = sub.add_parser("batch", help="solve one day for many inputs in one process")
+    batch.add_argument("day", type=int)
+    batch.add_argument("inputs", nargs="+", help="puzzle input files")
+    batch.add_argument("--part", type=int, choices=(1, 2),
+                       help="only this part (default both)")
+    batch.add_argument("--workers", type=int,
+                       help="processes to spread the inputs over "
+                            "(default $AOC_WORKERS or all cores)")
+    batch.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    batch.add_argument("--json", action="store_true", help="one JSON object per result")
+    batch.set_defaults(func=cmd_batch)
+
+    strm = sub.add_parser("stream", help="solve one day from stdin, printing running answers")
+    strm.add_argument("day", type=int)
+    strm.add_argument("--part", type=int, choices=(1, 2),
+                      help="only this part (default both, from the same pass)")
+    strm.add_argument("--input", help="read this file instead of stdin ('-' is stdin)")
+    strm.add_argument("--every", type=int, default=0, metavar="N",
+                      help="print the answers so far every N lines (default only at the end)")
+    strm.add_argument("--verbose", action="store_true", help="same as --trace debug")
+    strm.add_argument("--trace", choices=sorted(tracing.LEVELS),
+                      help="print the days' debug output (default off)")
+    strm.add_argument("--trace-json", metavar="PATH",
+                      help="also write trace events to PATH as JSON lines")
+    strm.set_defaults(func=cmd_stream)
+
+    lst = sub.add_parser("list", help="show registered solvers")
+    lst.set_defaults(func=cmd_list)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        tracing.disable()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# Benchmark every day, parse and solve separately.
+#
+#   ./bench.py                        # everything, embedded sample inputs
+#   ./bench.py 17 22 --input-dir inputs --repeat 10
+#   ./bench.py --save bench_baseline.json
+#   ./bench.py --baseline bench_baseline.json --threshold 15
+#
+# Parse time is measured up to the day's phases.mark("parse") call, and the
+# rest of main() counts as solving that part. Days that never call mark()
+# (the ones that parse and solve in the same loop) only get a total.
+#
+# Each measurement is the best of --repeat runs after --warmup throwaway runs.
+# With --baseline, any day/part whose total got more than --threshold percent
+# slower makes us exit non-zero.
+#
+# The parsed-input cache (inputcache.py) is off while benchmarking, so "parse"
+# really is parsing; --cached leaves it on to time the reload path instead.
+#
+# A day that raises is reported and makes us exit non-zero too.
+#
+# --memory adds one more run per day under memprof.py and records the peak
+# traced allocations and peak RSS, which --baseline then checks against the
+# same threshold.
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+import aoc
+import phases
+
+
+@dataclass
+class Timing:
+    day: int
+    part: int
+    input: str
+    parse: Optional[float]
+    solve: Optional[float]
+    total: float
+    runs: int
+    answer: Optional[str] = None
+    peak_traced: Optional[int] = None
+    peak_rss: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.day}.{self.part}"
+
+
+def clear_caches(module):
+    # Days like 12 hang functools.cache off module level functions, which would
+    # make every run after the first one free.
+    for value in vars(module).values():
+        cache_clear = getattr(value, "cache_clear", None)
+        if callable(cache_clear):
+            cache_clear()
+
+
+def run_once(solver, filename, sample):
+    marks = {}
+    def on_mark(name):
+        marks.setdefault(name, time.perf_counter())
+
+    module = solver.load()
+    clear_caches(module)
+    sink = io.StringIO()
+    gc.collect()
+    with phases.listening(on_mark), contextlib.redirect_stdout(sink), \
+            contextlib.redirect_stderr(sink):
+        start = time.perf_counter()
+        answer = solver.run(filename=filename, sample=sample)
+        end = time.perf_counter()
+
+    parse = marks.get("parse")
+    if parse is None:
+        return None, None, end - start, answer
+    return parse - start, end - parse, end - start, answer
+
+
+def bench(solver, filename, sample, repeat, warmup) -> Timing:
+    for _ in range(warmup):
+        run_once(solver, filename, sample)
+
+    parses, solves, totals = [], [], []
+    answer = None
+    for _ in range(repeat):
+        parse, solve, total, answer = run_once(solver, filename, sample)
+        if parse is not None:
+            parses.append(parse)
+            solves.append(solve)
+        totals.append(total)
+
+    return Timing(
+        day=solver.day,
+        part=solver.part,
+        input="sample" if sample else os.path.basename(filename),
+        parse=min(parses) if parses else None,
+        solve=min(solves) if solves else None,
+        total=min(totals),
+        runs=repeat,
+        answer=None if answer is None else str(answer),
+    )
+
+
+def pick_input(solver, input_dir):
+    if input_dir is not None:
+        path = os.path.join(input_dir, solver.default_input)
+        if os.path.exists(path):
+            return path, False
+    return None, True
+
+
+def load_baseline(path) -> Dict[str, dict]:
+    with open(path, "r") as fp:
+        return json.load(fp)["results"]
+
+
+def save_baseline(path, timings: List[Timing]):
+    doc = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {t.key: asdict(t) for t in timings},
+    }
+    with open(path, "w") as fp:
+        json.dump(doc, fp, indent=2, sort_keys=True)
+        fp.write("\n")
+
+
+def fmt(seconds):
+    if seconds is None:
+        return "       -"
+    return f"{seconds * 1000:8.2f}"
+
+
+def compare(timings: List[Timing], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for t in timings:
+        old = baseline.get(t.key)
+        if old is None:
+            continue
+        if old["input"] != t.input:
+            continue
+        if old.get("answer") is not None and t.answer is not None and old["answer"] != t.answer:
+            regressions.append(f"day {t.day} part {t.part}: answer changed {old['answer']} -> {t.answer}")
+        limit = old["total"] * (1 + threshold / 100)
+        if t.total > limit:
+            change = (t.total / old["total"] - 1) * 100
+            regressions.append(f"day {t.day} part {t.part}: {fmt(old['total']).strip()}ms -> "
+                               f"{fmt(t.total).strip()}ms (+{change:.1f}%)")
+        for attr in ("peak_traced", "peak_rss"):
+            before, after = old.get(attr), getattr(t, attr)
+            if before and after and after > before * (1 + threshold / 100):
+                change = (after / before - 1) * 100
+                regressions.append(f"day {t.day} part {t.part}: {attr} {before} -> {after} bytes "
+                                   f"(+{change:.1f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time parse/part1/part2 for each day")
+    parser.add_argument("days", nargs="*", default=["all"])
+    parser.add_argument("--part", type=int, choices=(1, 2))
+    parser.add_argument("--input-dir", help="directory with NN.txt inputs (missing ones use the sample)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--save", metavar="JSON", help="write results as a new baseline")
+    parser.add_argument("--baseline", metavar="JSON", help="compare against this baseline")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="allowed slowdown in percent (default 10)")
+    parser.add_argument("--memory", action="store_true",
+                        help="also record peak memory (one extra, slower run per day)")
+    parser.add_argument("--cached", action="store_true",
+                        help="leave the parsed-input cache on, so parse times a cache reload")
+    args = parser.parse_args(argv)
+    if not args.cached:
+        os.environ["AOC_CACHE"] = "0"
+    if args.memory:
+        import memprof
+
+    timings = []
+    failed = []
+    print(f"{'day':>3} {'part':>4} {'input':>10} {'parse ms':>9} {'solve ms':>9} {'total ms':>9}"
+          + (f" {'peak MiB':>9} {'rss MiB':>9}" if args.memory else ""))
+    for solver in aoc.solvers(aoc.parse_days(args.days), [args.part] if args.part else None):
+        filename, sample = pick_input(solver, args.input_dir)
+        try:
+            t = bench(solver, filename, sample, args.repeat, args.warmup)
+            if args.memory:
+                m = memprof.measure(solver, filename, sample, top=0)
+                t.peak_traced = m.peak("traced")
+                t.peak_rss = m.peak("rss")
+        except Exception as e:
+            failed.append(f"day {solver.day} part {solver.part}: {type(e).__name__}: {e}")
+            continue
+        timings.append(t)
+        line = f"{t.day:3} {t.part:4} {t.input:>10} {fmt(t.parse)} {fmt(t.solve)} {fmt(t.total)}"
+        if args.memory:
+            line += f" {memprof.fmt_bytes(t.peak_traced)}  {memprof.fmt_bytes(t.peak_rss)}"
+        print(line)
+
+    for f in failed:
+        print("failed:", f, file=sys.stderr)
+
+    if args.save:
+        save_baseline(args.save, timings)
+
+    if args.baseline:
+        regressions = compare(timings, load_baseline(args.baseline), args.threshold)
+        for r in regressions:
+            print("REGRESSION:", r, file=sys.stderr)
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+from typing import Iterable, List, Sequence
+import functools
+
+from grid import Grid
+
+# Binary grids as Python ints.
+#
+# Lots of days only care whether a cell is one thing or not (rock / no rock,
+# '#' / '.'). Packing those into an int turns per-cell loops into a handful of
+# big-int operations that run in C:
+#
+#   rows(lines)       one int per row, bit x = column x. Comparing two rows is
+#                     an int compare, the number of cells where they differ is
+#                     popcount(a ^ b).
+#   BitGrid(grid)     one int for a whole Grid, bit i = Grid index i, so the
+#                     padding is there too and the Grid's offsets are shifts:
+#                     north is >> stride, east is << 1. Masking with the open
+#                     cells keeps anything from walking through walls or off
+#                     the edge.
+
+
+def popcount(x: int) -> int:
+    return x.bit_count()
+
+
+@functools.cache
+def _table(chars: bytes) -> bytes:
+    # translate() table: ASCII "1" for the bytes in chars, "0" for the rest
+    return bytes(0x31 if b in chars else 0x30 for b in range(256))
+
+
+def _bits(line, one: bytes) -> int:
+    # bit x set where line[x] is `one`
+    if isinstance(line, str):
+        line = line.encode()
+    return int(bytes(line).translate(_table(one))[::-1] or b"0", 2)
+
+
+def rows(lines: Sequence, one: bytes = b"#") -> List[int]:
+    return [_bits(line, one) for line in lines]
+
+
+def columns(lines: Sequence, one: bytes = b"#") -> List[int]:
+    # Same as rows() of the transposed grid
+    if not lines:
+        return []
+    if isinstance(lines[0], str):
+        lines = [line.encode() for line in lines]
+    return [_bits(bytes(column), one) for column in zip(*lines)]
+
+
+def mirror(lines: List[int], smudges: int = 0) -> int:
+    # Number of lines before the first mirror line where the reflection is off
+    # by exactly `smudges` cells, or 0 if there isn't one
+    for i in range(1, len(lines)):
+        diff = 0
+        for a, b in zip(reversed(lines[:i]), lines[i:]):
+            if a != b:
+                diff += (a ^ b).bit_count()
+                if diff > smudges:
+                    break
+        if diff == smudges:
+            return i
+    return 0
+
+
+class BitGrid:
+    def __init__(self, grid: Grid):
+        self.grid = grid
+        self.stride = grid.stride
+        self.height = grid.height
+        self.width = grid.width
+
+    def mask(self, chars) -> int:
+        # Every cell (padding included) whose byte is in chars
+        if isinstance(chars, str):
+            chars = chars.encode()
+        return int(bytes(self.grid.data).translate(_table(bytes(chars)))[::-1], 2)
+
+    def row_mask(self, y: int) -> int:
+        return ((1 << self.width) - 1) << self.grid.index(y, 0)
+
+    def bit(self, idx: int) -> int:
+        return 1 << idx
+
+    def shift(self, bits: int, offset: int) -> int:
+        # Move every cell by a Grid offset
+        return bits << offset if offset >= 0 else bits >> -offset
+
+    def spread(self, bits: int, open_cells: int) -> int:
+        # Every open cell one step away from a set cell
+        s = self.stride
+        return ((bits << 1) | (bits >> 1) | (bits << s) | (bits >> s)) & open_cells
+
+    def indices(self, bits: int) -> Iterable[int]:
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
@@ -0,0 +1,167 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+import itertools
+import math
+
+# Cycle detection for things that are eventually periodic.
+#
+# A "sequence" here is x0, f(x0), f(f(x0)), ... for a pure step function f on
+# hashable, comparable states (bytes of a grid, (node, instruction index)
+# tuples, ...). Once a state repeats, everything after it repeats too, so the
+# sequence is described exactly by
+#
+#   mu   index of the first state that is on the cycle
+#   lam  length of the cycle
+#
+# and the state at step n is the state at step reduce(n). brent() finds both
+# in O(mu + lam) steps while keeping only two states around; first_repeat()
+# takes exactly mu + lam steps but keeps all of them.
+#
+# For several independent sequences that each "hit" at certain steps (a ghost
+# standing on a Z node, a conjunction sending high), first_common() finds the
+# first step where they all hit at once: directly while any of them is still
+# in its transient, then by CRT over the cycle residues. That covers cycles
+# with non-zero offsets, where a plain LCM of the periods would be wrong.
+
+
+@dataclass
+class Cycle:
+    mu: int
+    lam: int
+
+    def reduce(self, n: int) -> int:
+        # Smallest index whose state equals the state at step n
+        if n < self.mu:
+            return n
+        return self.mu + (n - self.mu) % self.lam
+
+
+def brent(f: Callable[[Any], Any], x0) -> Cycle:
+    # Find lam: the hare runs ahead, the tortoise teleports to it every power
+    # of two steps, until they meet.
+    power = lam = 1
+    tortoise = x0
+    hare = f(x0)
+    while tortoise != hare:
+        if power == lam:
+            tortoise = hare
+            power *= 2
+            lam = 0
+        hare = f(hare)
+        lam += 1
+
+    # Find mu: start two pointers lam apart and walk them until they meet
+    tortoise = hare = x0
+    for _ in range(lam):
+        hare = f(hare)
+    mu = 0
+    while tortoise != hare:
+        tortoise = f(tortoise)
+        hare = f(hare)
+        mu += 1
+    return Cycle(mu, lam)
+
+
+def first_repeat(f: Callable[[Any], Any], x0) -> Tuple[Cycle, List[Any]]:
+    # Same answer as brent(), but remembers every state it has seen, so it
+    # takes exactly mu + lam steps and state_at() afterwards is free. Better
+    # when f is expensive and mu + lam states fit in memory.
+    seen = {}
+    states = []
+    x = x0
+    while x not in seen:
+        seen[x] = len(states)
+        states.append(x)
+        x = f(x)
+    mu = seen[x]
+    return Cycle(mu, len(states) - mu), states
+
+
+def iterate(f: Callable[[Any], Any], x0, n: int):
+    for _ in range(n):
+        x0 = f(x0)
+    return x0
+
+
+def state_at(f: Callable[[Any], Any], x0, n: int, cycle: Optional[Cycle] = None):
+    # The state after n steps, for any n (1e9 is fine)
+    if cycle is None:
+        cycle = brent(f, x0)
+    return iterate(f, x0, cycle.reduce(n))
+
+
+@dataclass
+class Stream:
+    cycle: Cycle
+    # Every step in [0, mu + lam) where the sequence hits
+    hits: List[int]
+    _hitset: set = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._hitset = set(self.hits)
+
+    @classmethod
+    def from_sequence(cls, f: Callable[[Any], Any], x0, hit: Callable[[Any], bool],
+                      cycle: Optional[Cycle] = None) -> "Stream":
+        if cycle is None:
+            cycle = brent(f, x0)
+        hits = []
+        x = x0
+        for n in range(cycle.mu + cycle.lam):
+            if hit(x):
+                hits.append(n)
+            x = f(x)
+        return cls(cycle, hits)
+
+    @classmethod
+    def from_states(cls, cycle: Cycle, states: List[Any],
+                    hit: Callable[[Any], bool]) -> "Stream":
+        # For the states list first_repeat() hands back
+        return cls(cycle, [n for n, x in enumerate(states) if hit(x)])
+
+    def hits_at(self, n: int) -> bool:
+        return self.cycle.reduce(n) in self._hitset
+
+    def residues(self) -> List[int]:
+        return [h for h in self.hits if h >= self.cycle.mu]
+
+
+def crt(congruences: Iterable[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    # Combine n = r (mod m) pairs, moduli need not be coprime. Returns (r, m)
+    # with m the lcm, or None if they contradict each other.
+    r, m = 0, 1
+    for r2, m2 in congruences:
+        g = math.gcd(m, m2)
+        if (r2 - r) % g:
+            return None
+        # Solve r + m*k = r2 (mod m2) for k
+        k = ((r2 - r) // g) * pow(m // g, -1, m2 // g) % (m2 // g)
+        r += m * k
+        m = m // g * m2
+        r %= m
+    return r, m
+
+
+def first_common(streams: List[Stream]) -> Optional[int]:
+    # First step at which every stream hits
+    if not streams:
+        return None
+    settled = max(s.cycle.mu for s in streams)
+
+    # Before everyone is on their cycle, just check each step. We walked at
+    # least this far to find the cycles anyway.
+    for n in range(settled):
+        if all(s.hits_at(n) for s in streams):
+            return n
+
+    best = None
+    for choice in itertools.product(*(s.residues() for s in streams)):
+        combined = crt((h, s.cycle.lam) for h, s in zip(choice, streams))
+        if combined is None:
+            continue
+        r, m = combined
+        if r < settled:
+            r += (settled - r + m - 1) // m * m
+        if best is None or r < best:
+            best = r
+    return best
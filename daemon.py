@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# Long-running solver process, so a session of queries pays for imports and
+# parsing once instead of once per query.
+#
+#   ./daemon.py serve                          # unix socket .aoc.sock
+#   ./daemon.py serve --tcp 127.0.0.1:7788
+#   ./daemon.py query 17 --part 2 --param MAX_STRAIGHT=10
+#   ./daemon.py query 21 --param steps=64 --input inputs/21.txt
+#   ./daemon.py query --stats
+#
+# Protocol is one JSON object per line each way, any number per connection:
+#
+#   {"op": "solve", "day": 17, "part": 2, "input": "/abs/17.txt",
+#    "sample": false, "params": {"max_straight": 10}}
+#   -> {"ok": true, "answer": 94, "ms": 3.1, "parse_ms": 0.2, "solve_ms": 2.9}
+#
+#   {"op": "stats"}    latency per day/part since startup
+#   {"op": "params", "day": 17, "part": 2}
+#   {"op": "ping"} / {"op": "shutdown"}
+#
+# Errors come back as {"ok": false, "error": "..."}. params are whatever extra
+# keyword arguments the day's main() takes (./aoc.py list shows them).
+#
+# What stays warm: the day modules (and anything they hang off functools
+# caches), and parsed grids/records via inputcache.keep_in_memory(). Days that
+# parse by hand still parse every time. Solves run one at a time on a single
+# worker thread since the days keep state in module globals. Forking next to
+# the event loop and executor threads can deadlock the child, so pool.py
+# doesn't fork in here and the days that split up their work run it all
+# in-process.
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+
+import aoc
+import inputcache
+import phases
+import pool
+
+DEFAULT_SOCKET = os.path.join(aoc.HERE, ".aoc.sock")
+
+# Latencies kept per day/part for the percentiles
+HISTORY = 1000
+
+
+class Metrics:
+    def __init__(self):
+        self.latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=HISTORY))
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.errors = 0
+
+    def record(self, key: str, ms: float):
+        self.latencies[key].append(ms)
+        self.counts[key] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        out = {}
+        for key, values in sorted(self.latencies.items()):
+            ordered = sorted(values)
+            out[key] = {
+                "count": self.counts[key],
+                "mean_ms": round(sum(ordered) / len(ordered), 3),
+                "p50_ms": round(percentile(ordered, 50), 3),
+                "p95_ms": round(percentile(ordered, 95), 3),
+                "max_ms": round(ordered[-1], 3),
+            }
+        return {"queries": out, "errors": self.errors}
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    # Nearest rank, ordered must be sorted and non-empty
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def solve(request: Dict[str, Any]) -> Dict[str, Any]:
+    day = int(request["day"])
+    part = int(request.get("part", 1))
+    solver = aoc.REGISTRY.get((day, part))
+    if solver is None:
+        raise ValueError(f"nothing registered for day {day} part {part}")
+    sample = bool(request.get("sample", False))
+    params = {str(k).lower(): v for k, v in (request.get("params") or {}).items()}
+
+    marks = {}
+    def on_mark(name):
+        marks.setdefault(name, time.perf_counter())
+
+    sink = io.StringIO()
+    start = time.perf_counter()
+    with phases.listening(on_mark), contextlib.redirect_stdout(sink), \
+            contextlib.redirect_stderr(sink):
+        answer = solver.run(filename=request.get("input"), sample=sample,
+                            params=params)
+    end = time.perf_counter()
+
+    response = {"ok": True, "answer": answer if isinstance(answer, (int, str)) else str(answer),
+                "ms": (end - start) * 1000}
+    if "parse" in marks:
+        response["parse_ms"] = (marks["parse"] - start) * 1000
+        response["solve_ms"] = (end - marks["parse"]) * 1000
+    if request.get("output"):
+        response["output"] = sink.getvalue()
+    return response
+
+
+class Daemon:
+    def __init__(self):
+        self.metrics = Metrics()
+        # One thread, so solves never overlap
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.stopping = asyncio.Event()
+
+    async def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op", "solve")
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"ok": True, **self.metrics.summary()}
+        if op == "params":
+            solver = aoc.REGISTRY[(int(request["day"]), int(request.get("part", 1)))]
+            return {"ok": True, "params": solver.params()}
+        if op == "shutdown":
+            self.stopping.set()
+            return {"ok": True}
+        if op != "solve":
+            raise ValueError(f"unknown op {op!r}")
+
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(self.executor, solve, request)
+        self.metrics.record(f"{int(request['day'])}.{int(request.get('part', 1))}",
+                            response["ms"])
+        return response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while not reader.at_eof():
+                line = await reader.readline()
+                if not line.strip():
+                    continue
+                try:
+                    response = await self.dispatch(json.loads(line))
+                except Exception as e:
+                    self.metrics.errors += 1
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away, or we're shutting down under it
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(path: Optional[str], host: Optional[str], port: Optional[int]):
+    daemon = Daemon()
+    if path is not None:
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(daemon.handle, path=path)
+        where = path
+    else:
+        server = await asyncio.start_server(daemon.handle, host=host, port=port)
+        where = f"{host}:{port}"
+    print(f"listening on {where}", file=sys.stderr)
+    async with server:
+        await daemon.stopping.wait()
+    daemon.executor.shutdown()
+    if path is not None and os.path.exists(path):
+        os.unlink(path)
+
+
+def parse_tcp(value: str):
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def connect(args) -> socket.socket:
+    if args.tcp:
+        return socket.create_connection(parse_tcp(args.tcp))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(args.socket)
+    return sock
+
+
+def request_once(args, request: Dict[str, Any]) -> Dict[str, Any]:
+    with connect(args) as sock, sock.makefile("rwb") as fp:
+        fp.write(json.dumps(request).encode() + b"\n")
+        fp.flush()
+        return json.loads(fp.readline())
+
+
+def cmd_serve(args) -> int:
+    pool.no_fork()
+    inputcache.keep_in_memory()
+    if args.tcp:
+        host, port = parse_tcp(args.tcp)
+        asyncio.run(serve(None, host, port))
+    else:
+        asyncio.run(serve(args.socket, None, None))
+    return 0
+
+
+def cmd_query(args) -> int:
+    if args.stats:
+        request = {"op": "stats"}
+    elif args.shutdown:
+        request = {"op": "shutdown"}
+    elif args.day is None:
+        print("need a day (or --stats / --shutdown)", file=sys.stderr)
+        return 1
+    else:
+        request = {"op": "solve", "day": args.day, "part": args.part,
+                   "sample": args.sample, "output": args.output,
+                   "params": dict(aoc.parse_param(p) for p in args.param)}
+        if not args.sample:
+            # The daemon's working directory isn't ours
+            request["input"] = os.path.abspath(args.input or f"{args.day:02}.txt")
+
+    response = request_once(args, request)
+    if not response.get("ok"):
+        print(response.get("error"), file=sys.stderr)
+        return 1
+    if args.json or "answer" not in response:
+        print(json.dumps(response, indent=2))
+        return 0
+    if response.get("output"):
+        print(response["output"], end="")
+    split = ""
+    if "parse_ms" in response:
+        split = f", parse {response['parse_ms']:.2f} solve {response['solve_ms']:.2f}"
+    print(f"day {args.day:2} part {args.part}: {response['answer']}  [{response['ms']:.2f}ms{split}]")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Solver daemon with warm parsed inputs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_address(p):
+        p.add_argument("--socket", default=DEFAULT_SOCKET,
+                       help=f"unix socket path (default {os.path.basename(DEFAULT_SOCKET)})")
+        p.add_argument("--tcp", metavar="HOST:PORT", help="use localhost TCP instead")
+
+    srv = sub.add_parser("serve", help="run the daemon")
+    add_address(srv)
+    srv.set_defaults(func=cmd_serve)
+
+    q = sub.add_parser("query", help="ask a running daemon")
+    add_address(q)
+    q.add_argument("day", type=int, nargs="?")
+    q.add_argument("--part", type=int, choices=(1, 2), default=1)
+    q.add_argument("--input", help="puzzle input (default NN.txt here)")
+    q.add_argument("--sample", action="store_true")
+    q.add_argument("--param", action="append", default=[], metavar="NAME=VALUE")
+    q.add_argument("--output", action="store_true", help="also show what the day printed")
+    q.add_argument("--json", action="store_true", help="print the raw response")
+    q.add_argument("--stats", action="store_true", help="latency per day/part")
+    q.add_argument("--shutdown", action="store_true")
+    q.set_defaults(func=cmd_query)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# Differential testing: run a fast solver and a slow reference on the same
+# random inputs and complain when they disagree.
+#
+#   ./difftest.py                       # every pair, 50 cases each
+#   ./difftest.py 12 --cases 500 --scale 20
+#   ./difftest.py 01 --save-failures failures/
+#
+# Inputs come from gen.py (small scales, so the references finish). When a
+# case disagrees we shrink it by throwing away lines for as long as the two
+# still disagree, and print the smallest input we got to. Both sides are
+# timed, so the summary doubles as a measured speedup.
+#
+# Pairs:
+#   12  handle() (the memoized partial()) vs brute_force(), part 1, lines with
+#       at most MAX_UNKNOWNS '?'s so 2**n stays small
+#   07  07.py vs 07_part1.py on hands without jokers, where the two rules
+#       have to agree
+#   dial  shortest.py's A* on Dial's bucket ring vs plain heap Dijkstra, on
+#       random weighted grids with two sources whose f values are far
+#       apart (one at each end)
+#   01  01.py part 2 vs 01_original.py, which only reads test.txt from the
+#       current directory and runs on import, so it gets its own process
+#       (its timings include interpreter startup). Its regex is anchored at
+#       the end of the line, so lines get cut after their last digit or
+#       digit word first; that's the input it was written for.
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import aoc
+import gen
+import shortest
+
+# 12's brute force is 2**unknowns per line
+MAX_UNKNOWNS = 12
+
+
+@dataclass
+class Pair:
+    name: str
+    day: int
+    fast: Callable[[str], Any]
+    reference: Callable[[str], Any]
+    # Generated input -> input both sides can handle
+    prepare: Callable[[str], str] = lambda text: text
+    scale: int = 20
+    # (scale, seed) -> input, when gen.py doesn't have one
+    generate: Optional[Callable[[int, int], str]] = None
+
+
+@dataclass
+class Outcome:
+    answer: Any
+    error: Optional[str]
+    seconds: float
+
+    def same(self, other: "Outcome") -> bool:
+        return (self.answer, self.error) == (other.answer, other.error)
+
+    def __str__(self):
+        return f"({self.error})" if self.error is not None else repr(self.answer)
+
+
+def attempt(func: Callable[[str], Any], text: str) -> Outcome:
+    start = time.perf_counter()
+    try:
+        answer, error = func(text), None
+    except Exception as e:
+        answer, error = None, type(e).__name__
+    return Outcome(answer, error, time.perf_counter() - start)
+
+
+def via_solver(day: int, part: int) -> Callable[[str], Any]:
+    solver = aoc.REGISTRY[(day, part)]
+    def run(text):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as fp:
+            fp.write(text)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                return solver.run(filename=fp.name)
+        finally:
+            os.unlink(fp.name)
+    return run
+
+
+def via_script(script: str, input_name: str) -> Callable[[str], Any]:
+    # For scripts that hardcode their input file and print the answer last
+    def run(text):
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, input_name), "w") as fp:
+                fp.write(text)
+            out = subprocess.run([sys.executable, os.path.join(aoc.HERE, script)],
+                                 cwd=tmp, capture_output=True, text=True)
+        if out.returncode:
+            raise RuntimeError(out.stderr.strip().splitlines()[-1])
+        return int(out.stdout.split()[-1])
+    return run
+
+
+def day12(part2=False) -> Tuple[Callable[[str], Any], Callable[[str], Any]]:
+    module = aoc.REGISTRY[(12, 1)].load()
+    def fast(text):
+        return sum(module.handle(line, part2) for line in text.splitlines() if line.strip())
+    def reference(text):
+        return sum(module.brute_force(line, part2) for line in text.splitlines() if line.strip())
+    return fast, reference
+
+
+def weight_grid(scale: int, seed: int) -> str:
+    rng = random.Random(seed)
+    return "".join("".join(rng.choice("123456789") for _ in range(scale)) + "\n"
+                   for _ in range(scale))
+
+
+def dial_paths(heap: bool) -> Callable[[str], Any]:
+    def run(text):
+        rows = text.split()
+        height, width = len(rows), len(rows[0])
+        weights = [int(ch) for row in rows for ch in row]
+        exit_y, exit_x = height - 1, width - 1
+
+        def neighbors(u):
+            y, x = divmod(u, width)
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                if 0 <= ny < height and 0 <= nx < width:
+                    v = ny * width + nx
+                    yield v, weights[v]
+
+        def heuristic(u):
+            y, x = divmod(u, width)
+            return (exit_y - y) + (exit_x - x)
+
+        sources = [0, len(weights) - 2]
+        if heap:
+            # Plain Dijkstra, no heuristic, no ring
+            paths = shortest.shortest_paths(len(weights), sources, neighbors,
+                                            shortest.MAX_DIAL_WEIGHT + 1)
+        else:
+            paths = shortest.shortest_paths(len(weights), sources, neighbors, 9,
+                                            heuristic=heuristic)
+        return tuple(paths.dist)
+    return run
+
+
+def few_unknowns(text: str) -> str:
+    return "".join(line for line in text.splitlines(keepends=True)
+                   if line.count("?") <= MAX_UNKNOWNS)
+
+
+_DIGIT = re.compile(r"(?=(\d|one|two|three|four|five|six|seven|eight|nine))")
+
+def ends_on_digit(text: str) -> str:
+    lines = []
+    for line in text.splitlines():
+        ends = [m.start() + len(m.group(1)) for m in _DIGIT.finditer(line)]
+        if ends:
+            lines.append(line[:max(ends)] + "\n")
+    return "".join(lines)
+
+
+def no_jokers(text: str) -> str:
+    return text.replace("J", "T")
+
+
+def build_pairs() -> Dict[str, Pair]:
+    fast12, ref12 = day12()
+    pairs = [
+        Pair("12", 12, fast12, ref12, few_unknowns, scale=50),
+        Pair("07", 7, via_solver(7, 2), via_solver(7, 1), no_jokers, scale=50),
+        Pair("dial", 0, dial_paths(heap=False), dial_paths(heap=True), scale=20,
+             generate=weight_grid),
+        Pair("01", 1, via_solver(1, 2), via_script("01_original.py", "test.txt"),
+             ends_on_digit, scale=20),
+    ]
+    return {p.name: p for p in pairs}
+
+
+def shrink(text: str, fails: Callable[[str], bool]) -> str:
+    # Delta debugging over lines: drop chunks, halving the chunk size
+    # whenever nothing can be dropped, until single lines won't go either.
+    lines = text.splitlines(keepends=True)
+    chunk = max(1, len(lines) // 2)
+    while True:
+        i = 0
+        dropped = False
+        while i < len(lines):
+            candidate = lines[:i] + lines[i + chunk:]
+            if candidate and fails("".join(candidate)):
+                lines = candidate
+                dropped = True
+            else:
+                i += chunk
+        if chunk == 1 and not dropped:
+            return "".join(lines)
+        if not dropped:
+            chunk = max(1, chunk // 2)
+
+
+@dataclass
+class Report:
+    name: str
+    cases: int = 0
+    failures: int = 0
+    fast_seconds: float = 0.0
+    reference_seconds: float = 0.0
+
+    def line(self) -> str:
+        speedup = self.reference_seconds / self.fast_seconds if self.fast_seconds else float("inf")
+        def rate(seconds):
+            return f"{self.cases / seconds:9.1f}/s" if seconds else "        -"
+        return (f"{self.name:>4} {self.cases:6} {self.failures:6}  fast {rate(self.fast_seconds)}"
+                f"  reference {rate(self.reference_seconds)}  speedup {speedup:7.1f}x")
+
+
+def check(pair: Pair, cases: int, seed: int, scale: Optional[int],
+          save_dir: Optional[str] = None) -> Report:
+    report = Report(pair.name)
+    scale = scale or pair.scale
+    for n in range(seed, seed + cases):
+        text = pair.generate(scale, n) if pair.generate else gen.generate(pair.day, scale, n)
+        text = pair.prepare(text)
+        fast = attempt(pair.fast, text)
+        ref = attempt(pair.reference, text)
+        report.cases += 1
+        report.fast_seconds += fast.seconds
+        report.reference_seconds += ref.seconds
+        if fast.same(ref):
+            continue
+
+        report.failures += 1
+        small = shrink(text, lambda t: not attempt(pair.fast, t).same(attempt(pair.reference, t)))
+        print(f"pair {pair.name} seed {n}: fast {attempt(pair.fast, small)} "
+              f"reference {attempt(pair.reference, small)} on:")
+        print("    " + small.rstrip("\n").replace("\n", "\n    "))
+        if save_dir is not None:
+            os.makedirs(save_dir, exist_ok=True)
+            with open(os.path.join(save_dir, f"{pair.name}_seed{n}.txt"), "w") as fp:
+                fp.write(small)
+    return report
+
+
+def main(argv=None) -> int:
+    pairs = build_pairs()
+    parser = argparse.ArgumentParser(description="Fast solvers vs reference implementations")
+    parser.add_argument("pairs", nargs="*", default=["all"],
+                        help=f"which pairs ({', '.join(pairs)}), or 'all'")
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="first generator seed")
+    parser.add_argument("--scale", type=int, help="gen.py scale (default per pair, kept small)")
+    parser.add_argument("--save-failures", metavar="DIR",
+                        help="write each shrunk failing input here")
+    args = parser.parse_args(argv)
+
+    names = list(pairs) if not args.pairs or "all" in args.pairs \
+        else [n if n in pairs else n.lstrip("0").zfill(2) for n in args.pairs]
+    unknown = [n for n in names if n not in pairs]
+    if unknown:
+        parser.error(f"no pair for {', '.join(unknown)}")
+
+    reports = [check(pairs[n], args.cases, args.seed, args.scale, args.save_failures)
+               for n in names]
+    print(f"{'pair':>4} {'cases':>6} {'failed':>6}")
+    for r in reports:
+        print(r.line())
+    return 1 if any(r.failures for r in reports) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
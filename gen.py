@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+# Synthetic puzzle inputs, so we can see how the solvers scale past the real
+# input sizes.
+#
+#   ./gen.py 10 --scale 1000 --seed 1 > 10.txt
+#   ./gen.py all --out inputs/          # then ./bench.py --input-dir inputs
+#
+# Every generator takes a seeded random.Random and a scale (what "scale" means
+# depends on the day: lines, grid side, number of bricks...) and returns the
+# whole input as a string. Same seed + scale always gives the same input.
+#
+# The inputs are built so the solvers here accept them, which sometimes means
+# baking in the same hidden structure the real inputs had (day 8's cycles, day
+# 20's counters, day 24's rock).
+from typing import Callable, Dict, List, Set, Tuple
+import argparse
+import math
+import os
+import random
+import string
+import sys
+
+GENERATORS: Dict[int, Callable[[random.Random, int], str]] = {}
+DEFAULT_SCALE: Dict[int, int] = {}
+
+def generator(day: int, default_scale: int):
+    def register(fn):
+        GENERATORS[day] = fn
+        DEFAULT_SCALE[day] = default_scale
+        return fn
+    return register
+
+def generate(day: int, scale: int = None, seed: int = 0) -> str:
+    if scale is None:
+        scale = DEFAULT_SCALE[day]
+    rng = random.Random(f"{day}:{scale}:{seed}")
+    return GENERATORS[day](rng, scale)
+
+
+def unique_names(rng, count, length, alphabet=string.ascii_lowercase, exclude=()) -> List[str]:
+    while len(alphabet) ** length < count + len(exclude):
+        length += 1
+    names = set()
+    exclude = set(exclude)
+    while len(names) < count:
+        name = "".join(rng.choice(alphabet) for _ in range(length))
+        if name not in exclude:
+            names.add(name)
+    names = sorted(names)
+    rng.shuffle(names)
+    return names
+
+def random_primes(rng, count, low, high) -> List[int]:
+    primes = [p for p in range(max(low, 2), high)
+              if all(p % d for d in range(2, math.isqrt(p) + 1))]
+    assert len(primes) >= count, f"not enough primes in [{low}, {high})"
+    return rng.sample(primes, count)
+
+
+# Closed loops on a grid, used by days 10 and 18.
+#
+# Take a random spanning tree over an h*w grid of "blocks". Each block is 3x3
+# cells with the loop running around its outer ring, and every tree edge
+# splices the rings of two neighboring blocks together. Since it's a tree the
+# result is always one simple closed loop, and the middle of each block (plus
+# the cells between spliced blocks) ends up inside it.
+def spanning_tree(rng, h, w) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    edges = []
+    for y in range(h):
+        for x in range(w):
+            if x + 1 < w:
+                edges.append(((y, x), (y, x + 1)))
+            if y + 1 < h:
+                edges.append(((y, x), (y + 1, x)))
+    rng.shuffle(edges)
+    parent = {(y, x): (y, x) for y in range(h) for x in range(w)}
+    def find(a):
+        while parent[a] != a:
+            parent[a] = parent[parent[a]]
+            a = parent[a]
+        return a
+    tree = []
+    for a, b in edges:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[ra] = rb
+            tree.append((a, b))
+    return tree
+
+def tree_loop(rng, h, w, margin=0) -> List[Tuple[int, int]]:
+    links: Dict[Tuple[int, int], Set[Tuple[int, int]]] = {}
+    def link(a, b):
+        links.setdefault(a, set()).add(b)
+        links.setdefault(b, set()).add(a)
+    def unlink(a, b):
+        links[a].discard(b)
+        links[b].discard(a)
+
+    def cell(by, bx, dy, dx):
+        return (margin + 3 * by + dy, margin + 3 * bx + dx)
+    ring = [(0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0)]
+    for by in range(h):
+        for bx in range(w):
+            for i in range(len(ring)):
+                link(cell(by, bx, *ring[i]), cell(by, bx, *ring[(i + 1) % len(ring)]))
+
+    for (ay, ax), (by, bx) in spanning_tree(rng, h, w):
+        if ay == by:
+            # a is left of b
+            unlink(cell(ay, ax, 0, 2), cell(ay, ax, 1, 2))
+            unlink(cell(ay, ax, 1, 2), cell(ay, ax, 2, 2))
+            unlink(cell(by, bx, 0, 0), cell(by, bx, 1, 0))
+            unlink(cell(by, bx, 1, 0), cell(by, bx, 2, 0))
+            link(cell(ay, ax, 0, 2), cell(by, bx, 0, 0))
+            link(cell(ay, ax, 2, 2), cell(by, bx, 2, 0))
+        else:
+            # a is above b
+            unlink(cell(ay, ax, 2, 0), cell(ay, ax, 2, 1))
+            unlink(cell(ay, ax, 2, 1), cell(ay, ax, 2, 2))
+            unlink(cell(by, bx, 0, 0), cell(by, bx, 0, 1))
+            unlink(cell(by, bx, 0, 1), cell(by, bx, 0, 2))
+            link(cell(ay, ax, 2, 0), cell(by, bx, 0, 0))
+            link(cell(ay, ax, 2, 2), cell(by, bx, 0, 2))
+
+    # Walk it in order
+    start = cell(0, 0, 0, 0)
+    loop = [start]
+    prev, cur = None, start
+    while True:
+        nxt = next(n for n in sorted(links[cur]) if n != prev)
+        if nxt == start:
+            break
+        loop.append(nxt)
+        prev, cur = cur, nxt
+    return loop
+
+
+@generator(1, 1000)
+def gen_01(rng, scale):
+    words = ["one", "two", "three", "four", "five", "six", "seven", "eight", "nine"]
+    lines = []
+    for _ in range(scale):
+        pieces = []
+        for _ in range(rng.randint(2, 8)):
+            roll = rng.random()
+            if roll < 0.3:
+                pieces.append(rng.choice(words))
+            elif roll < 0.5:
+                pieces.append(str(rng.randint(1, 9)))
+            else:
+                pieces.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 5))))
+        # Part 1 needs at least one real digit on every line
+        pieces.insert(rng.randint(0, len(pieces)), str(rng.randint(1, 9)))
+        lines.append("".join(pieces))
+    return "\n".join(lines) + "\n"
+
+
+@generator(2, 1000)
+def gen_02(rng, scale):
+    lines = []
+    for game in range(1, scale + 1):
+        draws = []
+        for _ in range(rng.randint(1, 6)):
+            colors = rng.sample(["red", "green", "blue"], rng.randint(1, 3))
+            draws.append(", ".join(f"{rng.randint(1, 20)} {color}" for color in colors))
+        lines.append(f"Game {game}: " + "; ".join(draws))
+    return "\n".join(lines) + "\n"
+
+
+@generator(3, 140)
+def gen_03(rng, scale):
+    rows = []
+    for _ in range(scale):
+        row = []
+        while len(row) < scale:
+            roll = rng.random()
+            if roll < 0.15:
+                number = str(rng.randint(1, 999))
+                if len(row) + len(number) + 1 > scale:
+                    row.append(".")
+                    continue
+                row.extend(number)
+                row.append(".")
+            elif roll < 0.20:
+                row.append(rng.choice("*#+$/=%@&-"))
+            else:
+                row.append(".")
+        rows.append("".join(row[:scale]))
+    return "\n".join(rows) + "\n"
+
+
+@generator(4, 200)
+def gen_04(rng, scale):
+    # Keep the expected number of matches under one, otherwise the number of
+    # copies in part 2 grows exponentially down the list.
+    lines = []
+    width = len(str(scale))
+    for card in range(1, scale + 1):
+        matches = rng.choices([0, 1, 2, 3], weights=[50, 30, 15, 5])[0]
+        pool = rng.sample(range(1, 100), 35)
+        winning = pool[:10]
+        yours = winning[:matches] + pool[10:10 + 25 - matches]
+        rng.shuffle(yours)
+        lines.append(f"Card {card:>{width}}: " + " ".join(f"{i:2}" for i in winning)
+                     + " | " + " ".join(f"{i:2}" for i in yours))
+    return "\n".join(lines) + "\n"
+
+
+@generator(5, 100000)
+def gen_05(rng, scale):
+    # scale is roughly the total number of seeds part 2 walks through
+    space = 1 << 32
+    pairs = 10
+    seeds = []
+    for _ in range(pairs):
+        length = max(1, scale // pairs + rng.randint(-scale // (4 * pairs), scale // (4 * pairs)))
+        seeds.append((rng.randrange(space - length), length))
+
+    names = ["seed", "soil", "fertilizer", "water", "light", "temperature", "humidity", "location"]
+    out = ["seeds: " + " ".join(f"{start} {length}" for start, length in seeds), ""]
+    for src, dest in zip(names, names[1:]):
+        out.append(f"{src}-to-{dest} map:")
+        # Chop the space into pieces and shuffle where they land
+        cuts = sorted(rng.sample(range(1, space), rng.randint(8, 30)))
+        bounds = [0] + cuts + [space]
+        pieces = [(lo, hi - lo) for lo, hi in zip(bounds, bounds[1:])]
+        dests = pieces[:]
+        rng.shuffle(dests)
+        dest_start = 0
+        for (src_start, length) in dests:
+            if rng.random() < 0.9:
+                out.append(f"{dest_start} {src_start} {length}")
+            dest_start += length
+        out.append("")
+    return "\n".join(out)
+
+
+@generator(6, 4)
+def gen_06(rng, scale):
+    # Keep the concatenated part 2 race brute-forceable
+    times, distances = [], []
+    for _ in range(scale):
+        t = rng.randint(7, 99)
+        times.append(t)
+        distances.append(rng.randint(1, t * t // 4 - 1))
+    return ("Time:     " + " ".join(f"{t:5}" for t in times) + "\n"
+            + "Distance: " + " ".join(f"{d:5}" for d in distances) + "\n")
+
+
+@generator(7, 1000)
+def gen_07(rng, scale):
+    cards = "AKQJT98765432"
+    return "".join("".join(rng.choice(cards) for _ in range(5)) + f" {rng.randint(1, 1000)}\n"
+                   for _ in range(scale))
+
+
+@generator(8, 6)
+def gen_08(rng, scale):
+    # 08.py part 2 assumes the real input's structure: 271 instructions, and
+    # each ghost's path is a loop that only ever hits its Z node on multiples
+    # of 271. So each ghost gets a ring of 271 * p nodes (p a small prime).
+    # scale is the number of ghosts; the first one is AAA -> ZZZ for part 1.
+    insn_len = 271
+    instructions = "".join(rng.choice("LR") for _ in range(insn_len))
+    primes = random_primes(rng, scale, 2, 80)
+    total = sum(p * insn_len for p in primes)
+    alphabet = string.ascii_uppercase[1:-1] + string.digits
+    plain = iter(unique_names(rng, total, 3, alphabet))
+    starts = unique_names(rng, scale, 2, string.ascii_uppercase + string.digits, exclude={"AA"})
+    ends = unique_names(rng, scale, 2, string.ascii_uppercase + string.digits, exclude={"ZZ"})
+
+    nodes = []
+    for ghost, p in enumerate(primes):
+        start = "AAA" if ghost == 0 else starts[ghost] + "A"
+        end = "ZZZ" if ghost == 0 else ends[ghost] + "Z"
+        ring = [next(plain) for _ in range(p * insn_len - 1)] + [end]
+        nodes.append((start, ring[0], ring[0]))
+        for i, name in enumerate(ring):
+            nxt = ring[(i + 1) % len(ring)]
+            nodes.append((name, nxt, nxt))
+    rng.shuffle(nodes)
+    return instructions + "\n\n" + "".join(f"{n} = ({l}, {r})\n" for n, l, r in nodes)
+
+
+@generator(9, 200)
+def gen_09(rng, scale):
+    lines = []
+    for _ in range(scale):
+        coeffs = [rng.randint(-9, 9) for _ in range(rng.randint(1, 6))]
+        x0 = rng.randint(-5, 5)
+        values = [sum(c * (x0 + x) ** i for i, c in enumerate(coeffs)) for x in range(21)]
+        lines.append(" ".join(str(v) for v in values))
+    return "\n".join(lines) + "\n"
+
+
+@generator(10, 140)
+def gen_10(rng, scale):
+    # scale is the grid side
+    blocks = max(1, (scale - 2) // 3)
+    size = 3 * blocks + 2
+    loop = tree_loop(rng, blocks, blocks, margin=1)
+    grid = [[rng.choice("|-LJ7F..") for _ in range(size)] for _ in range(size)]
+    shape = {
+        frozenset([(-1, 0), (1, 0)]): "|",
+        frozenset([(0, -1), (0, 1)]): "-",
+        frozenset([(-1, 0), (0, 1)]): "L",
+        frozenset([(-1, 0), (0, -1)]): "J",
+        frozenset([(1, 0), (0, -1)]): "7",
+        frozenset([(1, 0), (0, 1)]): "F",
+    }
+    for i, (y, x) in enumerate(loop):
+        py, px = loop[i - 1]
+        ny, nx = loop[(i + 1) % len(loop)]
+        grid[y][x] = shape[frozenset([(py - y, px - x), (ny - y, nx - x)])]
+    on_loop = set(loop)
+    sy, sx = rng.choice(loop)
+    grid[sy][sx] = "S"
+    # The solver treats S as connecting in every direction, so don't leave any
+    # junk next to it that could fake a second way back.
+    for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        if (sy + dy, sx + dx) not in on_loop:
+            grid[sy + dy][sx + dx] = "."
+    return "\n".join("".join(row) for row in grid) + "\n"
+
+
+@generator(11, 140)
+def gen_11(rng, scale):
+    empty_rows = set(rng.sample(range(scale), scale // 15))
+    empty_cols = set(rng.sample(range(scale), scale // 15))
+    rows = []
+    for y in range(scale):
+        if y in empty_rows:
+            rows.append("." * scale)
+            continue
+        rows.append("".join("#" if x not in empty_cols and rng.random() < 0.02 else "."
+                            for x in range(scale)))
+    return "\n".join(rows) + "\n"
+
+
+@generator(12, 1000)
+def gen_12(rng, scale):
+    lines = []
+    for _ in range(scale):
+        groups = [rng.randint(1, 5) for _ in range(rng.randint(1, 5))]
+        cells = []
+        for group in groups:
+            cells.extend("." * rng.randint(1 if cells else 0, 3))
+            cells.extend("#" * group)
+        cells.extend("." * rng.randint(0, 3))
+        record = "".join(ch if rng.random() < 0.4 else "?" for ch in cells)
+        lines.append(f"{record} {','.join(map(str, groups))}")
+    return "\n".join(lines) + "\n"
+
+
+@generator(13, 100)
+def gen_13(rng, scale):
+    # Each note mirrors perfectly on a row line, and mirrors on a column line
+    # except for one smudge, which is what part 2 is looking for.
+    def fold(i, line):
+        if i < line:
+            return i
+        mirrored = 2 * line - 1 - i
+        return mirrored if mirrored >= 0 else i
+
+    notes = []
+    for _ in range(scale):
+        height = rng.randrange(7, 18, 2)
+        width = rng.randrange(7, 18, 2)
+        row_line = rng.choice([i for i in range(1, height) if 2 * i != height])
+        col_line = rng.randint(1, width - 1)
+        base = [[rng.choice("#.") for _ in range(width)] for _ in range(height)]
+        note = [[base[fold(y, row_line)][fold(x, col_line)] for x in range(width)]
+                for y in range(height)]
+        # Smudge a row the row mirror doesn't reach but the column mirror does
+        reach = min(row_line, height - row_line)
+        y = rng.choice([i for i in range(height) if not (row_line - reach <= i < row_line + reach)])
+        reach = min(col_line, width - col_line)
+        x = rng.randrange(col_line - reach, col_line + reach)
+        note[y][x] = "#" if note[y][x] == "." else "."
+        notes.append("\n".join("".join(row) for row in note))
+    return "\n\n".join(notes) + "\n"
+
+
+@generator(14, 100)
+def gen_14(rng, scale):
+    return "".join("".join(rng.choices("O#.", weights=[20, 10, 70], k=scale)) + "\n"
+                   for _ in range(scale))
+
+
+@generator(15, 4000)
+def gen_15(rng, scale):
+    labels = unique_names(rng, max(1, scale // 4), 2)
+    steps = []
+    for _ in range(scale):
+        label = rng.choice(labels)
+        if rng.random() < 0.3:
+            steps.append(f"{label}-")
+        else:
+            steps.append(f"{label}={rng.randint(1, 9)}")
+    return ",".join(steps) + "\n"
+
+
+@generator(16, 110)
+def gen_16(rng, scale):
+    return "".join("".join(rng.choices(".|-/\\", weights=[90, 2.5, 2.5, 2.5, 2.5], k=scale)) + "\n"
+                   for _ in range(scale))
+
+
+@generator(17, 141)
+def gen_17(rng, scale):
+    return "".join("".join(rng.choice("123456789") for _ in range(scale)) + "\n"
+                   for _ in range(scale))
+
+
+@generator(18, 30)
+def gen_18(rng, scale):
+    # One loop, two sets of edge lengths: small ones in the direction/count
+    # columns for part 1, big ones hidden in the color for part 2. Stretching
+    # the rows/columns of a simple loop can't make it cross itself.
+    blocks = max(1, scale // 3)
+    loop = tree_loop(rng, blocks, blocks)
+    size = 3 * blocks
+    def stretch(low, high):
+        widths = [rng.randint(low, high) for _ in range(size)]
+        pos = [0]
+        for w in widths:
+            pos.append(pos[-1] + w)
+        return pos
+    ys1, xs1 = stretch(1, 9), stretch(1, 9)
+    ys2, xs2 = stretch(1000, 60000), stretch(1000, 60000)
+
+    letters = {(0, 1): "R", (1, 0): "D", (0, -1): "L", (-1, 0): "U"}
+    codes = {"R": 0, "D": 1, "L": 2, "U": 3}
+    # Merge straight runs into single edges
+    corners = [p for i, p in enumerate(loop)
+               if (p[0] - loop[i - 1][0], p[1] - loop[i - 1][1])
+               != (loop[(i + 1) % len(loop)][0] - p[0], loop[(i + 1) % len(loop)][1] - p[1])]
+    lines = []
+    for i, (y, x) in enumerate(corners):
+        ny, nx = corners[(i + 1) % len(corners)]
+        step = ((ny > y) - (ny < y), (nx > x) - (nx < x))
+        letter = letters[step]
+        short = abs(ys1[ny] - ys1[y]) + abs(xs1[nx] - xs1[x])
+        long = abs(ys2[ny] - ys2[y]) + abs(xs2[nx] - xs2[x])
+        lines.append(f"{letter} {short} (#{long:05x}{codes[letter]})")
+    return "\n".join(lines) + "\n"
+
+
+@generator(19, 500)
+def gen_19(rng, scale):
+    # scale is the number of workflows; parts are 2x that. Workflows form a
+    # tree under "in" so part 2's state count stays proportional to scale.
+    names = ["in"] + unique_names(rng, scale - 1, 2, exclude={"in"})
+    next_child = 1
+    workflows = []
+    for name in names:
+        rules = []
+        nrules = rng.randint(2, 4)
+        for r in range(nrules):
+            # The first slot always takes a child (while there are any left)
+            # so every workflow ends up referenced by exactly one parent.
+            if next_child < len(names) and (r == 0 or rng.random() < 0.5):
+                target = names[next_child]
+                next_child += 1
+            else:
+                target = rng.choice("AR")
+            if r == nrules - 1:
+                rules.append(target)
+            else:
+                rules.append(f"{rng.choice('xmas')}{rng.choice('<>')}{rng.randint(1, 4000)}:{target}")
+        workflows.append(f"{name}{{{','.join(rules)}}}")
+    rng.shuffle(workflows)
+    parts = [f"{{x={rng.randint(1, 4000)},m={rng.randint(1, 4000)},a={rng.randint(1, 4000)},s={rng.randint(1, 4000)}}}"
+             for _ in range(scale * 200 // 100)]
+    return "\n".join(workflows) + "\n\n" + "\n".join(parts) + "\n"
+
+
+@generator(20, 4)
+def gen_20(rng, scale):
+    # scale counters, each a chain of 12 flip-flops with a conjunction that
+    # resets it at a prime period, then an inverter per counter feeding one
+    # conjunction in front of rx. That's the shape 20.py's part 2 expects.
+    bits = 12
+    periods = random_primes(rng, scale, 1 << (bits - 1), 1 << bits)
+    names = iter(unique_names(rng, scale * (bits + 2) + 1, 2, exclude={"rx"}))
+    final = next(names)
+    lines = []
+    heads = []
+    for period in periods:
+        flops = [next(names) for _ in range(bits)]
+        conj = next(names)
+        inv = next(names)
+        heads.append(flops[0])
+        conj_outputs = [flops[0]]
+        for i, flop in enumerate(flops):
+            outputs = []
+            if i + 1 < bits:
+                outputs.append(flops[i + 1])
+            if period >> i & 1:
+                outputs.append(conj)
+            elif i:
+                conj_outputs.append(flop)
+            lines.append(f"%{flop} -> {', '.join(outputs)}")
+        lines.append(f"&{conj} -> {', '.join(conj_outputs + [inv])}")
+        lines.append(f"&{inv} -> {final}")
+    lines.append(f"&{final} -> rx")
+    lines.append(f"broadcaster -> {', '.join(heads)}")
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n"
+
+
+@generator(21, 131)
+def gen_21(rng, scale):
+    grid = [["#" if rng.random() < 0.1 else "." for _ in range(scale)] for _ in range(scale)]
+    grid[scale // 2][scale // 2] = "S"
+    return "\n".join("".join(row) for row in grid) + "\n"
+
+
+@generator(22, 300)
+def gen_22(rng, scale):
+    occupied = set()
+    lines = []
+    while len(lines) < scale:
+        axis = rng.randrange(3)
+        length = rng.randint(1, 4) if axis == 2 else rng.randint(1, 5)
+        start = [rng.randint(0, 9), rng.randint(0, 9), rng.randint(1, scale * 2)]
+        end = start[:]
+        end[axis] += length - 1
+        if end[0] > 9 or end[1] > 9:
+            continue
+        cubes = {(x, y, z) for x in range(start[0], end[0] + 1)
+                 for y in range(start[1], end[1] + 1) for z in range(start[2], end[2] + 1)}
+        if cubes & occupied:
+            continue
+        occupied |= cubes
+        lines.append(f"{start[0]},{start[1]},{start[2]}~{end[0]},{end[1]},{end[2]}")
+    return "\n".join(lines) + "\n"
+
+
+@generator(24, 300)
+def gen_24(rng, scale):
+    # Every hailstone gets hit by the same rock thrown from P with velocity V
+    # at some whole-number time, like the real input.
+    rock_p = [rng.randint(2 * 10**14, 4 * 10**14) for _ in range(3)]
+    rock_v = [rng.randint(-300, 300) for _ in range(3)]
+    times = rng.sample(range(10**11, 10**12), scale)
+    lines = []
+    for t in times:
+        v = [rv + rng.randint(-100, 100) or 1 for rv in rock_v]
+        p = [rp + (rv - hv) * t for rp, rv, hv in zip(rock_p, rock_v, v)]
+        lines.append(f"{p[0]}, {p[1]}, {p[2]} @ {v[0]}, {v[1]}, {v[2]}")
+    return "\n".join(lines) + "\n"
+
+
+@generator(25, 1500)
+def gen_25(rng, scale):
+    # Two well connected halves joined by exactly three edges. Each half needs
+    # enough nodes for a ring plus three chords per node (and for the cut
+    # between the halves to be the only 3-edge one), so small scales get
+    # bumped up.
+    scale = max(scale, 20)
+    names = unique_names(rng, scale, 3)
+    split = rng.randint(scale // 3, 2 * scale // 3)
+    halves = [names[:split], names[split:]]
+    edges = set()
+    for half in halves:
+        for i, node in enumerate(half):
+            # Ring plus three chords to nodes that aren't already neighbors
+            # keeps every node at degree >= 5
+            ring = {half[i - 1], half[(i + 1) % len(half)]}
+            chords = [other for other in half if other != node and other not in ring]
+            for other in (*ring, *rng.sample(chords, 3)):
+                edges.add(tuple(sorted((node, other))))
+    for a, b in zip(rng.sample(halves[0], 3), rng.sample(halves[1], 3)):
+        edges.add(tuple(sorted((a, b))))
+
+    adjacency: Dict[str, List[str]] = {}
+    for a, b in edges:
+        if rng.random() < 0.5:
+            a, b = b, a
+        adjacency.setdefault(a, []).append(b)
+    lines = [f"{node}: {' '.join(others)}" for node, others in adjacency.items()]
+    rng.shuffle(lines)
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic puzzle inputs")
+    parser.add_argument("days", nargs="+", help="day numbers, or 'all'")
+    parser.add_argument("--scale", type=int, help="size knob (meaning depends on the day)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write NN.txt files into this directory instead of stdout")
+    args = parser.parse_args(argv)
+
+    days = sorted(GENERATORS) if "all" in args.days else [int(d) for d in args.days]
+    if args.out is None and len(days) > 1:
+        parser.error("--out is required for more than one day")
+    for day in days:
+        text = generate(day, args.scale, args.seed)
+        if args.out is None:
+            sys.stdout.write(text)
+        else:
+            os.makedirs(args.out, exist_ok=True)
+            with open(os.path.join(args.out, f"{day:02}.txt"), "w") as fp:
+                fp.write(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
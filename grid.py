@@ -0,0 +1,129 @@
+from typing import Iterable, Iterator, Tuple
+
+# Shared grid engine for the days that parse a big rectangle of characters.
+#
+# The old way was a Dict[Tuple[int, int], str], which costs ~100 bytes per cell
+# and makes every bounds check a tuple unpack + four compares. Instead we keep
+# one flat bytearray in row-major order with a border of padding around the
+# outside. Every real cell has all 8 neighbors in the array, so hot loops can
+# just add an offset and look at what's there: if it's the pad byte you fell
+# off the edge.
+#
+# Indices are plain ints. index()/coord() convert to and from (y, x) for the
+# places that care (printing, answers).
+
+NORTH = (-1,  0)
+SOUTH = ( 1,  0)
+WEST  = ( 0, -1)
+EAST  = ( 0,  1)
+
+CARDINALS = (NORTH, SOUTH, WEST, EAST)
+DIAGONALS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+def _as_byte(value) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = value.encode()
+    assert len(value) == 1, f"need a single byte, got {value!r}"
+    return value[0]
+
+
+class Grid:
+    def __init__(self, width: int, height: int, fill=".", pad="#"):
+        self.width = width
+        self.height = height
+        self.pad = _as_byte(pad)
+        # One column of padding on each side, one row on top and bottom.
+        self.stride = width + 2
+        self.data = bytearray([self.pad]) * (self.stride * (height + 2))
+        fill = _as_byte(fill)
+        for y in range(height):
+            start = self.index(y, 0)
+            self.data[start:start + width] = bytes([fill]) * width
+
+        # Precomputed neighbor offset tables
+        self.offsets = {d: d[0] * self.stride + d[1] for d in CARDINALS + DIAGONALS}
+        self.north = self.offsets[NORTH]
+        self.south = self.offsets[SOUTH]
+        self.west = self.offsets[WEST]
+        self.east = self.offsets[EAST]
+        self.neighbors4 = tuple(self.offsets[d] for d in CARDINALS)
+        self.neighbors8 = self.neighbors4 + tuple(self.offsets[d] for d in DIAGONALS)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable, pad="#") -> "Grid":
+        # str, bytes, or memoryviews that are already trimmed (rawinput's
+        # lines()), which get copied straight into the grid
+        rows = []
+        for line in lines:
+            if isinstance(line, str):
+                line = line.encode()
+            if not isinstance(line, memoryview):
+                line = line.strip()
+            if not line:
+                continue
+            rows.append(line)
+        width = len(rows[0]) if rows else 0
+        grid = cls(width, len(rows), pad=pad)
+        for y, row in enumerate(rows):
+            assert len(row) == width, f"ragged grid at row {y}"
+            start = grid.index(y, 0)
+            grid.data[start:start + width] = row
+        return grid
+
+    def copy(self) -> "Grid":
+        other = Grid.__new__(Grid)
+        other.__dict__.update(self.__dict__)
+        other.data = bytearray(self.data)
+        return other
+
+    def index(self, y: int, x: int) -> int:
+        return (y + 1) * self.stride + (x + 1)
+
+    def coord(self, idx: int) -> Tuple[int, int]:
+        y, x = divmod(idx, self.stride)
+        return y - 1, x - 1
+
+    def offset(self, direction: Tuple[int, int]) -> int:
+        return self.offsets[direction]
+
+    def in_bounds(self, idx: int) -> bool:
+        # Only valid for indices at most one step outside the real cells,
+        # which is all the padding guarantees anyway.
+        y, x = divmod(idx, self.stride)
+        return 0 < y <= self.height and 0 < x <= self.width
+
+    def at(self, y: int, x: int) -> str:
+        return chr(self.data[self.index(y, x)])
+
+    def __getitem__(self, idx: int) -> int:
+        return self.data[idx]
+
+    def __setitem__(self, idx: int, value):
+        self.data[idx] = _as_byte(value)
+
+    def cells(self) -> Iterator[int]:
+        # Row-major walk over the real (non-padding) cells
+        for y in range(self.height):
+            start = self.index(y, 0)
+            yield from range(start, start + self.width)
+
+    def find(self, ch) -> int:
+        ch = _as_byte(ch)
+        for idx in self.cells():
+            if self.data[idx] == ch:
+                return idx
+        raise ValueError(f"{chr(ch)!r} not in grid")
+
+    def rows(self) -> Iterator[bytes]:
+        for y in range(self.height):
+            start = self.index(y, 0)
+            yield bytes(self.data[start:start + self.width])
+
+    def __str__(self):
+        return "\n".join(row.decode() for row in self.rows())
+
+    def print(self):
+        print(self)
@@ -0,0 +1,197 @@
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import struct
+
+from grid import Grid
+from rawinput import Input
+
+# Parsed input cache.
+#
+# Days hand us whatever main() got as `data`: an open input file, or the
+# sample lines embedded in the day. Samples are tiny, so those just get parsed.
+# For a real file we hash its contents together with what kind of thing we're
+# parsing and a version number, and keep the parsed result under that key in a
+# compact binary file:
+#
+#   grids    header + the Grid's padded bytearray, exactly as it sits in memory
+#   records  header + every int of every record in one packed array('q')
+#
+# so reloading is a read() into a buffer rather than a loop over characters.
+# Editing the input changes the hash; changing how something is parsed means
+# bumping the version at the call site (or GRID_VERSION for grid layout
+# changes), and either way stale entries simply stop being looked up.
+#
+# $AOC_CACHE_DIR moves the cache (default .aoc_cache next to this file),
+# AOC_CACHE=0 turns it off.
+#
+# Long-lived processes (daemon.py) can also call keep_in_memory() to hold on
+# to everything they've parsed, keyed the same way, so a repeat query only
+# pays for hashing the input. Callers get a copy each time since some days
+# scribble on their grid.
+
+GRID_VERSION = 1
+
+_GRID_HEADER = struct.Struct("<4sIIIB")
+_RECORDS_HEADER = struct.Struct("<4sII")
+
+_memory: Optional[Dict[str, Any]] = None
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_CACHE", "1") != "0"
+
+
+def keep_in_memory(on: bool = True):
+    global _memory
+    _memory = {} if on else None
+
+
+def cache_dir() -> str:
+    return os.environ.get("AOC_CACHE_DIR") or \
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), ".aoc_cache")
+
+
+def _source(data) -> Tuple[Any, Any]:
+    # -> (what to hash for the key, or None to skip the cache; data to parse)
+    if not enabled():
+        return None, data
+    if isinstance(data, Input):
+        return data, data
+    name = getattr(data, "name", None)
+    if name is None:
+        return None, data
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, data
+    # stdin or a pipe: every one is called "<stdin>" or similar, so key on
+    # what's in it. That means reading it here; parse from what we read.
+    text = data.read()
+    if isinstance(text, str):
+        text = text.encode()
+    return text, text.decode().splitlines()
+
+
+def file_digest(source, prefix: bytes = b"") -> str:
+    # sha256 of prefix + the file's contents. An Input gets hashed straight
+    # out of its mapping, a path is read in chunks; neither way does the
+    # whole file end up in a bytes object.
+    h = hashlib.sha256(prefix)
+    if isinstance(source, Input):
+        h.update(source.buffer)
+        return h.hexdigest()
+    if isinstance(source, bytes):
+        # Contents we already had to read, see _source()
+        h.update(source)
+        return h.hexdigest()
+    with open(source, "rb") as fp:
+        return hashlib.file_digest(fp, lambda: h).hexdigest()
+
+
+def digest(source, kind: str, version: int) -> str:
+    return file_digest(source, f"{kind}:{version}\0".encode())
+
+
+def _entry(key: str, ext: str) -> str:
+    return os.path.join(cache_dir(), key[:32] + ext)
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as fp:
+            return fp.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write(path: str, *chunks):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so a killed run never leaves half an entry behind
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as fp:
+        for chunk in chunks:
+            fp.write(chunk)
+    os.replace(tmp, path)
+
+
+def _grid_lines(data):
+    # Bytes views straight out of the mapping when we can
+    return data.lines() if isinstance(data, Input) else data
+
+
+def grid(data, pad="#") -> Grid:
+    # Drop-in for Grid.from_lines(data, pad=pad)
+    source, data = _source(data)
+    if source is None:
+        return Grid.from_lines(_grid_lines(data), pad=pad)
+    entry = _entry(digest(source, f"grid pad={pad!r}", GRID_VERSION), ".grid")
+    if _memory is not None and entry in _memory:
+        return _memory[entry].copy()
+
+    g = _load_grid(data, pad, entry)
+    if _memory is not None:
+        _memory[entry] = g.copy()
+    return g
+
+
+def _load_grid(data, pad, entry) -> Grid:
+    raw = _read(entry)
+    if raw is not None:
+        magic, version, width, height, stored_pad = _GRID_HEADER.unpack_from(raw)
+        if magic == b"AOCG" and version == GRID_VERSION:
+            g = Grid(width, height, pad=pad)
+            body = memoryview(raw)[_GRID_HEADER.size:]
+            if stored_pad == g.pad and len(body) == len(g.data):
+                g.data[:] = body
+                return g
+
+    g = Grid.from_lines(_grid_lines(data), pad=pad)
+    _write(entry, _GRID_HEADER.pack(b"AOCG", GRID_VERSION, g.width, g.height, g.pad), g.data)
+    return g
+
+
+def records(data, parse_line: Callable[[str], Sequence[int]], width: int,
+            version: int, kind: str) -> List[Tuple[int, ...]]:
+    # One fixed-width tuple of ints per non-blank line, e.g. the six
+    # coordinates of a brick. kind names the parser (and version its
+    # revision) so two days parsing the same file don't share entries.
+    source, data = _source(data)
+    if source is None:
+        return _parse_records(data, parse_line, width)
+    entry = _entry(digest(source, kind, version), ".rec")
+    if _memory is not None and entry in _memory:
+        return list(_memory[entry])
+
+    rows = _load_records(data, parse_line, width, entry)
+    if _memory is not None:
+        _memory[entry] = list(rows)
+    return rows
+
+
+def _load_records(data, parse_line, width, entry) -> List[Tuple[int, ...]]:
+    raw = _read(entry)
+    if raw is not None:
+        magic, stored_width, count = _RECORDS_HEADER.unpack_from(raw)
+        if magic == b"AOCR" and stored_width == width:
+            values = array("q")
+            values.frombytes(memoryview(raw)[_RECORDS_HEADER.size:])
+            if len(values) == width * count:
+                it = iter(values)
+                return list(zip(*[it] * width))
+
+    rows = _parse_records(data, parse_line, width)
+    values = array("q", (v for row in rows for v in row))
+    _write(entry, _RECORDS_HEADER.pack(b"AOCR", width, len(rows)), values.tobytes())
+    return rows
+
+
+def _parse_records(lines: Iterable[str], parse_line, width) -> List[Tuple[int, ...]]:
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        row = tuple(parse_line(line))
+        assert len(row) == width, f"expected {width} values, got {row}"
+        rows.append(row)
+    return rows
@@ -0,0 +1,169 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Integer interval sets and boxes.
+#
+# Everything is half-open, [start, stop), same as range(). An IntervalSet is a
+# sorted list of disjoint, non-touching (start, stop) pairs, so the size of
+# the work is the number of pieces, not the number of integers in them: a
+# billion seeds in ten ranges is ten intervals.
+#
+# A Box is one (start, stop) per dimension, e.g. x/m/a/s ratings in day 19.
+# Boxes are immutable; split() hands back new ones, so branching doesn't have
+# to copy anything.
+
+Interval = Tuple[int, int]
+
+
+def _normalize(intervals: Iterable[Interval]) -> List[Interval]:
+    # Sort, drop empties, merge overlapping or touching pieces
+    merged: List[Interval] = []
+    for start, stop in sorted(i for i in intervals if i[0] < i[1]):
+        if merged and start <= merged[-1][1]:
+            if stop > merged[-1][1]:
+                merged[-1] = (merged[-1][0], stop)
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+class IntervalSet:
+    __slots__ = ("intervals",)
+
+    def __init__(self, intervals: Iterable[Interval] = ()):
+        self.intervals = _normalize(intervals)
+
+    @classmethod
+    def _trusted(cls, intervals: List[Interval]) -> "IntervalSet":
+        # Already sorted and disjoint, skip the normalize pass
+        s = cls.__new__(cls)
+        s.intervals = intervals
+        return s
+
+    @classmethod
+    def from_range(cls, start: int, stop: int) -> "IntervalSet":
+        return cls([(start, stop)])
+
+    def __iter__(self) -> Iterator[Interval]:
+        return iter(self.intervals)
+
+    def __len__(self) -> int:
+        # Number of pieces, see size() for number of integers
+        return len(self.intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IntervalSet) and self.intervals == other.intervals
+
+    def __repr__(self):
+        return f"IntervalSet({self.intervals})"
+
+    def __contains__(self, value: int) -> bool:
+        i = bisect_right(self.intervals, (value, float("inf"))) - 1
+        return i >= 0 and self.intervals[i][0] <= value < self.intervals[i][1]
+
+    def size(self) -> int:
+        return sum(stop - start for start, stop in self.intervals)
+
+    def min(self) -> int:
+        return self.intervals[0][0]
+
+    def max(self) -> int:
+        return self.intervals[-1][1] - 1
+
+    def union(self, other: "IntervalSet") -> "IntervalSet":
+        return IntervalSet(self.intervals + other.intervals)
+
+    def intersect(self, other: "IntervalSet") -> "IntervalSet":
+        out = []
+        a, b = self.intervals, other.intervals
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start = max(a[i][0], b[j][0])
+            stop = min(a[i][1], b[j][1])
+            if start < stop:
+                out.append((start, stop))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return IntervalSet._trusted(out)
+
+    def subtract(self, other: "IntervalSet") -> "IntervalSet":
+        out = []
+        b = other.intervals
+        j = 0
+        for start, stop in self.intervals:
+            # Skip everything in other that ends before this piece
+            while j < len(b) and b[j][1] <= start:
+                j += 1
+            k = j
+            while k < len(b) and b[k][0] < stop:
+                if b[k][0] > start:
+                    out.append((start, b[k][0]))
+                start = max(start, b[k][1])
+                k += 1
+            if start < stop:
+                out.append((start, stop))
+        return IntervalSet._trusted(out)
+
+    def translate(self, delta: int) -> "IntervalSet":
+        return IntervalSet._trusted([(start + delta, stop + delta) for start, stop in self.intervals])
+
+    def split(self, at: int) -> Tuple["IntervalSet", "IntervalSet"]:
+        # (everything < at, everything >= at)
+        below, above = [], []
+        for start, stop in self.intervals:
+            if stop <= at:
+                below.append((start, stop))
+            elif start >= at:
+                above.append((start, stop))
+            else:
+                below.append((start, at))
+                above.append((at, stop))
+        return IntervalSet._trusted(below), IntervalSet._trusted(above)
+
+
+@dataclass(frozen=True)
+class Box:
+    bounds: Tuple[Interval, ...]
+
+    @classmethod
+    def cube(cls, dims: int, start: int, stop: int) -> "Box":
+        return cls(((start, stop),) * dims)
+
+    def empty(self) -> bool:
+        return any(start >= stop for start, stop in self.bounds)
+
+    def volume(self) -> int:
+        accum = 1
+        for start, stop in self.bounds:
+            if start >= stop:
+                return 0
+            accum *= stop - start
+        return accum
+
+    def split(self, dim: int, at: int) -> Tuple[Optional["Box"], Optional["Box"]]:
+        # (part with bounds[dim] < at, part with bounds[dim] >= at), either
+        # one None if it would be empty
+        start, stop = self.bounds[dim]
+        below = above = None
+        if start < min(stop, at):
+            below = self._with(dim, (start, min(stop, at)))
+        if max(start, at) < stop:
+            above = self._with(dim, (max(start, at), stop))
+        return below, above
+
+    def intersect(self, other: "Box") -> Optional["Box"]:
+        bounds = tuple((max(a[0], b[0]), min(a[1], b[1]))
+                       for a, b in zip(self.bounds, other.bounds))
+        box = Box(bounds)
+        return None if box.empty() else box
+
+    def _with(self, dim: int, interval: Interval) -> "Box":
+        bounds = list(self.bounds)
+        bounds[dim] = interval
+        return Box(tuple(bounds))
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# Peak memory per day, split into parse and solve like bench.py.
+#
+#   ./memprof.py 04 12 17 --input-dir inputs
+#   ./memprof.py 17 --part 2 --top 10 --json mem.json
+#
+# Two numbers per phase:
+#   traced  peak of Python allocations (tracemalloc), plus the top allocation
+#           sites near that peak (the sampler thread snapshots whenever the
+#           traced total climbs SITES_GROWTH past its last snapshot; by the
+#           time a phase ends its data is usually gone)
+#   rss     peak resident set size of the whole process, sampled from a
+#           background thread every --interval ms (C extensions, numpy buffers,
+#           interpreter overhead all show up here and not in traced)
+#
+# tracemalloc makes everything several times slower, so this is its own run
+# rather than something bench.py does while timing. bench.py --memory calls
+# in here for one extra run per day and tracks the peaks in its baseline.
+# Work farmed out by pool.pmap happens in child processes and isn't counted.
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+import aoc
+import phases
+from bench import clear_caches, pick_input
+
+
+@dataclass
+class PhaseMemory:
+    traced: int
+    rss: Optional[int]
+    top: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MemoryReport:
+    day: int
+    part: int
+    input: str
+    # "parse" is missing for days that never call phases.mark("parse");
+    # then "solve" covers the whole run.
+    phases: Dict[str, PhaseMemory]
+    answer: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.day}.{self.part}"
+
+    def peak(self, attr="traced") -> Optional[int]:
+        values = [getattr(p, attr) for p in self.phases.values()
+                  if getattr(p, attr) is not None]
+        return max(values) if values else None
+
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def current_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as fp:
+            return int(fp.read().split()[1]) * _PAGE
+    except (OSError, ValueError, IndexError):
+        pass
+    # No /proc, settle for the lifetime peak (KiB on Linux, bytes on macOS)
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+# New allocation-site snapshot once traced memory grows this much past the
+# last one. Snapshots are slow, so not on every small new high.
+SITES_GROWTH = 1.25
+
+
+class RssSampler:
+    def __init__(self, interval: float, top: int = 0):
+        self.interval = interval
+        self.peak = 0
+        self.top = top
+        self.sites_at = 0
+        self.sites: List[str] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def sample(self) -> int:
+        rss = current_rss() or 0
+        if rss > self.peak:
+            self.peak = rss
+        if self.top and tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            if traced > self.sites_at * SITES_GROWTH:
+                self.sites_at = traced
+                self.sites = top_sites(self.top)
+        return rss
+
+    def take_sites(self) -> List[str]:
+        # Sites at the biggest traced total seen since the last take_sites()
+        self.sample()
+        sites = self.sites
+        self.sites_at = 0
+        self.sites = []
+        return sites
+
+    def take(self) -> int:
+        # Peak since the last take(), then start over from where we are now
+        self.sample()
+        peak = self.peak
+        self.peak = 0
+        self.sample()
+        return peak
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def top_sites(limit: int) -> List[str]:
+    if limit <= 0:
+        return []
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        # The RSS sampler thread
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    sites = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        sites.append(f"{os.path.basename(frame.filename)}:{frame.lineno} "
+                     f"{stat.size} bytes in {stat.count} blocks")
+    return sites
+
+
+def measure(solver, filename, sample, top=5, interval=0.005) -> MemoryReport:
+    module = solver.load()
+    clear_caches(module)
+    results: Dict[str, PhaseMemory] = {}
+
+    with RssSampler(interval, top) as rss:
+        def on_mark(name):
+            if name != "parse" or "parse" in results:
+                return
+            results["parse"] = PhaseMemory(tracemalloc.get_traced_memory()[1],
+                                           rss.take(), rss.take_sites())
+            tracemalloc.reset_peak()
+
+        sink = io.StringIO()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            rss.take()
+            rss.take_sites()
+            with phases.listening(on_mark), contextlib.redirect_stdout(sink), \
+                    contextlib.redirect_stderr(sink):
+                answer = solver.run(filename=filename, sample=sample)
+            results["solve"] = PhaseMemory(tracemalloc.get_traced_memory()[1],
+                                           rss.take(), rss.take_sites())
+        finally:
+            tracemalloc.stop()
+
+    return MemoryReport(
+        day=solver.day,
+        part=solver.part,
+        input="sample" if sample else os.path.basename(filename),
+        phases=results,
+        answer=None if answer is None else str(answer),
+    )
+
+
+def report_to_json(report: MemoryReport) -> dict:
+    return asdict(report)
+
+
+def fmt_bytes(n: Optional[int]) -> str:
+    if n is None:
+        return "       -"
+    return f"{n / (1024 * 1024):8.2f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Peak memory for parse/part1/part2 of each day")
+    parser.add_argument("days", nargs="*", default=["all"])
+    parser.add_argument("--part", type=int, choices=(1, 2))
+    parser.add_argument("--input-dir", help="directory with NN.txt inputs (missing ones use the sample)")
+    parser.add_argument("--top", type=int, default=5, help="allocation sites to list per phase")
+    parser.add_argument("--interval", type=float, default=5.0, help="RSS sampling period in ms")
+    parser.add_argument("--json", metavar="PATH", help="write the full report here")
+    args = parser.parse_args(argv)
+
+    reports = []
+    failed = []
+    print(f"{'day':>3} {'part':>4} {'input':>10} {'phase':>6} {'traced MiB':>10} {'rss MiB':>9}")
+    for solver in aoc.solvers(aoc.parse_days(args.days), [args.part] if args.part else None):
+        filename, sample = pick_input(solver, args.input_dir)
+        try:
+            r = measure(solver, filename, sample, args.top, args.interval / 1000)
+        except Exception as e:
+            failed.append(f"day {solver.day} part {solver.part}: {type(e).__name__}: {e}")
+            continue
+        reports.append(r)
+        for name, p in r.phases.items():
+            print(f"{r.day:3} {r.part:4} {r.input:>10} {name:>6}   {fmt_bytes(p.traced)} {fmt_bytes(p.rss)}")
+            for site in p.top:
+                print(f"{'':>30}{site}")
+
+    for f in failed:
+        print("failed:", f, file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as fp:
+            json.dump({"results": [report_to_json(r) for r in reports]}, fp, indent=2)
+            fp.write("\n")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,23 @@
+from contextlib import contextmanager
+from typing import Callable, List
+
+# Phase markers.
+#
+# Days call mark("parse") once they're done reading their input. Whatever is
+# measuring the run (bench.py, memory tracking, ...) listens for those and
+# splits its numbers at that point. With nobody listening mark() is a loop over
+# an empty list, so it's fine to leave in.
+
+_listeners: List[Callable[[str], None]] = []
+
+def mark(name: str):
+    for listener in _listeners:
+        listener(name)
+
+@contextmanager
+def listening(callback: Callable[[str], None]):
+    _listeners.append(callback)
+    try:
+        yield
+    finally:
+        _listeners.remove(callback)
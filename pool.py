@@ -0,0 +1,100 @@
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+import multiprocessing
+import os
+
+# Parallel map for days whose work splits into independent units (lines,
+# notes, starting beams, bricks, ...).
+#
+#   results = pmap(handle, lines, part2)
+#
+# calls handle(line, part2) for every line and returns the results in input
+# order, same as [handle(line, part2) for line in lines]. pimap() is the
+# same thing as a generator, handing results back as they finish (still in
+# input order). The function and
+# the shared argument are stashed in module globals right before the pool
+# forks, so workers get them through copy-on-write instead of having them
+# pickled over for every unit; only the units themselves and the results go
+# through the pipes. That also means func doesn't need to be picklable, a
+# closure is fine.
+#
+# Worker count comes from the workers argument, then set_workers() (aoc.py
+# --workers), then $AOC_WORKERS, then the number of cores. With one worker,
+# too few units, no fork() on this platform, when we're already inside a
+# worker, or after no_fork(), it just runs the plain loop.
+
+# Below this many units forking costs more than it saves
+MIN_UNITS = 16
+
+_workers: Optional[int] = None
+_func: Optional[Callable] = None
+_shared: Any = None
+_in_worker = False
+_fork_ok = True
+
+
+def no_fork():
+    # For processes with other threads running (daemon.py): fork() only
+    # copies the calling thread, so a lock another thread held at that moment
+    # stays locked forever in the child.
+    global _fork_ok
+    _fork_ok = False
+
+
+def set_workers(n: Optional[int]):
+    global _workers
+    _workers = n
+
+
+def worker_count(workers: Optional[int] = None) -> int:
+    if workers is None:
+        workers = _workers
+    if workers is None:
+        workers = int(os.environ.get("AOC_WORKERS", "0")) or os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _init():
+    global _in_worker
+    _in_worker = True
+
+
+def _call(item):
+    return _func(item, _shared)
+
+
+def _progress(it, total, progress):
+    if not progress:
+        return it
+    from tqdm import tqdm
+    return tqdm(it, total=total)
+
+
+def pmap(func: Callable[[Any, Any], Any], items: Iterable, shared: Any = None,
+         workers: Optional[int] = None, chunksize: Optional[int] = None,
+         progress: bool = False) -> List:
+    return list(pimap(func, items, shared, workers, chunksize, progress))
+
+
+def pimap(func: Callable[[Any, Any], Any], items: Iterable, shared: Any = None,
+          workers: Optional[int] = None, chunksize: Optional[int] = None,
+          progress: bool = False, min_units: int = MIN_UNITS) -> Iterator:
+    global _func, _shared
+    items = list(items)
+    workers = min(worker_count(workers), len(items))
+    if (workers <= 1 or len(items) < min_units or _in_worker or not _fork_ok
+            or "fork" not in multiprocessing.get_all_start_methods()):
+        for item in _progress(items, len(items), progress):
+            yield func(item, shared)
+        return
+
+    if chunksize is None:
+        # A few chunks per worker so one slow chunk doesn't hold everyone up
+        chunksize = max(1, len(items) // (workers * 4))
+
+    _func, _shared = func, shared
+    try:
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(workers, initializer=_init) as p:
+            yield from _progress(p.imap(_call, items, chunksize), len(items), progress)
+    finally:
+        _func, _shared = None, None
@@ -0,0 +1,115 @@
+from typing import Iterator, List, Optional, Tuple
+import mmap
+import os
+
+# Puzzle input as bytes, straight out of the page cache.
+#
+#   data = open_input("15.txt")
+#   for field in data.split(b","):     # memoryview per step, nothing copied
+#   grid = Grid.from_lines(data.lines())
+#
+# The file is mmapped read-only and the file handle closed right away (the
+# mapping keeps its own reference), so nothing leaks if main() never closes
+# it. lines() and split() hand out memoryviews into the mapping with
+# surrounding whitespace trimmed; bytes(view) or str(view, "ascii") when a
+# real object is needed. Iterating an Input directly gives str lines like a
+# text file would, for code that hasn't moved over. chunks() cuts the file
+# into newline-aligned byte ranges for handing out to pool workers; forked
+# workers share the parent's mapping, so nothing gets copied or pickled.
+#
+# Views keep the mapping alive, so the mapping goes away when the last view
+# and the Input do.
+
+_WHITESPACE = frozenset(b" \t\r\n\v\f")
+
+
+class Input:
+    def __init__(self, path: str):
+        self.name = path
+        with open(path, "rb") as fp:
+            if os.fstat(fp.fileno()).st_size:
+                self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # Can't map an empty file
+                self._map = b""
+        self.buffer = memoryview(self._map)
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def _trimmed(self, start: int, stop: int) -> memoryview:
+        m = self._map
+        while start < stop and m[start] in _WHITESPACE:
+            start += 1
+        while stop > start and m[stop - 1] in _WHITESPACE:
+            stop -= 1
+        return self.buffer[start:stop]
+
+    def split(self, sep: bytes, skip_empty: bool = True) -> Iterator[memoryview]:
+        m = self._map
+        start, end = 0, len(m)
+        while start <= end:
+            stop = m.find(sep, start)
+            if stop == -1:
+                stop = end
+            view = self._trimmed(start, stop)
+            if view or not skip_empty:
+                yield view
+            start = stop + len(sep)
+
+    def lines(self, start: int = 0, end: Optional[int] = None) -> Iterator[memoryview]:
+        # Blank lines included, they mean something to some days. start/end
+        # pick out a byte range, e.g. one of chunks().
+        m = self._map
+        if end is None:
+            end = len(m)
+        while start < end:
+            stop = m.find(b"\n", start, end)
+            if stop == -1:
+                stop = end
+            yield self._trimmed(start, stop)
+            start = stop + 1
+
+    def chunks(self, size: int) -> List[Tuple[int, int]]:
+        # (start, end) byte ranges of roughly `size` bytes that together cover
+        # the file, each ending just after a newline (or at the end of the
+        # file), so no line is split between two of them
+        m = self._map
+        total = len(m)
+        ranges = []
+        start = 0
+        while start < total:
+            stop = start + size
+            if stop >= total:
+                stop = total
+            else:
+                newline = m.find(b"\n", stop - 1)
+                stop = total if newline == -1 else newline + 1
+            ranges.append((start, stop))
+            start = stop
+        return ranges
+
+    def __iter__(self) -> Iterator[str]:
+        for view in self.lines():
+            yield str(view, "utf-8")
+
+    def close(self):
+        self.buffer.release()
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # Some line or field view is still around. The mapping goes
+                # away with the last of them instead.
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def open_input(path: str) -> Input:
+    return Input(path)
@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+import os
+import signal
+import sys
+
+import phases
+
+# Statistical profiler, stdlib only.
+#
+# A SIGPROF interval timer interrupts us every `interval` seconds of CPU time
+# (the kernel may round that up to its tick, often 4ms) and the handler
+# records the stack it interrupted. Nothing runs between
+# samples, so tiny hot functions (generators, __eq__, ...) aren't slowed down
+# the way cProfile's per-call hooks slow them down. The cost is that the
+# numbers are samples, not exact call counts.
+#
+# Samples are split by phase, same as bench.py: "parse" until the day calls
+# phases.mark("parse"), "solve" after. A day that never marks ends up
+# all "solve".
+#
+# Output is the collapsed-stack format flamegraph.pl, speedscope and friends
+# read: one line per distinct stack, frames root first separated by ';', then
+# the sample count.
+#
+# Unix only (no SIGPROF on Windows). Only the main thread is sampled and
+# pool.pmap's worker processes aren't profiled (fork() doesn't carry timers
+# over).
+
+Stack = Tuple[str, ...]
+
+
+def frame_name(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.phase = "parse"
+        self.marked = False
+        self.samples: Dict[str, Counter] = defaultdict(Counter)
+        self._names: Dict[object, str] = {}
+        self._old_handler = None
+        # Stacks stop at whoever entered the `with`, so the runner's own
+        # frames aren't in every line
+        self._root = None
+
+    def _on_mark(self, name: str):
+        if name == "parse" and not self.marked:
+            self.marked = True
+            self.phase = "solve"
+
+    def _sample(self, signum, frame):
+        # frame is whatever we interrupted. If that was this handler (a
+        # second signal while we were still walking), skip it so the sample
+        # doesn't show the profiler as a leaf.
+        while frame is not None and frame.f_code is _SAMPLE_CODE:
+            frame = frame.f_back
+        stack = []
+        names = self._names
+        root = self._root
+        while frame is not None and frame is not root:
+            code = frame.f_code
+            name = names.get(code)
+            if name is None:
+                name = names[code] = frame_name(code)
+            stack.append(name)
+            frame = frame.f_back
+        if not stack:
+            # Landed in the root frame itself, between calls
+            return
+        stack.reverse()
+        self.samples[self.phase][tuple(stack)] += 1
+
+    def __enter__(self):
+        self._root = sys._getframe(1)
+        self._listening = phases.listening(self._on_mark)
+        self._listening.__enter__()
+        self._old_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+        return self
+
+    def __exit__(self, *exc):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._old_handler or signal.SIG_DFL)
+        self._listening.__exit__(*exc)
+        if not self.marked and "parse" in self.samples:
+            # Never got a mark, so none of it was parsing
+            self.samples["solve"].update(self.samples.pop("parse"))
+        return False
+
+    def count(self, phase: str) -> int:
+        return sum(self.samples[phase].values())
+
+    def collapsed(self, phase: str) -> List[str]:
+        return [f"{';'.join(stack)} {count}"
+                for stack, count in sorted(self.samples[phase].items())]
+
+    def top(self, phase: str, limit: int = 10) -> List[Tuple[str, int]]:
+        # Frames by samples where they were the innermost one (self time)
+        own = Counter()
+        for stack, count in self.samples[phase].items():
+            if stack:
+                own[stack[-1]] += count
+        return own.most_common(limit)
+
+    def write(self, directory: str, prefix: str) -> List[str]:
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for phase in sorted(self.samples):
+            path = os.path.join(directory, f"{prefix}.{phase}.folded")
+            with open(path, "w") as fp:
+                for line in self.collapsed(phase):
+                    fp.write(line + "\n")
+            paths.append(path)
+        return paths
+
+
+_SAMPLE_CODE = Sampler._sample.__code__
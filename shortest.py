@@ -0,0 +1,173 @@
+from dataclasses import dataclass
+from typing import Callable, Container, Iterable, List, Optional, Tuple
+import heapq
+
+# Shortest paths over integer states.
+#
+# The caller numbers its states 0..num_states-1 however it likes (usually
+# something like (grid_index * 4 + direction) * K + count), and hands us a
+# neighbors(state) function yielding (next_state, weight) pairs. dist and prev
+# are flat lists allocated once up front, so there's no per-state setup like
+# the old pre-filled dicts.
+#
+# Edge weights in these puzzles are small ints (1-9 heat loss, unit steps), so
+# by default this is Dial's algorithm: a ring of max_weight+1 buckets, where
+# bucket d % len(ring) holds the states currently at distance d. Popping is
+# just walking forward to the next non-empty bucket. If the weights can get
+# big (day 11's expanded rows cost a million) we fall back to heapq, but with
+# dist * num_states + state packed into a single int instead of tuples.
+#
+# heuristic(state) turns it into A*. It has to be consistent, and since it
+# changes the priority of an edge by at most another max_weight, it must
+# satisfy |h(u) - h(v)| <= weight(u, v) (e.g. manhattan distance to the exit
+# when every step costs at least 1).
+#
+# With targets, we stop as soon as one of them is settled (or, with
+# all_targets=True, once every one of them is). With max_dist, we stop once
+# everything closer than that has been settled.
+
+INFINITY = 999999999
+
+# Past this the bucket ring costs more than it saves
+MAX_DIAL_WEIGHT = 1024
+
+
+@dataclass
+class Paths:
+    dist: List[int]
+    prev: Optional[List[int]]
+    # The target we stopped at, if any
+    target: Optional[int] = None
+
+    def path(self, state: int) -> List[int]:
+        assert self.prev is not None, "search was run without track_prev"
+        states = []
+        while state != -1:
+            states.append(state)
+            state = self.prev[state]
+        states.reverse()
+        return states
+
+
+def shortest_paths(num_states: int,
+                   sources: Iterable[int],
+                   neighbors: Callable[[int], Iterable[Tuple[int, int]]],
+                   max_weight: int,
+                   targets: Optional[Container[int]] = None,
+                   all_targets: bool = False,
+                   heuristic: Optional[Callable[[int], int]] = None,
+                   max_dist: Optional[int] = None,
+                   track_prev: bool = False) -> Paths:
+    # max_dist is compared against the queue priority, which isn't the
+    # distance once there's a heuristic in it
+    assert heuristic is None or max_dist is None
+    dist = [INFINITY] * num_states
+    prev = [-1] * num_states if track_prev else None
+    sources = list(sources)
+    for s in sources:
+        dist[s] = 0
+
+    remaining = None
+    if targets is not None and all_targets:
+        remaining = set(targets)
+        targets = None
+        if not remaining:
+            return Paths(dist, prev)
+
+    if max_weight <= MAX_DIAL_WEIGHT and _fits_ring(sources, max_weight, heuristic):
+        target = _dial(dist, prev, sources, neighbors, max_weight, targets,
+                       remaining, heuristic, max_dist)
+    else:
+        target = _heap(dist, prev, sources, neighbors, targets, remaining,
+                       heuristic, max_dist)
+    return Paths(dist, prev, target)
+
+
+def _fits_ring(sources, max_weight, heuristic) -> bool:
+    # With a heuristic the ring only spans 2*max_weight+1 priorities, which is
+    # plenty for everything pushed while searching but not for sources whose
+    # f values are further apart than that: they'd wrap around into early
+    # buckets. Those searches go to the heap.
+    if heuristic is None or not sources:
+        return True
+    fs = [heuristic(s) for s in sources]
+    return max(fs) - min(fs) < 2 * max_weight + 1
+
+
+def _dial(dist, prev, sources, neighbors, max_weight, targets, remaining,
+          heuristic, max_dist):
+    nb = max_weight + 1 if heuristic is None else 2 * max_weight + 1
+    buckets = [[] for _ in range(nb)]
+    pending = 0
+    cur = None
+    for s in sources:
+        f = 0 if heuristic is None else heuristic(s)
+        buckets[f % nb].append(s)
+        pending += 1
+        if cur is None or f < cur:
+            cur = f
+
+    while pending:
+        bucket = buckets[cur % nb]
+        while not bucket:
+            cur += 1
+            bucket = buckets[cur % nb]
+        if max_dist is not None and cur > max_dist:
+            break
+        u = bucket.pop()
+        pending -= 1
+        du = dist[u]
+        # Stale entry, u got a better distance after this was queued
+        if (du if heuristic is None else du + heuristic(u)) != cur:
+            continue
+        if targets is not None and u in targets:
+            return u
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                return None
+
+        for v, w in neighbors(u):
+            alt = du + w
+            if alt < dist[v]:
+                dist[v] = alt
+                if prev is not None:
+                    prev[v] = u
+                f = alt if heuristic is None else alt + heuristic(v)
+                buckets[f % nb].append(v)
+                pending += 1
+    return None
+
+
+def _heap(dist, prev, sources, neighbors, targets, remaining, heuristic,
+          max_dist):
+    n = len(dist)
+    Q = []
+    for s in sources:
+        f = 0 if heuristic is None else heuristic(s)
+        Q.append(f * n + s)
+    heapq.heapify(Q)
+
+    while Q:
+        f, u = divmod(heapq.heappop(Q), n)
+        if max_dist is not None and f > max_dist:
+            break
+        du = dist[u]
+        if (du if heuristic is None else du + heuristic(u)) != f:
+            continue
+        if targets is not None and u in targets:
+            return u
+        if remaining is not None:
+            remaining.discard(u)
+            if not remaining:
+                return None
+
+        for v, w in neighbors(u):
+            alt = du + w
+            if alt < dist[v]:
+                dist[v] = alt
+                if prev is not None:
+                    prev[v] = u
+                f = alt if heuristic is None else alt + heuristic(v)
+                heapq.heappush(Q, f * n + v)
+    return None
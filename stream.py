@@ -0,0 +1,67 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Streaming mode for the days that are a fold over their input lines
+# (01, 02, 03, 04, 07, 09, 12, 18).
+#
+# Such a day has a Fold class: Fold(part2) starts out empty, feed(line) takes
+# one line (newline and all), answer() is the answer for everything fed so
+# far and is cheap enough to call now and then. Nothing keeps the lines
+# around, so memory stays flat however long the input is. Most of those
+# days' main() is just their Fold over the whole input.
+#
+#   some-generator | ./aoc.py stream 02
+#   ./aoc.py stream 12 --input huge.txt --every 1000000
+#
+# feeds every selected part from one pass over stdin or the file and prints
+# the running answers every --every lines. A Fold that works out both parts
+# from the same state can also have answers() -> (part 1, part 2); then a
+# day's parts share one fold and each line only gets parsed once.
+
+
+def can_stream(module) -> bool:
+    return hasattr(module, "Fold")
+
+
+def setup(parts: Dict[Any, Tuple[Any, int]]) -> Tuple[List[Any], Dict[Any, Callable[[], Any]]]:
+    # {key: (module, part)} -> (folds to feed, {key: answer getter})
+    folds = []
+    answers = {}
+    shared = {}
+    for key, (module, part) in parts.items():
+        if hasattr(module.Fold, "answers"):
+            fold = shared.get(module.__name__)
+            if fold is None:
+                fold = shared[module.__name__] = module.Fold()
+                folds.append(fold)
+            answers[key] = lambda fold=fold, i=part - 1: fold.answers()[i]
+        else:
+            fold = module.Fold(part2=part == 2)
+            folds.append(fold)
+            answers[key] = fold.answer
+    return folds, answers
+
+
+def run(folds: List[Any], answers: Dict[Any, Callable[[], Any]], lines: Iterable[str],
+        every: int = 0, report: Callable[[int, Dict[Any, Any]], None] = None
+        ) -> Tuple[int, Dict[Any, Any]]:
+    # Feed every fold each line. Returns (line count, {key: answer}).
+    feeds = [fold.feed for fold in folds]
+    n = 0
+    next_report = every
+    for line in lines:
+        for feed in feeds:
+            feed(line)
+        n += 1
+        if n == next_report:
+            next_report += every
+            if report is not None:
+                report(n, {key: answer() for key, answer in answers.items()})
+    return n, {key: answer() for key, answer in answers.items()}
+
+
+def fold_all(fold, lines: Iterable[str]):
+    # What main() does with its Fold
+    for line in lines:
+        fold.feed(line)
+    return fold.answer()
+
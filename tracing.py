@@ -0,0 +1,111 @@
+import contextlib
+import json
+import sys
+import time
+
+# Debug output for the days.
+#
+# tracing.debug(...) / tracing.info(...) take print()-style arguments. While a
+# level is off they're bound to a function that does nothing, and the str()
+# formatting only happens once something is enabled, so they can sit in hot
+# loops. Call them as tracing.debug(...) (not `from tracing import debug`) or
+# you'll keep the no-op after enable() swaps it out.
+#
+# Nesting depth is an explicit counter bumped by span(), instead of asking
+# inspect.stack() how deep we are on every line (which is what print_depth
+# used to do, and which walked the whole stack each time).
+#
+# enable(json_path=...) also writes every event as one JSON object per line.
+
+OFF = 0
+INFO = 1
+DEBUG = 2
+LEVELS = {"off": OFF, "info": INFO, "debug": DEBUG}
+_NAMES = {INFO: "info", DEBUG: "debug"}
+
+level = OFF
+_depth = 0
+_stream = None
+_json = None
+_start = 0.0
+
+
+def _noop(*args, **kwargs):
+    pass
+
+info = _noop
+debug = _noop
+
+
+def _write(lvl, event, msg, fields):
+    if _stream is not False:
+        stream = _stream if _stream is not None else sys.stdout
+        stream.write("    " * _depth + msg + "\n")
+    if _json is not None:
+        record = {"t": round(time.perf_counter() - _start, 6), "level": _NAMES[lvl],
+                  "event": event, "depth": _depth, "msg": msg}
+        if fields:
+            record.update({k: v if isinstance(v, (int, float, str, bool, type(None))) else repr(v)
+                           for k, v in fields.items()})
+        _json.write(json.dumps(record) + "\n")
+
+def _info(*args):
+    _write(INFO, "log", " ".join(map(str, args)), None)
+
+def _debug(*args):
+    _write(DEBUG, "log", " ".join(map(str, args)), None)
+
+
+class _Span:
+    __slots__ = ("lvl", "name", "fields")
+
+    def __init__(self, lvl, name, fields):
+        self.lvl = lvl
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        global _depth
+        args = ", ".join(f"{k}={v!r}" for k, v in self.fields.items())
+        _write(self.lvl, "enter", f"{self.name}({args})", dict(self.fields, span=self.name))
+        _depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _depth
+        _depth -= 1
+        if _json is not None:
+            _write(self.lvl, "exit", f"end {self.name}", {"span": self.name})
+        return False
+
+_NULL_SPAN = contextlib.nullcontext()
+
+def span(name, lvl=DEBUG, **fields):
+    if level < lvl:
+        return _NULL_SPAN
+    return _Span(lvl, name, fields)
+
+
+def enabled(lvl=DEBUG) -> bool:
+    return level >= lvl
+
+def enable(lvl=DEBUG, json_path=None, text=True):
+    global level, info, debug, _stream, _json, _start, _depth
+    disable()
+    level = lvl
+    info = _info if lvl >= INFO else _noop
+    debug = _debug if lvl >= DEBUG else _noop
+    _stream = None if text else False
+    if json_path is not None:
+        _json = open(json_path, "w")
+    _start = time.perf_counter()
+    _depth = 0
+
+def disable():
+    global level, info, debug, _json
+    level = OFF
+    info = _noop
+    debug = _noop
+    if _json is not None:
+        _json.close()
+        _json = None
@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+# First and last occurrence of any of a set of byte strings, Aho-Corasick style.
+#
+#   scan = Scanner({b"1": 1, b"one": 1, b"2": 2, b"two": 2, ...})
+#   scan.first(line), scan.last(line)    # -> value, or None
+#
+# The patterns are compiled into a DFA (a 256-entry row of next states per
+# trie node, failure links already folded in), so scanning is one list index
+# per byte and stops at the first state that completes a pattern. last()
+# does the same from the end of the line with a second automaton built from
+# the reversed patterns, so a line costs two scans that each stop as soon as
+# they hit something, rather than finding every match in between.
+#
+# "First" is the match that ends first. That's also the one that starts
+# first as long as no pattern is inside another, which Scanner insists on.
+# Lines can be bytes, bytearray or memoryview.
+
+
+class Automaton:
+    def __init__(self, patterns: Dict[bytes, Any]):
+        goto: List[Dict[int, int]] = [{}]
+        out: List[Any] = [None]
+        for pattern, value in patterns.items():
+            state = 0
+            for b in pattern:
+                nxt = goto[state].get(b)
+                if nxt is None:
+                    nxt = goto[state][b] = len(goto)
+                    goto.append({})
+                    out.append(None)
+                state = nxt
+            out[state] = value
+
+        # Breadth first, so a state's failure target already has its row
+        delta: List[List[int]] = [None] * len(goto)
+        fail = [0] * len(goto)
+        delta[0] = [goto[0].get(b, 0) for b in range(256)]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            row = list(delta[fail[state]])
+            for b, nxt in goto[state].items():
+                row[b] = nxt
+                fail[nxt] = delta[fail[state]][b]
+                queue.append(nxt)
+            if out[state] is None:
+                out[state] = out[fail[state]]
+            delta[state] = row
+
+        self.delta = delta
+        self.out = out
+
+    def scan(self, data) -> Optional[Any]:
+        delta = self.delta
+        out = self.out
+        state = 0
+        for b in data:
+            state = delta[state][b]
+            if out[state] is not None:
+                return out[state]
+        return None
+
+
+class Scanner:
+    def __init__(self, patterns: Dict[bytes, Any]):
+        for a in patterns:
+            for b in patterns:
+                if a != b and a in b:
+                    raise ValueError(f"{a!r} is inside {b!r}, first/last would be ambiguous")
+        self.forward = Automaton(patterns)
+        self.backward = Automaton({p[::-1]: v for p, v in patterns.items()})
+
+    def first(self, data) -> Optional[Any]:
+        return self.forward.scan(data)
+
+    def last(self, data) -> Optional[Any]:
+        return self.backward.scan(reversed(data))
+
+    def first_last(self, data) -> Tuple[Optional[Any], Optional[Any]]:
+        return self.first(data), self.last(data)